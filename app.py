@@ -1,7 +1,8 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from generate_raw_data import MemberRoster, VaccinedPatient
-from generate_edi import EDI
+from generate_edi import EDI, generate_batch
 from datetime import datetime
 from pathlib import Path
 from fastapi.responses import FileResponse
@@ -11,15 +12,36 @@ from api_connector import (
     create_member,
 )
 from pydantic import BaseModel, Field
-from typing import Optional, Annotated
+from typing import Optional, Annotated, Literal
 from generate_testing_data import TestingData
-from generate_rt_claim_data import RTClaimData
-from generate_rt_eligibility_data import RTEligibbility
-from generate_rt_standart_benefit_entity_data import RTStandardBenefitEntityData
+from generate_rt_claim_data import (
+    RTClaimData,
+    claim_status_weights,
+    line_count_distribution,
+)
+from generate_rt_eligibility_data import (
+    RTEligibbility,
+    RTEligibilityDelta,
+    member_index,
+)
+from generate_rt_standart_benefit_entity_data import (
+    RTStandardBenefitEntityData,
+    entity_catalog,
+)
 from generate_rt_individual_usage_benefit_data import RTIndividualUsageBenefitData
 from generate_rt_plan_benefit_data import RTPlanBenefitData
 from ragister_vaccine_candidates import VaccineCandidate
 from generate_vaccine_data import Encounters
+from core.constants import (
+    DATA_DIR,
+    EDI_PROCESS_COUNT,
+    RT_CHUNK_SIZE,
+    RT_PROCESS_COUNT,
+    WORKER_POOL_SIZE,
+)
+from generator_helpers.entity_catalog import EntityCatalog
+from generator_helpers.rt_schema import file_group_archive
+from generator_helpers.worker_pool import shutdown_worker_pool, start_worker_pool
 from generator_helpers.data_converter import (
     convert_csv_to_jsonlike,
     convert_csv_to_json,
@@ -86,6 +108,25 @@ class RTEligibility(BaseModel):
     members_count: int = 1
     load_type: str = "F"
     optional_fields: bool = False
+    seed: Optional[int] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+
+class RTEligibilityDeltaModel(BaseModel):
+    base_file: Annotated[
+        str,
+        Field(
+            description=(
+                "Full eligibility file (X-Stored-File) or .members.npy index"
+                " (X-Member-Index), relative to the storage root"
+            )
+        ),
+    ]
+    churn_rate: float = 0.01
+    load_type: Literal["D", "I"] = "D"
+    optional_fields: bool = False
+    seed: Optional[int] = None
 
 
 class RTClaim(BaseModel):
@@ -93,24 +134,42 @@ class RTClaim(BaseModel):
     optional_fields: bool
     claim_level_record_count: int = 1
     claim_line_level_record_count: int
+    claim_line_count_distribution: Literal["fixed", "poisson", "uniform"] = "fixed"
+    # paid/denied/pending status code mix instead of uniform codes
+    weighted_status_codes: bool = False
+    seed: Optional[int] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
 
 
 class RTStandardBenefitEntity(BaseModel):
     members_count: int = 1
     load_type: str
     optional_fields: bool
+    seed: Optional[int] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
 
 
 class RTPlanBenefit(BaseModel):
     members_count: int = 1
     load_type: str
     optional_fields: bool
+    seed: Optional[int] = None
+    plan_count: Optional[int] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
 
 
 class RTIndividualUsageBenefit(BaseModel):
     members_count: int
     load_type: str
     optional_fields: bool
+    seed: Optional[int] = None
+    # X-Entity-Catalog of a standard benefit entity file, relative to DATA_DIR
+    entity_catalog: Optional[str] = None
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
 
 
 class TestingDataModel(BaseModel):
@@ -131,7 +190,17 @@ class TestingDataModel(BaseModel):
     patient_email: Optional[str]
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(_app):
+    """Run the member and vaccine patient generators on one pool of workers."""
+    start_worker_pool(WORKER_POOL_SIZE)
+    try:
+        yield
+    finally:
+        shutdown_worker_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/")
@@ -147,18 +216,25 @@ async def get_members_csv(data_format, members_num: int = 1, segments: int = 1):
     GET http://0.0.0.0:8000/members/<csv/edi>/?members_num=<10>&relationship=<False/True>&segments=<1>
     """
     now = datetime.now()
-    file_path = f"/tmp/data/{now.year}/{now.month}/{now.day}/{now.hour}/"
+    file_path = f"{DATA_DIR}/{now.year}/{now.month}/{now.day}/{now.hour}/"
     Path(file_path).mkdir(parents=True, exist_ok=True)
     mmbr = MemberRoster()
-    members_data = mmbr.generate(members_num)
 
     if data_format == "csv":
         filename = f"{file_path}{now.hour}_{now.minute}_{now.second}.csv"
-        mmbr.save_to_csv(filename=filename, data_list=members_data)
+        mmbr.write_csv(filename, members_num)
     elif data_format == "edi":
         edi = EDI()
-        edi_doc = edi.generate(segments, members_data)
-        filename = edi.writeEDIDocument(edi_doc, path=file_path)
+        # every claim uses one member: with enough members they are streamed
+        # into the claims instead of building the whole roster first
+        members_data = (
+            mmbr.stream(segments)
+            if members_num >= segments
+            else mmbr.generate(members_num)
+        )
+        filename = edi.writeEDIDocument(
+            edi.segments(segments, members_data), path=file_path
+        )
     else:
         raise HTTPException(status_code=404, detail=f"Format: {data_format} not found")
 
@@ -181,7 +257,7 @@ async def post_edi_extra_data(edidata: EdiData):
     members_data = mmbr.generate(members_num=1)
 
     edi = EDI()
-    edi_doc = edi.generate(members_data=members_data, edidata=edidata, segments_num=1)
+    edi_doc = edi.segments(members_data=members_data, edidata=edidata, segments_num=1)
     filename = edi.writeEDIDocument(edi_doc, path=file_path)
     if Path(filename).exists():
         return FileResponse(path=filename, filename=filename.split("/")[-1])
@@ -191,6 +267,36 @@ async def post_edi_extra_data(edidata: EdiData):
         )
 
 
+@app.get("/members/edi_batch/", status_code=200)
+async def get_members_edi_batch(
+    interchanges: int = 1,
+    segments: int = 1,
+    members_num: int = 1,
+    archive: Literal["zip", "tar"] = "zip",
+):
+    """
+    create & download independent edi files (one interchange each) with their
+    manifest in one archive using:
+    GET http://0.0.0.0:8000/members/edi_batch/?interchanges=<100>&segments=<10>&members_num=<10>&archive=<zip/tar>
+    """
+    file_path = create_storage_dir()
+    members_data = MemberRoster().generate(members_num)
+    manifest = generate_batch(
+        interchanges,
+        segments,
+        members_data,
+        path=file_path,
+        processes=EDI_PROCESS_COUNT,
+    )
+    filename = file_group_archive(manifest, archive)
+    if Path(filename).exists():
+        return FileResponse(path=filename, filename=filename.split("/")[-1])
+    else:
+        raise HTTPException(
+            status_code=404, detail=f"File with path: {filename} not found"
+        )
+
+
 @app.post("/provider_group/")
 async def post_provider_group(provider_group_data: ProviderGroupData):
     filename = await create_provider_group_with_providers_and_facilities(
@@ -348,13 +454,19 @@ async def get_rt_eligibility_data(rt_eligibility: RTEligibility):
         entries_number=rt_eligibility.members_count,
         load_type=rt_eligibility.load_type,
         optional_fields=rt_eligibility.optional_fields,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_eligibility.seed,
     )
-    generator.generate_all_schemas()
-    filename = generator.schemas_to_file(filepath=create_storage_dir())
+    filename, media_type = write_rt_file(generator, rt_eligibility)
 
     if Path(filename).exists():
         return FileResponse(
-            path=filename, filename=filename.split("/")[-1], media_type="text/csv"
+            path=filename,
+            filename=filename.split("/")[-1],
+            media_type=media_type,
+            # the base_file of the next delta load
+            headers={"X-Stored-File": storage_path(filename)},
         )
     else:
         raise HTTPException(
@@ -362,6 +474,43 @@ async def get_rt_eligibility_data(rt_eligibility: RTEligibility):
         )
 
 
+@app.post("/rt_eligibility_delta/")
+async def get_rt_eligibility_delta_data(rt_delta: RTEligibilityDeltaModel):
+    storage_dir = create_storage_dir()
+    base = stored_file(rt_delta.base_file)
+    index_path = (
+        base if base.suffix == ".npy" else base.with_name(f"{base.name}.members.npy")
+    )
+    if index_path.exists():
+        index = member_index(index_path)
+    elif base.exists():
+        index = member_index(base)
+        index.save(index_path)
+    else:
+        raise HTTPException(
+            status_code=404, detail=f"File with path: {base} not found"
+        )
+    generator = RTEligibilityDelta(
+        index,
+        churn_rate=rt_delta.churn_rate,
+        load_type=rt_delta.load_type,
+        optional_fields=rt_delta.optional_fields,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_delta.seed,
+    )
+    generator.generate_all_schemas()
+    filename = generator.schemas_to_file(filepath=storage_dir)
+    # index of the population after this load, the base of the next delta
+    next_index = generator.updated_member_index().save(f"{filename}.members.npy")
+    return FileResponse(
+        path=filename,
+        filename=filename.split("/")[-1],
+        media_type="text/csv",
+        headers={"X-Member-Index": storage_path(next_index)},
+    )
+
+
 @app.post("/rt_claim_data/")
 async def get_rt_claim_data(rt_claim: RTClaim):
     generator = RTClaimData(
@@ -369,13 +518,22 @@ async def get_rt_claim_data(rt_claim: RTClaim):
         optional_fields=rt_claim.optional_fields,
         claim_level_record_count=rt_claim.claim_level_record_count,
         claim_line_level_record_count=rt_claim.claim_line_level_record_count,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_claim.seed,
+        line_counts=line_count_distribution(
+            rt_claim.claim_line_count_distribution,
+            rt_claim.claim_line_level_record_count,
+        ),
+        status_weights=(
+            claim_status_weights() if rt_claim.weighted_status_codes else None
+        ),
     )
-    generator.generate_all_schemas()
-    filename = generator.schemas_to_file(filepath=create_storage_dir())
+    filename, media_type = write_rt_file(generator, rt_claim)
 
     if Path(filename).exists():
         return FileResponse(
-            path=filename, filename=filename.split("/")[-1], media_type="text/csv"
+            path=filename, filename=filename.split("/")[-1], media_type=media_type
         )
     else:
         raise HTTPException(
@@ -385,17 +543,28 @@ async def get_rt_claim_data(rt_claim: RTClaim):
 
 @app.post("/rt_standard_benefit_entity_data/")
 async def get_rt_eligibility_data(rt_standard_benefit_entity: RTStandardBenefitEntity):
+    entities = entity_catalog(
+        rt_standard_benefit_entity.members_count, rt_standard_benefit_entity.seed
+    )
     generator = RTStandardBenefitEntityData(
         entries_number=rt_standard_benefit_entity.members_count,
         load_type=rt_standard_benefit_entity.load_type,
         optional_fields=rt_standard_benefit_entity.optional_fields,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_standard_benefit_entity.seed,
+        entity_catalog=entities,
     )
-    generator.generate_all_schemas()
-    filename = generator.schemas_to_file(filepath=create_storage_dir())
+    filename, media_type = write_rt_file(generator, rt_standard_benefit_entity)
 
     if Path(filename).exists():
+        # entities individual usage files can reference
+        catalog = entities.save(f"{filename}.entities.npy")
         return FileResponse(
-            path=filename, filename=filename.split("/")[-1], media_type="text/csv"
+            path=filename,
+            filename=filename.split("/")[-1],
+            media_type=media_type,
+            headers={"X-Entity-Catalog": storage_path(catalog)},
         )
     else:
         raise HTTPException(
@@ -409,13 +578,16 @@ async def get_rt_plan_benefit_data(rt_plan_benefit: RTPlanBenefit):
         entries_number=rt_plan_benefit.members_count,
         load_type=rt_plan_benefit.load_type,
         optional_fields=rt_plan_benefit.optional_fields,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_plan_benefit.seed,
+        plan_count=rt_plan_benefit.plan_count,
     )
-    generator.generate_all_schemas()
-    filename = generator.schemas_to_file(filepath=create_storage_dir())
+    filename, media_type = write_rt_file(generator, rt_plan_benefit)
 
     if Path(filename).exists():
         return FileResponse(
-            path=filename, filename=filename.split("/")[-1], media_type="text/csv"
+            path=filename, filename=filename.split("/")[-1], media_type=media_type
         )
     else:
         raise HTTPException(
@@ -427,17 +599,28 @@ async def get_rt_plan_benefit_data(rt_plan_benefit: RTPlanBenefit):
 async def get_rt_individual_usage_benefit_data(
     rt_individual_usage_benefit: RTIndividualUsageBenefit
 ):
+    entities = None
+    if rt_individual_usage_benefit.entity_catalog:
+        catalog = stored_file(rt_individual_usage_benefit.entity_catalog)
+        if not catalog.exists():
+            raise HTTPException(
+                status_code=404, detail=f"File with path: {catalog} not found"
+            )
+        entities = EntityCatalog.load(catalog)
     generator = RTIndividualUsageBenefitData(
         entries_number=rt_individual_usage_benefit.members_count,
         load_type=rt_individual_usage_benefit.load_type,
         optional_fields=rt_individual_usage_benefit.optional_fields,
+        chunk_size=RT_CHUNK_SIZE,
+        processes=RT_PROCESS_COUNT,
+        seed=rt_individual_usage_benefit.seed,
+        entity_catalog=entities,
     )
-    generator.generate_all_schemas()
-    filename = generator.schemas_to_file(filepath=create_storage_dir())
+    filename, media_type = write_rt_file(generator, rt_individual_usage_benefit)
 
     if Path(filename).exists():
         return FileResponse(
-            path=filename, filename=filename.split("/")[-1], media_type="text/csv"
+            path=filename, filename=filename.split("/")[-1], media_type=media_type
         )
     else:
         raise HTTPException(
@@ -445,13 +628,51 @@ async def get_rt_individual_usage_benefit_data(
         )
 
 
+def write_rt_file(generator, rt_request):
+    """
+    Generate an RT file, or a zipped file group when the request sets
+    max_rows or max_bytes.
+    :return: path of the file and its media type
+    """
+    generator.generate_all_schemas()
+    if rt_request.max_rows or rt_request.max_bytes:
+        manifest = generator.schemas_to_file_group(
+            filepath=create_storage_dir(),
+            max_rows=rt_request.max_rows,
+            max_bytes=rt_request.max_bytes,
+        )
+        return file_group_archive(manifest), "application/zip"
+    return generator.schemas_to_file(filepath=create_storage_dir()), "text/csv"
+
+
 def create_storage_dir():
     now = datetime.now()
-    file_path = f"/tmp/data/{now.year}/{now.month}/{now.day}/"
+    file_path = f"{DATA_DIR}/{now.year}/{now.month}/{now.day}/"
     Path(file_path).mkdir(parents=True, exist_ok=True)
     return file_path
 
 
+def storage_path(path):
+    """:return: path of a written file relative to DATA_DIR, as given back"""
+    return str(Path(path).resolve().relative_to(Path(DATA_DIR).resolve()))
+
+
+def stored_file(path):
+    """
+    File written by an earlier request, on any day.
+    :param path: path relative to DATA_DIR, e.g. an X-Member-Index header
+    :return: absolute Path inside DATA_DIR
+    """
+    root = Path(DATA_DIR).resolve()
+    stored = (root / path).resolve()
+    if not stored.is_relative_to(root):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File path {path} is outside of the storage directory",
+        )
+    return stored
+
+
 if __name__ == "__main__":
     """
     Start me in cli:
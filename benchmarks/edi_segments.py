@@ -0,0 +1,29 @@
+"""
+EDI 837 build throughput in segments per second.
+
+Members are generated once up front so only segment building is timed. Run
+from the repository root:
+    python -m benchmarks.edi_segments 20000
+"""
+import sys
+import time
+
+from generate_edi import EDI
+from generate_raw_data import MemberRoster
+
+MEMBERS = 200
+
+
+def segments_per_second(claims, members):
+    edi = EDI()
+    start = time.perf_counter()
+    document = edi.generate(claims, members)
+    elapsed = time.perf_counter() - start
+    return "".join(document).count("~") / elapsed
+
+
+if __name__ == "__main__":
+    claims = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    roster = MemberRoster(processes_number=1)
+    members = [roster.member_schema(number) for number in range(MEMBERS)]
+    print(f"{claims} claims  {segments_per_second(claims, members):>12,.0f} segments/s")
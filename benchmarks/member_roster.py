@@ -0,0 +1,32 @@
+"""
+Member roster throughput in members per second, as dicts (``generate``) and
+written to csv (``write_csv``). Run from the repository root:
+    python -m benchmarks.member_roster 50000 4
+"""
+import os
+import sys
+import tempfile
+import time
+
+from generate_raw_data import MemberRoster
+
+
+def members_per_second(roster, members_num):
+    start = time.perf_counter()
+    roster.generate(members_num)
+    generate = members_num / (time.perf_counter() - start)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        roster.write_csv(os.path.join(directory, "members.csv"), members_num)
+        write_csv = members_num / (time.perf_counter() - start)
+    return generate, write_csv
+
+
+if __name__ == "__main__":
+    members_num = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    generate, write_csv = members_per_second(MemberRoster(processes), members_num)
+    print(
+        f"{members_num} members"
+        f"  generate {generate:>10,.0f}/s  csv {write_csv:>10,.0f}/s"
+    )
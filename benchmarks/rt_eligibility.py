@@ -0,0 +1,25 @@
+"""
+Rows/sec benchmark for RT eligibility detail generation.
+
+Run from the repository root:
+    python -m benchmarks.rt_eligibility 10000 100000 1000000
+"""
+import sys
+import time
+
+from generate_rt_eligibility_data import RTEligibbility
+
+
+def rows_per_second(entries_number, optional_fields=True):
+    generator = RTEligibbility(entries_number, "F", optional_fields)
+    start = time.perf_counter()
+    generator.generate_all_schemas()
+    return entries_number / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for size in sizes:
+        for optional_fields in (False, True):
+            rate = rows_per_second(size, optional_fields)
+            print(f"{size:>9} rows  optional={optional_fields!s:<5}  {rate:>12,.0f} rows/s")
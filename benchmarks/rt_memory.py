@@ -0,0 +1,60 @@
+"""
+Peak RSS per million detail rows of a materialized (non-streaming) RT
+schema, for every RT file type, plus the bytes the columns themselves take.
+
+Every file type runs in a fresh process so peaks do not carry over. Run from
+the repository root:
+    python -m benchmarks.rt_memory 200000
+"""
+import resource
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from benchmarks.rt_write import generators
+
+
+def _peak_rss_mib():
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _schemas(generator):
+    return [
+        getattr(generator, name)
+        for name in (
+            "detail_schema",
+            "claim_status_schema",
+            "line_schema",
+            "line_status_schema",
+        )
+        if hasattr(generator, name)
+    ]
+
+
+def measure(name, entries_number):
+    """
+    :return: peak RSS growth in MiB and column bytes of one file type
+    """
+    generator = generators(entries_number)[name]
+    baseline = _peak_rss_mib()
+    generator.generate_all_schemas()
+    column_bytes = sum(
+        column.nbytes for schema in _schemas(generator) for column in schema.values()
+    )
+    return _peak_rss_mib() - baseline, column_bytes, generator.record_count
+
+
+if __name__ == "__main__":
+    entries_number = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for name in generators(0):
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            peak, column_bytes, records = pool.submit(
+                measure, name, entries_number
+            ).result()
+        per_million = 1e6 / records
+        print(
+            f"{name:<6} {records:>9} rows  "
+            f"peak RSS {peak * per_million:>8,.0f} MiB/M rows  "
+            f"columns {column_bytes * per_million / 2**20:>8,.0f} MiB/M rows"
+        )
@@ -0,0 +1,34 @@
+"""
+Validation and offset-index throughput (MB/s) of the memory-mapped RT reader.
+
+Run from the repository root:
+    python -m benchmarks.rt_read 1000000
+"""
+import os
+import sys
+import tempfile
+import time
+
+from generate_rt_eligibility_data import RTEligibbility
+from generator_helpers.rt_reader import RTFileReader
+
+
+def megabytes_per_second(filename, action):
+    start = time.perf_counter()
+    with RTFileReader(filename, RTEligibbility) as reader:
+        action(reader)
+    return os.path.getsize(filename) / (time.perf_counter() - start) / 1e6
+
+
+if __name__ == "__main__":
+    entries_number = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    generator = RTEligibbility(entries_number, "F", True, chunk_size=50_000)
+    generator.generate_all_schemas()
+    with tempfile.TemporaryDirectory() as directory:
+        filename = generator.schemas_to_file(directory)
+        for name, action in [
+            ("validate", RTFileReader.validate),
+            ("offsets", RTFileReader.record_offsets),
+        ]:
+            rate = megabytes_per_second(filename, action)
+            print(f"{name:<9} {entries_number:>9} rows  {rate:>8,.1f} MB/s")
@@ -0,0 +1,46 @@
+"""
+Write throughput (MB/s) of ``schemas_to_file`` for every RT file type.
+
+Detail records are generated up front so only serialization and I/O are
+timed. Run from the repository root:
+    python -m benchmarks.rt_write 100000
+"""
+import os
+import sys
+import tempfile
+import time
+
+from generate_rt_claim_data import RTClaimData
+from generate_rt_eligibility_data import RTEligibbility
+from generate_rt_individual_usage_benefit_data import RTIndividualUsageBenefitData
+from generate_rt_plan_benefit_data import RTPlanBenefitData
+from generate_rt_standart_benefit_entity_data import RTStandardBenefitEntityData
+
+CLAIM_LINES = 4
+
+
+def generators(entries_number, optional_fields=True):
+    claims = entries_number // (2 + 2 * CLAIM_LINES)
+    return {
+        "elig": RTEligibbility(entries_number, "F", optional_fields),
+        "cstat": RTClaimData("F", optional_fields, claims, CLAIM_LINES),
+        "plan": RTPlanBenefitData(entries_number, "F", optional_fields),
+        "indi": RTIndividualUsageBenefitData(entries_number, "F", optional_fields),
+        "bene": RTStandardBenefitEntityData(entries_number, "F", optional_fields),
+    }
+
+
+def megabytes_per_second(generator):
+    generator.generate_all_schemas()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        filename = generator.schemas_to_file(directory)
+        elapsed = time.perf_counter() - start
+        return os.path.getsize(filename) / elapsed / 1e6
+
+
+if __name__ == "__main__":
+    entries_number = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for name, generator in generators(entries_number).items():
+        rate = megabytes_per_second(generator)
+        print(f"{name:<6} {entries_number:>9} rows  {rate:>8,.1f} MB/s")
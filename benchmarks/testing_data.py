@@ -0,0 +1,41 @@
+"""
+Onsite testing data csv throughput, columns generation and csv writing timed
+separately. Run from the repository root:
+    python -m benchmarks.testing_data 1000000
+"""
+import sys
+import tempfile
+import time
+import types
+
+from generate_testing_data import TestingData
+from generator_helpers.column_csv import write_csv
+
+
+def onsite(entries):
+    return TestingData(
+        types.SimpleNamespace(
+            entries=entries,
+            banana_email=False,
+            patient_last_name=None,
+            patient_first_name=None,
+            patient_dob=None,
+            patient_phone=None,
+            patient_email=None,
+        )
+    )
+
+
+if __name__ == "__main__":
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    start = time.perf_counter()
+    columns = onsite(entries).columns()
+    generated = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        write_csv(f"{directory}/onsite.csv", columns)
+        written = time.perf_counter() - start
+    print(
+        f"{entries} entries  columns {generated:6.2f} s  csv {written:6.2f} s"
+        f"  total {generated + written:6.2f} s"
+    )
@@ -0,0 +1,33 @@
+"""
+Time to first record of a fresh generator pool: a one member request on a
+new pool, per worker start method. The first request of a start method pays
+for starting its forkserver, later ones only for forking workers. Run from
+the repository root:
+    python -m benchmarks.worker_startup 4
+"""
+import sys
+import time
+
+from core.constants import WORKER_POOL_SIZE
+from generate_raw_data import MemberRoster
+from generator_helpers import worker_pool
+
+
+def first_record_seconds(method, processes, requests=5):
+    worker_pool.WORKER_START_METHOD, worker_pool._context = method, None
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        MemberRoster(processes).generate(1)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+if __name__ == "__main__":
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else WORKER_POOL_SIZE
+    for method in ("spawn", "fork", "forkserver"):
+        first, *warm = first_record_seconds(method, processes)
+        print(
+            f"{method:>10}  first {first * 1000:8.1f} ms"
+            f"  then {sum(warm) / len(warm) * 1000:8.1f} ms"
+        )
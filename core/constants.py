@@ -1,4 +1,6 @@
 """Application-wide constants."""
+import os
+import sys
 
 # API metadata
 API_TITLE = "Clinical Data Generator"
@@ -18,6 +20,20 @@ DEFAULT_SEGMENTS_COUNT = 1
 # Multiprocessing
 DEFAULT_PROCESS_COUNT = 8
 
+# Worker processes of the pool the API shares between the member and vaccine
+# patient generators for its whole lifetime
+WORKER_POOL_SIZE = int(os.getenv("WORKER_POOL_SIZE", os.cpu_count() or 1))
+
+# Start method of the generator workers: fork on Linux, the platform default
+# elsewhere. With "forkserver" (opt-in, e.g. for the API) they are forked from
+# a template process that imported WORKER_PRELOAD_MODULES and ran their
+# ``preload`` function once; scripts then need an ``if __name__ == "__main__"``
+# guard, the workers import the main module
+WORKER_START_METHOD = os.getenv(
+    "WORKER_START_METHOD", "fork" if sys.platform.startswith("linux") else None
+)
+WORKER_PRELOAD_MODULES = ("generate_raw_data",)
+
 # Vaccine types
 SUPPORTED_VACCINE_TYPES = [
     "Pfizer",
@@ -39,6 +55,28 @@ SUPPORTED_TEST_TYPES = [
 # Load types for RT data
 RT_LOAD_TYPES = ["F", "I", "D"]  # Full, Incremental, Delta
 
+# Detail rows generated and written at a time by the RT file writers
+RT_CHUNK_SIZE = 50_000
+
+# Rows rendered and written at a time by the columnar csv writer
+CSV_CHUNK_SIZE = 20_000
+
+# Worker processes generating RT detail chunks in parallel
+RT_PROCESS_COUNT = os.cpu_count() or 1
+
+# Root of the files written by the API, one directory per day below it
+DATA_DIR = os.getenv("DATA_DIR", "/tmp/data")
+
+# Shared counter files of the EDI interchange/group/transaction set control
+# numbers, and numbers a process reserves per counter file lock
+EDI_CONTROL_NUMBER_DIR = os.getenv(
+    "EDI_CONTROL_NUMBER_DIR", "/tmp/data/edi_control_numbers"
+)
+EDI_CONTROL_NUMBER_BLOCK = 100
+
+# Worker processes writing the interchanges of an EDI batch
+EDI_PROCESS_COUNT = os.cpu_count() or 1
+
 # Media types
 MEDIA_TYPE_CSV = "text/csv"
 MEDIA_TYPE_JSON = "application/json"
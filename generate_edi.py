@@ -1,9 +1,25 @@
 import csv
+import json
+import os
 import random
 
 from datetime import date, timedelta, datetime
 from pathlib import Path
-from string import Template
+
+from core.constants import EDI_CONTROL_NUMBER_DIR
+from core.exceptions import InvalidGeneratorConfigError
+
+from generator_helpers.control_numbers import control_numbers as shared_control_numbers
+from generator_helpers.edi_templates import segment_templates
+from generator_helpers.worker_pool import (
+    bounded_imap,
+    run_state,
+    task_state,
+    worker_pool,
+)
+
+SEGMENT_TERMINATOR = "~"
+WRITE_BUFFER_SIZE = 2**20
 
 
 class EDI:
@@ -12,9 +28,17 @@ class EDI:
     :param templates_dir_path: path where edi tamplates exist and used for valid data conversion
     :param csv_dir_path: path, where we import member csv files for conversion
     :param edi_dir_path: path, where we store converted edi files in *.txt format
+    :param control_numbers: ControlNumbers the ISA/GS/ST control numbers are
+        allocated from, the process-wide counters by default
     """
 
-    def __init__(self, templates_dir_path=None, csv_dir_path=None, edi_dir_path=None):
+    def __init__(
+        self,
+        templates_dir_path=None,
+        csv_dir_path=None,
+        edi_dir_path=None,
+        control_numbers=None,
+    ):
         workdir = Path.cwd()
         templates_dir_path = Path(f"{workdir}/templates/edi")
         csv_dir_path = Path(f"{workdir}/csv")
@@ -26,82 +50,97 @@ class EDI:
         self.TEMPLATE_BASE = templates_dir_path
         self.CSV_BASE = csv_dir_path
         self.EDI_BASE = edi_dir_path
-
-    control_number: str = "7501" + str(random.randrange(10000, 99999))
-    message_date = (datetime.now() - timedelta(days=random.randrange(3, 15))).strftime(
-        "%Y%m%d"
-    )
-    short_message_date = (
-        datetime.now() - timedelta(days=random.randrange(3, 15))
-    ).strftime("%y%m%d")
-    message_time = str(random.randrange(10, 23)) + str(random.randrange(10, 59))
-    message_group_control = str(random.randrange(1001, 9999))
-    current_segment = random.randrange(1001, 9999)
+        self.templates = segment_templates(templates_dir_path)
+
+        # one interchange per instance, numbers are unique across processes
+        self.control_numbers = control_numbers or shared_control_numbers()
+        self.control_number = self.control_numbers.interchange()
+        self.message_group_control = self.control_numbers.group()
+        self.message_date = (
+            datetime.now() - timedelta(days=random.randrange(3, 15))
+        ).strftime("%Y%m%d")
+        self.short_message_date = (
+            datetime.now() - timedelta(days=random.randrange(3, 15))
+        ).strftime("%y%m%d")
+        self.message_time = str(random.randrange(10, 23)) + str(
+            random.randrange(10, 59)
+        )
 
     def read_csv_file(self, path):
         return [el for el in csv.DictReader(open(path, "r"))]
 
     def generate(self, segments_num, members_data, edidata=None):
+        return list(self.segments(segments_num, members_data, edidata))
+
+    def segments(self, segments_num, members_data, edidata=None):
+        """
+        Build an 837 interchange lazily: template outputs are yielded as soon
+        as they are built, SE segment counts and the GE transaction set count
+        are kept incrementally, so memory does not grow with ``segments_num``.
+        :param segments_num: number of transaction sets (claims)
+        :param members_data: list of members the subscribers are picked
+            from at random, or an iterator of members (e.g.
+            ``MemberRoster.stream``) consumed one per transaction set
+        :param edidata: EdiData overriding subscriber and claim values
+        :return: generator of segment strings
+        """
+        members = self._subscriber_members(members_data)
+        self.templates.refresh()
         # edi start
-        edi = [self.buildISASegement(), self.buildGSSegment()]
+        yield self.buildISASegement()
+        yield self.buildGSSegment()
         # loop
-        segment_count = 0
+        transaction_sets = 0
         for _ in range(segments_num):
             message_date = (
                 datetime.now() - timedelta(days=random.randrange(3, 15))
             ).strftime("%Y%m%d")
-            # short_message_date = (
-            #     datetime.now() - timedelta(days=random.randrange(3, 15))
-            # ).strftime("%y%m%d")
             message_time = str(random.randrange(10, 23)) + str(random.randrange(10, 59))
-            # message_group_control = str(random.randrange(1001, 9999))
-            current_segment = random.randrange(1001, 9999)
+            current_segment = self.control_numbers.transaction()
             mrn = (
                 str(random.randrange(1001, 9999))
                 + "-"
                 + str(random.randrange(1001, 9999))
             )
 
-            # Generate BHT
-            edi.extend(
-                [
-                    self.buildSTSegment(current_segment),
-                    # Generate an ass ton of encounters
-                    self.buildBHTSegment(mrn, message_time, message_date),
-                    # Generate Loop 2000A - Billing Provider
-                    self.buildProviderSegment(),
-                ]
+            transaction = [
+                self.buildSTSegment(current_segment),
+                # Generate BHT
+                self.buildBHTSegment(mrn, message_time, message_date),
+                # Generate Loop 2000A - Billing Provider
+                self.buildProviderSegment(),
+                # Generate Loop 2000B - Subscriber
+                self.buildSubscriberSegment(
+                    [next(members)], edidata.subscriber if edidata else None
+                ),
+                # Generate Loop 2300 - Claim Information
+                self.buildClaimsSegment(
+                    mrn, message_time, edidata.claim if edidata else None
+                ),
+            ]
+            yield from transaction
+            # Generate SE, counted segments run from ST to SE included
+            yield self.buildSESegment(
+                current_segment,
+                sum(part.count(SEGMENT_TERMINATOR) for part in transaction) + 1,
             )
-            if edidata:
-                edi.extend(
-                    [
-                        # Generate Loop 2000B - Subscriber
-                        self.buildSubscriberSegment(members_data, edidata.subscriber),
-                        # Generate Loop 2300 - Claim Information
-                        self.buildClaimsSegment(mrn, message_time, edidata.claim),
-                    ]
-                )
-            else:
-                edi.extend(
-                    [
-                        # Generate Loop 2000B - Subscriber
-                        self.buildSubscriberSegment(members_data),
-                        # Generate Loop 2300 - Claim Information
-                        self.buildClaimsSegment(mrn, message_time),
-                    ]
-                )
-            # Generate SE
-            edi.extend([self.buildSESegment(current_segment)])
+            transaction_sets += 1
 
         # edi end
-
-        edi.extend(
-            [
-                self.buildGESegment(self.message_group_control, segment_count),
-                self.buildIEASegment(),
-            ]
+        yield self.buildGESegment(self.message_group_control, transaction_sets)
+        yield self.buildIEASegment()
+
+    @staticmethod
+    def _subscriber_members(members_data):
+        """Member of every transaction set."""
+        if isinstance(members_data, list):
+            while True:
+                yield random.choice(members_data)
+        for member in members_data:
+            yield member
+        raise InvalidGeneratorConfigError(
+            "member stream ended before the last transaction set"
         )
-        return edi
 
     def buildISASegement(self):
         # banana CARE is 719689, banana direct is 66066
@@ -114,8 +153,7 @@ class EDI:
         }
 
         # load the ISA template and merge
-        isaString = self.loadFileTemplate("ISA.txt")
-        isaSection = Template(isaString).substitute(isa_schema)
+        isaSection = self.templates.render("ISA.txt", isa_schema)
 
         return isaSection
 
@@ -129,8 +167,7 @@ class EDI:
             "control_group": self.message_group_control,
         }
 
-        gsString = self.loadFileTemplate("GS.txt")
-        gsSection = Template(gsString).substitute(gs_schema)
+        gsSection = self.templates.render("GS.txt", gs_schema)
 
         return gsSection
 
@@ -141,16 +178,14 @@ class EDI:
         }
 
         # load the GE template and merge
-        geString = self.loadFileTemplate("GE.txt")
-        geSection = Template(geString).substitute(ge_schema)
+        geSection = self.templates.render("GE.txt", ge_schema)
 
         return geSection
 
     def buildIEASegment(self,):
         iea_schema = {"control_group": self.control_number}
 
-        ieaString = self.loadFileTemplate("IEA.txt")
-        ieaSection = Template(ieaString).substitute(iea_schema)
+        ieaSection = self.templates.render("IEA.txt", iea_schema)
 
         return ieaSection
 
@@ -158,8 +193,7 @@ class EDI:
         st_schema = {"segment_number": current_segment}
 
         # load the ISA template and merge
-        stString = self.loadFileTemplate("ST.txt")
-        stSection = Template(stString).substitute(st_schema)
+        stSection = self.templates.render("ST.txt", st_schema)
 
         return stSection
 
@@ -167,8 +201,7 @@ class EDI:
         bht_schema = {"time": message_time, "date": message_date, "mrn": mrn_number}
 
         # load the BHT template and merge
-        bhtString = self.loadFileTemplate("BHT.txt")
-        bhtString = Template(bhtString).substitute(bht_schema)
+        bhtString = self.templates.render("BHT.txt", bht_schema)
 
         return bhtString
 
@@ -180,7 +213,7 @@ class EDI:
         # provider_dict["mrn"] = mrn_number
 
         # load the BHT template and merge
-        providerString = self.loadFileTemplate("Provider.txt")
+        providerString = self.templates.text("Provider.txt")
         # providerString = Template(providerString).substitute(provider_dict)
 
         return providerString
@@ -213,8 +246,7 @@ class EDI:
             if v is None:
                 subscriber_dict[k] = subscriber_dict_base[k]
 
-        subscriberString = self.loadFileTemplate("Subscriber.txt")
-        subscriberString = Template(subscriberString).substitute(subscriber_dict)
+        subscriberString = self.templates.render("Subscriber.txt", subscriber_dict)
         return subscriberString
 
     def buildClaimsSegment(self, mrn_number, message_time, claim_data=None):
@@ -275,35 +307,101 @@ class EDI:
         claims_schema["mrn_sum"] = (
             claims_schema["service_price"] + claims_schema["procedure_price"]
         )
-        claimsString = self.loadFileTemplate("Claim.txt")
-        claimsString = Template(claimsString).substitute(claims_schema)
+        claimsString = self.templates.render("Claim.txt", claims_schema)
 
         return claimsString
 
-    def buildSESegment(self, current_segment):
+    def buildSESegment(self, current_segment, segment_count):
         se_schema = {
             "segment_number": current_segment,
-            "segment_count": random.randrange(20, 32),
+            "segment_count": segment_count,
         }
 
         # load the ISA template and merge
-        seString = self.loadFileTemplate("SE.txt")
-        seSection = Template(seString).substitute(se_schema)
+        seSection = self.templates.render("SE.txt", se_schema)
 
         return seSection
 
     def writeEDIDocument(self, segment_list, path=None):
+        """
+        :param segment_list: list of segments, or the ``segments`` generator
+            to stream them to disk through a buffered file
+        """
         path = path if path else self.EDI_BASE
-        document_string = "".join(segment_list)
         edi_file_name = f"{path}/{self.control_number}.txt"
-        edi_file = open(edi_file_name, "w+")
-        edi_file.write(document_string)
-        edi_file.close()
+        with open(edi_file_name, "w+", buffering=WRITE_BUFFER_SIZE) as edi_file:
+            for segment in segment_list:
+                edi_file.write(segment)
         return edi_file_name
 
     def loadFileTemplate(self, fileName):
-        with open(f"{self.TEMPLATE_BASE}/{fileName}", "r") as file:
-            return file.read()
+        return self.templates.text(fileName)
+
+
+def _write_interchange(settings, segments_num):
+    """
+    Write one interchange, returns its manifest entry.
+    :param settings: (members_data, path, control_directory) of the batch
+    """
+    members_data, path, control_directory = settings
+    edi = EDI(control_numbers=shared_control_numbers(control_directory))
+    filename = edi.writeEDIDocument(edi.segments(segments_num, members_data), path=path)
+    return {
+        "file_name": Path(filename).name,
+        "interchange_control_number": edi.control_number,
+        "group_control_number": edi.message_group_control,
+        "transaction_sets": segments_num,
+        "size": Path(filename).stat().st_size,
+    }
+
+
+def _interchange_worker(task):
+    """:param task: (task_state of the batch settings, segments_num)"""
+    state, segments_num = task
+    return _write_interchange(run_state(state), segments_num)
+
+
+def generate_batch(
+    interchanges,
+    segments_num,
+    members_data,
+    path,
+    processes=1,
+    control_directory=EDI_CONTROL_NUMBER_DIR,
+):
+    """
+    Write ``interchanges`` independent 837 files, one interchange each,
+    ``processes`` at a time on the worker pool when ``processes > 1``.
+    Control numbers come from the shared counters, so files never collide
+    with other batches or workers.
+    :param segments_num: transaction sets (claims) per interchange
+    :param members_data: members the subscribers are picked from
+    :param path: output directory
+    :param control_directory: directory of the control number counters
+    :return: path of the JSON manifest listing the files
+    """
+    Path(path).mkdir(parents=True, exist_ok=True)
+    settings = (members_data, path, control_directory)
+    processes = min(processes, interchanges)
+    if processes <= 1:
+        entries = [
+            _write_interchange(settings, segments_num) for _ in range(interchanges)
+        ]
+    else:
+        with task_state(settings) as state, worker_pool(processes) as pool:
+            tasks = [(state, segments_num)] * interchanges
+            entries = list(bounded_imap(pool, _interchange_worker, tasks, processes))
+
+    manifest = {
+        "interchange_count": interchanges,
+        "transaction_set_count": interchanges * segments_num,
+        "files": entries,
+    }
+    name = f"edi_batch_{datetime.now():%Y%m%d%H%M%S}_{os.getpid()}"
+    manifest_path = f"{path}/{name}.manifest.json"
+    with open(manifest_path, "w") as file:
+        json.dump(manifest, file, indent=2)
+    return manifest_path
 
 
 # Press the green button in the gutter to run the script.
@@ -1,19 +1,79 @@
+import os
 import random
 import uuid
 import csv
-from multiprocessing import Pool
 from mimesis import Person, Finance, Address
 from generator_helpers import date_generator
+from generator_helpers.column_batch import batch_dicts, batch_rows, pack_columns
+from generator_helpers.shared_batches import shared_batches
+from generator_helpers.worker_pool import worker_pool
 import datetime
 from pathlib import Path
 
+# members generated per pool task
+MEMBER_BATCH_SIZE = 2_000
 
-def generate_address():
+ADDRESS_FIELDS = (
+    "primary_address_line1",
+    "primary_address_line2",
+    "primary_address_city",
+    "primary_address_state",
+    "primary_address_zipcode",
+)
+
+# member columns, in the order of the csv files
+MEMBER_FIELDS = (
+    "identity_id",
+    "last_name",
+    "first_name",
+    "middle_name",
+    "gender",
+    "birth_date",
+    "ssn",
+    "mobile_phone_number",
+    "home_phone_number",
+    "ethnicity",
+    *ADDRESS_FIELDS,
+    "email",
+    "Sponsor",
+    "Plan",
+    "banana ID",
+    "Note",
+)
+
+# mimesis providers of the process, building them (locale data) costs far
+# more than the values of a member; a forked worker reseeds the providers it
+# inherited, never replaying the random state of its parent
+_providers = {}
+
+
+def _mimesis_providers():
+    providers = _providers.get("providers")
+    if providers is None:
+        providers = (Person("en"), Finance("en"), Address("en"))
+        _providers["providers"] = providers
+    elif _providers["pid"] != os.getpid():
+        for provider in providers:
+            provider.reseed(None)
+    _providers["pid"] = os.getpid()
+    return providers
+
+
+def preload():
+    """
+    Build the providers of the module ahead of the first record, in the
+    template process generator workers are forked from.
+    """
+    _mimesis_providers()
+
+
+def generate_address(address=None):
     """
     generate data that can be used by account, member, etc
+    :param address: mimesis Address provider, a new one if None
     :return:
     """
-    address = Address("en")
+    address = address or Address("en")
 
     address_schema = {
         "primary_address_line1": address.address(),
@@ -26,6 +86,19 @@ def generate_address():
     return address_schema
 
 
+def batch_sizes(total, batch_size, processes):
+    """
+    :return: list of the sizes of the batches of ``total`` rows, at most
+        ``batch_size`` rows each but spread over the processes when few
+    """
+    batch_size = max(1, min(batch_size, -(-total // processes)))
+    return [min(batch_size, total - start) for start in range(0, total, batch_size)]
+
+
+def _phone_number():
+    return f"({random.randint(111, 999)}) {random.randint(111, 999)}-{random.randint(1111, 9999)}"
+
+
 class MemberRoster:
     """
     Used to generate data for EDI file for adjudication.
@@ -36,37 +109,80 @@ class MemberRoster:
         self.processes_number = processes_number
 
     def member_schema(self, _):
-        fake_person = Person("en")
-        fake_businees = Finance("en")
         """
-        Values that are commented are not yet needed for use.
         :return: data for 1 member according to edi converter required values
         """
-        first_name = fake_person.first_name()
-        last_name = fake_person.last_name()
-        company = fake_businees.company()
-        member_schema = {
-            "identity_id": f"{uuid.uuid4()}",
-            "last_name": last_name,
-            "first_name": first_name,
-            "middle_name": f"{random.choice(['A', 'B', 'C', 'D', 'Z'])}",
-            "gender": random.choice(["Male", "Female"]),
-            "birth_date": date_generator.date_time_between(start_date="-90y").strftime(
-                "%m/%d/%Y"
+        return {name: values[0] for name, values in self._member_columns(1).items()}
+
+    def _member_columns(self, size):
+        """
+        Values of ``size`` members, column by column, with the providers of
+        the process.
+        :return: dict of field name -> list of values, in MEMBER_FIELDS order
+        """
+        person, finance, address = _mimesis_providers()
+        addresses = [generate_address(address) for _ in range(size)]
+        companies = [finance.company() for _ in range(size)]
+        columns = {
+            "identity_id": [f"{uuid.uuid4()}" for _ in range(size)],
+            "last_name": [person.last_name() for _ in range(size)],
+            "first_name": [person.first_name() for _ in range(size)],
+            "middle_name": random.choices(["A", "B", "C", "D", "Z"], k=size),
+            "gender": random.choices(["Male", "Female"], k=size),
+            "birth_date": [
+                date_generator.date_time_between(start_date="-90y").strftime(
+                    "%m/%d/%Y"
+                )
+                for _ in range(size)
+            ],
+            "ssn": [
+                f"{random.randint(111, 999)}-{random.randint(11, 99)}-{random.randint(1111, 9999)}"
+                for _ in range(size)
+            ],
+            "mobile_phone_number": [_phone_number() for _ in range(size)],
+            "home_phone_number": [_phone_number() for _ in range(size)],
+            "ethnicity": random.choices(
+                ["Asian", "Black", "White", "Hispanic"], k=size
             ),
-            "ssn": f"{random.randint(111, 999)}-{random.randint(11, 99)}-{random.randint(1111, 9999)}",
-            "mobile_phone_number": f"({random.randint(111, 999)}) {random.randint(111, 999)}-{random.randint(1111, 9999)}",
-            "home_phone_number": f"({random.randint(111, 999)}) {random.randint(111, 999)}-{random.randint(1111, 9999)}",
-            "ethnicity": random.choice(["Asian", "Black", "White", "Hispanic"]),
-            "email": fake_person.email(domains=["example.com"]),
-            "Sponsor": company,
-            "Plan": "MIGR-10010",
-            "banana ID": random.randint(1111111, 9999999),
-            "Note": random.choice(["Executive, Sponsor", f"Member - {company}"]),
         }
-        member_schema.update(generate_address())
+        for name in ADDRESS_FIELDS:
+            columns[name] = [member_address[name] for member_address in addresses]
+        columns["email"] = [person.email(domains=["example.com"]) for _ in range(size)]
+        columns["Sponsor"] = companies
+        columns["Plan"] = ["MIGR-10010"] * size
+        columns["banana ID"] = [random.randint(1111111, 9999999) for _ in range(size)]
+        columns["Note"] = [
+            random.choice(["Executive, Sponsor", f"Member - {company}"])
+            for company in companies
+        ]
+        return columns
+
+    def _member_batch(self, size):
+        return pack_columns(self._member_columns(size))
 
-        return member_schema
+    def batches(
+        self, members_num, read, batch_size=MEMBER_BATCH_SIZE, buffered_batches=None
+    ):
+        """
+        Generate members as column batches, one pool task per batch, passed to
+        ``read`` straight from the shared memory the workers wrote them to.
+        :param members_num: number of members to generate
+        :param read: function of a batch, see ``shared_batches``
+        :param batch_size: most members per batch
+        :param buffered_batches: batches in flight, twice the processes by
+            default
+        :return: generator of ``read(batch)``
+        """
+        buffered_batches = buffered_batches or 2 * self.processes_number
+        sizes = batch_sizes(members_num, batch_size, self.processes_number)
+        with worker_pool(self.processes_number) as pool:
+            yield from shared_batches(
+                pool,
+                self._member_batch,
+                ((size,) for size in sizes),
+                read,
+                buffered_batches,
+            )
 
     def generate(self, members_num):
         """
@@ -74,9 +190,26 @@ class MemberRoster:
         :param members_num: number of members to generate
         :return: members list ready for use
         """
-        pool = Pool(self.processes_number)
-        result = pool.map(self.member_schema, range(members_num))
-        return result
+        return [
+            member
+            for members in self.batches(members_num, batch_dicts)
+            for member in members
+        ]
+
+    def stream(self, members_num, batch_size=MEMBER_BATCH_SIZE, buffered_batches=None):
+        """
+        Generate members lazily, ``batch_size`` members per pool task; at
+        most ``buffered_batches`` batches are generated ahead of the consumer,
+        so memory stays bounded whatever ``members_num``.
+        :param members_num: number of members to generate
+        :param buffered_batches: batches in flight, twice the processes by
+            default
+        :return: generator of members
+        """
+        for members in self.batches(
+            members_num, batch_dicts, batch_size, buffered_batches
+        ):
+            yield from members
 
     def save_to_csv(self, filename, data_list):
         """
@@ -87,32 +220,38 @@ class MemberRoster:
         :param data_list: list of generated entries
         :return: *.csv file on disk
         """
-        field_names = [
-            "identity_id",
-            "last_name",
-            "first_name",
-            "middle_name",
-            "gender",
-            "birth_date",
-            "ssn",
-            "mobile_phone_number",
-            "home_phone_number",
-            "ethnicity",
-            "primary_address_line1",
-            "primary_address_line2",
-            "primary_address_city",
-            "primary_address_state",
-            "primary_address_zipcode",
-            "email",
-            "Sponsor",
-            "Plan",
-            "banana ID",
-            "Note",
-        ]
-        csv_file = csv.DictWriter(open(f"{filename}", "w+"), field_names)
+        csv_file = csv.DictWriter(open(f"{filename}", "w+"), MEMBER_FIELDS)
         csv_file.writeheader()
         csv_file.writerows(data_list)
 
+    def write_csv(self, filename, members_num):
+        """
+        Generate members straight into a csv file, batch by batch, without
+        building a dict per member.
+        :param filename: name of the file we want to save to.
+        :param members_num: number of members to generate
+        :return: *.csv file on disk
+        """
+        with open(f"{filename}", "w+") as file:
+            csv_file = csv.writer(file)
+            csv_file.writerow(MEMBER_FIELDS)
+            for rows in self.batches(members_num, batch_rows):
+                csv_file.writerows(rows)
+
+
+# vaccined patient columns, in the order of the csv files
+VACCINED_PATIENT_FIELDS = (
+    "Vaccine Administered Date/Time",
+    "Manufacturer",
+    "Email Address",
+    "Date of Birth",
+    "Dose",
+    "First Name",
+    "Last Name",
+    "Full Name",
+    "Patient ID",
+)
+
 
 class VaccinedPatient:
     def __init__(self, entries_number=1, processes_number=8):
@@ -120,29 +259,67 @@ class VaccinedPatient:
         self.entries_number = int(entries_number)
 
     def build_schema(self, _):
-        self.fake = Person("en")
-        vaccine_administered = date_generator.date_time_between(start_date="-3M")
-        dob = date_generator.date_time_between(start_date="-70y", end_date="-15y")
-        schema = {
-            "Vaccine Administered Date/Time": vaccine_administered.strftime(
-                "%d/%m/%Y %H:%M:%S"
-            ),
-            "Manufacturer": random.choice(["PFIZER", "MODERNA", "JOHNSON"]),
-            "Email Address": self.fake.email(domains=["example.com"]),
-            "Date of Birth": dob.strftime("%d/%m/%Y"),
-            "Dose": random.choice(["Initial Dose", "Second Dose"]),
-            "First Name": self.fake.first_name(),
-            "Last Name": self.fake.last_name(),
-            "Full Name": "",
-            "Patient ID": str(uuid.uuid4()),
+        return {name: values[0] for name, values in self._entry_columns(1).items()}
+
+    def _entry_columns(self, size):
+        """
+        Values of ``size`` patients, column by column.
+        :return: dict of field name -> list of values, in VACCINED_PATIENT_FIELDS
+            order
+        """
+        person = _mimesis_providers()[0]
+        first_names = [person.first_name() for _ in range(size)]
+        last_names = [person.last_name() for _ in range(size)]
+        return {
+            "Vaccine Administered Date/Time": [
+                date_generator.date_time_between(start_date="-3M").strftime(
+                    "%d/%m/%Y %H:%M:%S"
+                )
+                for _ in range(size)
+            ],
+            "Manufacturer": random.choices(["PFIZER", "MODERNA", "JOHNSON"], k=size),
+            "Email Address": [
+                person.email(domains=["example.com"]) for _ in range(size)
+            ],
+            "Date of Birth": [
+                date_generator.date_time_between(
+                    start_date="-70y", end_date="-15y"
+                ).strftime("%d/%m/%Y")
+                for _ in range(size)
+            ],
+            "Dose": random.choices(["Initial Dose", "Second Dose"], k=size),
+            "First Name": first_names,
+            "Last Name": last_names,
+            "Full Name": [
+                f"{first_name} {last_name}"
+                for first_name, last_name in zip(first_names, last_names)
+            ],
+            "Patient ID": [str(uuid.uuid4()) for _ in range(size)],
         }
-        schema["Full Name"] = f"{schema['First Name']} {schema['Last Name']}"
-        return schema
+
+    def _entry_batch(self, size):
+        return pack_columns(self._entry_columns(size))
+
+    def batches(self, read):
+        """
+        Generate the patients as column batches, see ``MemberRoster.batches``.
+        :param read: function of a batch, see ``shared_batches``
+        :return: generator of ``read(batch)``
+        """
+        sizes = batch_sizes(
+            self.entries_number, MEMBER_BATCH_SIZE, self.processes_number
+        )
+        with worker_pool(self.processes_number) as pool:
+            yield from shared_batches(
+                pool,
+                self._entry_batch,
+                ((size,) for size in sizes),
+                read,
+                2 * self.processes_number,
+            )
 
     def generate(self):
-        pool = Pool(self.processes_number)
-        result = pool.map(self.build_schema, range(self.entries_number))
-        return result
+        return [entry for entries in self.batches(batch_dicts) for entry in entries]
 
     def csv(self, filepath=None):
         now = datetime.datetime.now()
@@ -154,10 +331,11 @@ class VaccinedPatient:
         Path(filepath).mkdir(exist_ok=True, parents=True)
 
         filename = f"{filepath}test_delta_match_data_{int(now.timestamp())}.csv"
-        data_list = self.generate()
-        csv_file = csv.DictWriter(open(filename, "w+"), fieldnames=data_list[-1].keys())
-        csv_file.writeheader()
-        csv_file.writerows(data_list)
+        with open(filename, "w+") as file:
+            csv_file = csv.writer(file)
+            csv_file.writerow(VACCINED_PATIENT_FIELDS)
+            for rows in self.batches(batch_rows):
+                csv_file.writerows(rows)
         return filename
 
 
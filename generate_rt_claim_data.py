@@ -1,10 +1,31 @@
-from datetime import datetime
+import csv
+from functools import lru_cache
 from pathlib import Path
 
 import numpy as np
-from mimesis import Person, Datetime, Address, Code, Text
 
-from generate_rt_eligibility_data import AN_DATA_TYPE
+from core.exceptions import InvalidGeneratorConfigError
+from generator_helpers import column_generator
+from generator_helpers.rt_schema import (
+    OPTIONAL,
+    AlphaNumeric,
+    Choice,
+    Concat,
+    Constant,
+    Copy,
+    Date,
+    Fake,
+    Field,
+    Integer,
+    Parent,
+    PayerId,
+    RecordCount,
+    RecordNumber,
+    RecordSpec,
+    RTFile,
+    header_fields,
+    packed,
+)
 
 CODE_SET_B = np.array(
     [
@@ -265,735 +286,426 @@ CODE_SET_C = np.array(
 )
 
 
-class RTClaimData:
+# paid/denied/pending mix of the status codes, ``field,code,weight`` rows
+CLAIM_STATUS_WEIGHTS = Path(__file__).parent / "templates/rt/claim_status_weights.csv"
+CLAIM_ID = "Payer Claim Identification Number"
+LINE_ID = "Line Item Control Number"
+NAME_SUFFIX = Choice(["Mr", "Ms", "Prince"])
+AMOUNT = Integer(-111111111, 999999999)
+TERMINATOR = Field("Record Terminator", Constant("CR"))
+
+
+@lru_cache()
+def claim_status_weights(path=CLAIM_STATUS_WEIGHTS):
+    """
+    Status code weights of a ``field,code,weight`` table, read once per path.
+    :return: dict of field name -> (codes, weights)
+    """
+    weights = {}
+    with open(path) as file:
+        for row in csv.DictReader(file):
+            codes, values = weights.setdefault(row["field"], ([], []))
+            codes.append(row["code"])
+            values.append(float(row["weight"]))
+    return weights
+
+
+def _status_codes(field, code_set, weights):
+    if field in weights:
+        return Choice(*weights[field])
+    return Choice(code_set)
+
+
+def status_record(weights=None):
+    """
+    STC record following a claim or a claim line. Claim and line statuses
+    are generated as one batch: the parent columns hold the claim ID of
+    claim statuses and the line ID of line statuses, blank otherwise.
+    :param weights: dict of field name -> (codes, weights), see
+        ``claim_status_weights``; codes are drawn uniformly if None
+    """
+    weights = weights or {}
+    return RecordSpec(
+        Field("Record ID", Constant("STC")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", PayerId()),
+        Field(CLAIM_ID, Parent(CLAIM_ID)),
+        Field(LINE_ID, Parent(LINE_ID)),
+        Field("Status Information Effective Date", Date(0, 10, relative=True)),
+        Field(
+            "Claim Status Category Code",
+            Constant("F1"),
+            when=OPTIONAL,
+            otherwise=_status_codes("Claim Status Category Code", CODE_SET_B, weights),
+        ),
+        Field(
+            "Claim Status Code",
+            _status_codes(
+                "Claim Status Code",
+                [0, 1, 2, 3, 6, 12, 15, 16, 17, 18, 19, 20],
+                weights,
+            ),
+        ),
+        Field("Entity Code", _status_codes("Entity Code", CODE_SET_C, weights)),
+        Field("Data in Error", Constant("")),
+        Field("Emdeon Status Code", Constant("")),
+        TERMINATOR,
+    )
+
+
+class FixedLines:
+    """Every claim has ``count`` lines."""
+
+    def __init__(self, count):
+        self.count = count
+
+    def __call__(self, rng, size):
+        return np.full(size, self.count, dtype=np.int64)
+
+
+class PoissonLines:
+    """Poisson distributed line counts, at least ``minimum`` lines a claim."""
+
+    def __init__(self, mean, minimum=1):
+        self.mean = mean
+        self.minimum = minimum
+
+    def __call__(self, rng, size):
+        return np.maximum(rng.poisson(self.mean, size=size), self.minimum)
+
+
+class UniformLines:
+    """Line counts uniform in ``[low, high]``."""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def __call__(self, rng, size):
+        return rng.integers(self.low, self.high + 1, size=size)
+
+
+def line_count_distribution(name, count):
+    """
+    Line count distribution by name.
+    :param name: "fixed" (``count`` lines), "poisson" (``count`` lines on
+        average) or "uniform" (1 to ``count`` lines)
+    :param count: claim_line_level_record_count
+    """
+    if name == "fixed":
+        return FixedLines(count)
+    if name == "poisson":
+        return PoissonLines(count)
+    if name == "uniform":
+        return UniformLines(1, count)
+    raise InvalidGeneratorConfigError(
+        "unknown claim line count distribution",
+        details={"distribution": name, "supported": ["fixed", "poisson", "uniform"]},
+    )
+
+
+class RTClaimData(RTFile):
+    """
+    Claim status file: every claim (CLM) is followed by its status (STC) and
+    its claim lines (DTL), each followed by its own status record.
+
+    Claim lines are stored flat; ``line_offsets`` maps every claim to its
+    range of lines, so claims can have different numbers of lines.
+    """
+
+    HEADER = RecordSpec(*header_fields("CStat"), TERMINATOR)
+    CLAIM = RecordSpec(
+        Field("Record ID", Constant("CLM")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", PayerId()),
+        Field("Maintenance Type Code", Choice(["001", "002", "021", "030"])),
+        Field("Billing Provider Federal Tax ID", Integer(111111111, 999999999)),
+        Field("Billing Provider Payer Assigned Number", Constant("")),
+        Field("Billing Provider National Provider ID", Constant("")),
+        Field(
+            "Billing Provider Last Name (or Org Name)",
+            Fake("person", "last_name"),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Billing Provider First Name", Fake("person", "first_name"), when=OPTIONAL
+        ),
+        Field(
+            "Billing Provider Middle Name", Fake("person", "first_name"), when=OPTIONAL
+        ),
+        Field("Billing Provider Name Suffix", NAME_SUFFIX, when=OPTIONAL),
+        Field(
+            "Service Provider Federal Tax ID",
+            Integer(111111111, 999999999),
+            when=OPTIONAL,
+            otherwise=Copy("Billing Provider Federal Tax ID"),
+        ),
+        Field("Service Provider Payer Assigned Number", Constant("")),
+        Field(
+            "Service Provider National Provider ID",
+            Integer(111111111, 999999999),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Service Provider Last Name (or Org Name)",
+            Fake("person", "last_name"),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Service Provider First Name", Fake("person", "first_name"), when=OPTIONAL
+        ),
+        Field(
+            "Service Provider Middle Name", Fake("person", "first_name"), when=OPTIONAL
+        ),
+        Field("Service Provider Name Suffix", NAME_SUFFIX, when=OPTIONAL),
+        Field(
+            "Employer Identification Number",
+            Concat(Integer(11, 99), "-", Integer(1111111, 9999999)),
+            when=OPTIONAL,
+        ),
+        Field("Employer Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Subscriber ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Subscriber Last Name", Fake("person", "last_name"), when=OPTIONAL),
+        Field("Subscriber First Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Subscriber Middle Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Subscriber Name Suffix", NAME_SUFFIX, when=OPTIONAL),
+        Field("Patient ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Patient Last Name", Fake("person", "last_name")),
+        Field("Patient First Name", Fake("person", "first_name")),
+        Field("Patient Middle Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Patient Name Suffix", NAME_SUFFIX, when=OPTIONAL),
+        Field("Patient Date of Birth", Date(1930, 2019)),
+        Field("Patient Gender", Choice(["F", "M"]), when=OPTIONAL),
+        Field("EMDEON Claim Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Claim Charge Amount", AMOUNT, when=OPTIONAL),
+        Field("Claim Payment Amount", AMOUNT, when=OPTIONAL),
+        Field("Claim Adjudication/Payment Date", Date(2010, 2020), when=OPTIONAL),
+        Field("Check/EFT Date", Date(2010, 2020), when=OPTIONAL),
+        Field("Check/EFT Number", AMOUNT, when=OPTIONAL),
+        Field("Bill Type", Concat(Integer(1, 9), Integer(10, 19)), when=OPTIONAL),
+        Field("Payer Claim Identification Number", AlphaNumeric(unique=True)),
+        Field("Patient Account Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Pharmacy Prescription Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Voucher Identifier", AlphaNumeric(), when=OPTIONAL),
+        Field(
+            "Application or Location System Identifier", AlphaNumeric(), when=OPTIONAL
+        ),
+        Field("Group Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Claim Service Date Start", Date(2000, 2010), when=OPTIONAL),
+        Field("Claim Service Date End", Date(2010, 2020), when=OPTIONAL),
+        TERMINATOR,
+    )
+    STATUS = status_record()
+    LINE = RecordSpec(
+        Field("Record ID", Constant("DTL")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", PayerId()),
+        Field(
+            "Payer Claim Identification Number",
+            Parent("Payer Claim Identification Number"),
+        ),
+        Field("Line Item Control Number", AlphaNumeric(unique=True)),
+        Field(
+            "Service Qualifier ID",
+            Choice(["AD", "ER", "HC", "HP", "IV", "N4", "NU", "WK"]),
+        ),
+        Field("Service Identification Code", AlphaNumeric()),
+        Field("Procedure Modifier 1", Constant("")),
+        Field("Procedure Modifier 2", Constant("")),
+        Field("Procedure Modifier 3", Constant("")),
+        Field("Procedure Modifier 4", Constant("")),
+        Field("Line Item Charge Amount", AMOUNT),
+        Field("Line Item Provider Payment Amount", AMOUNT),
+        Field("Revenue Code", Integer(111111, 999999), when=OPTIONAL),
+        Field("Quantity(Units of Service)", Integer(1, 10)),
+        Field("EMDEON Claim Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Date of Service Start", Date(2000, 2010)),
+        Field("Date of Service End", Date(2010, 2020)),
+        TERMINATOR,
+    )
+    TRAILER = RecordSpec(
+        Field("RecordID", Constant("TRLR")),
+        Field("Record Number", RecordCount()),
+        TERMINATOR,
+    )
+    FILE_NAME = "{timestamp}_{payer_id}_test.cstat"
+
     def __init__(
         self,
         load_type: str,
         optional_fields: bool,
         claim_level_record_count: int,
         claim_line_level_record_count: int,
+        chunk_size: int = None,
+        line_counts=None,
+        seed: int = None,
+        processes: int = 1,
+        status_weights=None,
     ):
-        self._fake_person = Person("en")
-        self._fake_date = Datetime()
-        self._fake_address = Address("en")
-        self._fake_code = Code()
-        self._fake_text = Text()
-        self._payer_id = "".join(np.random.choice(AN_DATA_TYPE, size=10))
-
-        self._optional_fields = optional_fields
-        self._load_type = load_type
-        self._claim_level_record_count = claim_level_record_count
-        self._claim_line_level_record_count = claim_line_level_record_count
-        self._file_name = ""
-
-        self._header_schema = {}
-        self._claim_level_record_schema = {}
-        self._claim_status_record_schema = {}
-        self._claim_line_level_record = {}
-        self._claim_detail_status_record_schema = {}
-        self._trailer_schema = {}
-
-    def _generate_header_schema(self):
-        self._header_schema["Record Id"] = "HDR"
-        self._header_schema["File Group ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self._header_schema["File Group Sequence Number"] = "1"
-        self._header_schema["File Group Count"] = "1"
-        self._header_schema["Creation Date"] = self._fake_date.date(
-            start=1980, end=2019
-        ).strftime("%Y%m%d")
-        self._header_schema["Creation Time"] = self._fake_date.time().strftime("%H%M%S")
-        self._header_schema["Trading Partner ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self._header_schema["Submitter Name"] = self._fake_person.first_name()
-        self._header_schema["Payer Contact Name"] = (
-            self._fake_person.first_name() if self._optional_fields else ""
-        )
-        self._header_schema["Payer Support Telephone Number"] = (
-            self._fake_person.telephone("##########") if self._optional_fields else ""
-        )
-        self._header_schema["Payer Support Email Address"] = (
-            self._fake_person.email() if self._optional_fields else ""
-        )
-        self._header_schema["Load Type"] = self._load_type
-        self._header_schema["Payer Unique File Identifier"] = datetime.now().strftime(
-            "%Y%m%d%H%M%S"
-        )
-        self._header_schema["File Type"] = "CStat"
-        self._header_schema["Version Code"] = "03"
-        self._header_schema["Release Code"] = "00"
-        self._header_schema["Record Terminator"] = "CR"
-
-    def _generate_claim_level_record_schema(self):
-        self._claim_level_record_schema["Record ID"] = np.array(
-            ["CLM" for _ in range(self._claim_level_record_count)]
-        )
-        self._claim_level_record_schema["Record Number"] = np.array(
-            [_ for _ in range(self._claim_level_record_count)]
-        )
-        self._claim_level_record_schema["Payer ID"] = np.array(
-            [self._payer_id for _ in range(self._claim_level_record_count)]
-        )
-        self._claim_level_record_schema["Maintenance Type Code"] = np.array(
-            [
-                np.random.choice(["001", "002", "021", "030"])
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Billing Provider Federal Tax ID"] = np.array(
-            [
-                np.random.randint(111111111, 999999999)
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema[
-            "Billing Provider Payer Assigned Number"
-        ] = np.array(["" for _ in range(self._claim_level_record_count)])
-        self._claim_level_record_schema[
-            "Billing Provider National Provider ID"
-        ] = np.array(["" for _ in range(self._claim_level_record_count)])
-        self._claim_level_record_schema[
-            "Billing Provider Last Name (or Org Name)"
-        ] = np.array(
-            [
-                self._fake_person.last_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Billing Provider First Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Billing Provider Middle Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Billing Provider Name Suffix"] = np.array(
-            [
-                np.random.choice(["Mr", "Ms", "Prince"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Service Provider Federal Tax ID"] = np.array(
-            [
-                np.random.randint(111111111, 999999999)
-                if self._optional_fields
-                else self._claim_level_record_schema["Billing Provider Federal Tax ID"][
-                    _
-                ]
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema[
-            "Service Provider Payer Assigned Number"
-        ] = np.array(["" for _ in range(self._claim_level_record_count)])
-        self._claim_level_record_schema[
-            "Service Provider National Provider ID"
-        ] = np.array(
-            [
-                np.random.randint(111111111, 999999999) if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema[
-            "Service Provider Last Name (or Org Name)"
-        ] = np.array(
-            [
-                self._fake_person.last_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Service Provider First Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Service Provider Middle Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Service Provider Name Suffix"] = np.array(
-            [
-                np.random.choice(["Mr", "Ms", "Prince"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Employer Identification Number"] = np.array(
-            [
-                f"{np.random.randint(11, 99)}-{np.random.randint(1111111, 9999999)}"
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Employer Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Subscriber ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Subscriber Last Name"] = np.array(
-            [
-                self._fake_person.last_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Subscriber First Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Subscriber Middle Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Subscriber Name Suffix"] = np.array(
-            [
-                np.random.choice(["Mr", "Ms", "Prince"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Last Name"] = np.array(
-            [
-                self._fake_person.last_name()
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient First Name"] = np.array(
-            [
-                self._fake_person.first_name()
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Middle Name"] = np.array(
-            [
-                self._fake_person.first_name() if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Name Suffix"] = np.array(
-            [
-                np.random.choice(["Mr", "Ms", "Prince"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Date of Birth"] = np.array(
-            [
-                self._fake_date.date(start=1930, end=2019).strftime("%Y%m%d")
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Gender"] = np.array(
-            [
-                np.random.choice(["F", "M"]) if self._optional_fields else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["EMDEON Claim Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Claim Charge Amount"] = np.array(
-            [
-                np.random.randint(-111111111, 999999999)
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Claim Payment Amount"] = np.array(
-            [
-                np.random.randint(-111111111, 999999999)
-                if self._optional_fields
-                else ""
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Claim Adjudication/Payment Date"] = np.array(
-            [
-                self._fake_date.date(start=2010, end=2020).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Check/EFT Date"] = np.array(
-            [
-                self._fake_date.date(start=2010, end=2020).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Check/EFT Number"] = np.array(
-            [
-                np.random.randint(-111111111, 999999999)
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Bill Type"] = np.array(
-            [
-                f"{np.random.randint(1, 9)}{np.random.randint(10, 19)}"
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Payer Claim Identification Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Patient Account Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Pharmacy Prescription Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Voucher Identifier"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema[
-            "Application or Location System Identifier"
-        ] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Group Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Claim Service Date Start"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2010).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Claim Service Date End"] = np.array(
-            [
-                self._fake_date.date(start=2010, end=2020).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_level_record_schema["Record Terminator"] = np.array(
-            ["CR" for _ in range(self._claim_level_record_count)]
+        """
+        :param line_counts: distribution of the number of lines per claim,
+            ``FixedLines(claim_line_level_record_count)`` by default
+        :param status_weights: status code weights, see
+            ``claim_status_weights``; uniform if None
+        """
+        super().__init__(
+            claim_level_record_count,
+            load_type,
+            optional_fields,
+            chunk_size,
+            seed,
+            processes,
         )
+        self._claim_line_level_record_count = claim_line_level_record_count
+        self.status_weights = status_weights
+        line_counts = line_counts or FixedLines(claim_line_level_record_count)
+        # lines of claim i are line_offsets[i]:line_offsets[i + 1] of the flat
+        # line arrays
+        self.line_offsets = np.concatenate(
+            [[0], np.cumsum(line_counts(self._rng, claim_level_record_count))]
+        ).astype(np.int64)
+        self.claim_status_schema = {}
+        self.line_schema = {}
+        self.line_status_schema = {}
 
-    def _generate_claim_line_level_record_schema(self):
-        self._claim_line_level_record["Record ID"] = np.array(
-            [
-                ["DTL" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Record Number"] = np.array(
-            [
-                [_ for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Payer ID"] = np.array(
-            [
-                [self._payer_id for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Payer Claim Identification Number"] = np.array(
-            [
-                [
-                    self._claim_level_record_schema[
-                        "Payer Claim Identification Number"
-                    ][__]
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Line Item Control Number"] = np.array(
-            [
-                [
-                    "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Service Qualifier ID"] = np.array(
-            [
-                [
-                    np.random.choice(["AD", "ER", "HC", "HP", "IV", "N4", "NU", "WK"])
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Service Identification Code"] = np.array(
-            [
-                [
-                    "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Procedure Modifier 1"] = np.array(
-            [
-                ["" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Procedure Modifier 2"] = np.array(
-            [
-                ["" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Procedure Modifier 3"] = np.array(
-            [
-                ["" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Procedure Modifier 4"] = np.array(
-            [
-                ["" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Line Item Charge Amount"] = np.array(
-            [
-                [
-                    np.random.randint(-111111111, 999999999)
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Line Item Provider Payment Amount"] = np.array(
-            [
-                [
-                    np.random.randint(-111111111, 999999999)
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Revenue Code"] = np.array(
-            [
-                [
-                    np.random.randint(111111, 999999) if self._optional_fields else ""
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Quantity(Units of Service)"] = np.array(
-            [
-                [
-                    np.random.randint(1, 10)
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["EMDEON Claim Number"] = np.array(
-            [
-                [
-                    "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                    if self._optional_fields
-                    else ""
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Date of Service Start"] = np.array(
-            [
-                [
-                    self._fake_date.date(start=2000, end=2010).strftime("%Y%m%d")
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Date of Service End"] = np.array(
-            [
-                [
-                    self._fake_date.date(start=2010, end=2020).strftime("%Y%m%d")
-                    for _ in range(self._claim_line_level_record_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        self._claim_line_level_record["Record Terminator"] = np.array(
-            [
-                ["CR" for _ in range(self._claim_line_level_record_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
+    @property
+    def record_count(self):
+        return self._entries_number * 2 + int(self.line_offsets[-1]) * 2
 
-    def _generate_claim_status_record_schema(
-        self, status_schema, detail_records_count, status_type
-    ):
-        status_schema["Record ID"] = np.array(
-            [
-                ["STC" for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Record Number"] = np.array(
-            [
-                [_ for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Payer ID"] = np.array(
-            [
-                [self._payer_id for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Payer Claim Identification Number"] = np.array(
-            [
-                [
-                    self._claim_level_record_schema[
-                        "Payer Claim Identification Number"
-                    ][__]
-                    if status_type == "CLM"
-                    else ""
-                    for _ in range(detail_records_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Line Item Control Number"] = np.array(
-            [
-                [
-                    self._claim_line_level_record["Line Item Control Number"][__][_]
-                    if status_type == "DTL"
-                    else ""
-                    for _ in range(detail_records_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Status Information Effective Date"] = np.array(
-            [
-                [
-                    self._fake_date.date(
-                        start=datetime.now().year, end=datetime.now().year + 10
-                    ).strftime("%Y%m%d")
-                    for _ in range(detail_records_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Claim Status Category Code"] = np.array(
-            [
-                [
-                    "F1" if self._optional_fields else np.random.choice(CODE_SET_B)
-                    for _ in range(detail_records_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Claim Status Code"] = np.array(
-            [
-                [
-                    np.random.choice([0, 1, 2, 3, 6, 12, 15, 16, 17, 18, 19, 20])
-                    for _ in range(detail_records_count)
-                ]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Entity Code"] = np.array(
-            [
-                [np.random.choice(CODE_SET_C) for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Data in Error"] = np.array(
-            [
-                ["" for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Emdeon Status Code"] = np.array(
-            [
-                ["" for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
-        status_schema["Record Terminator"] = np.array(
-            [
-                ["CR" for _ in range(detail_records_count)]
-                for __ in range(self._claim_level_record_count)
-            ]
-        )
+    def _chunk_bounds(self, rows_per_chunk=None):
+        """
+        Whole claims per chunk, up to ``rows_per_chunk`` records each.
+        """
+        rows_per_chunk = rows_per_chunk or self.rows_per_chunk
+        claims = np.arange(self._entries_number + 1)
+        # records written before claim i
+        first_records = 2 * claims + 2 * self.line_offsets
+        start = 0
+        while start < self._entries_number:
+            stop = np.searchsorted(
+                first_records, first_records[start] + rows_per_chunk, "right"
+            )
+            stop = min(max(stop - 1, start + 1), self._entries_number)
+            yield start, stop - start
+            start = stop
 
-    def _generate_trailer_status_schema(self):
-        self._trailer_schema["RecordID"] = "TRLR"
-        self._trailer_schema["Record Number"] = (
-            self._claim_level_record_count * 2
-            + self._claim_line_level_record_count * 2 * self._claim_level_record_count
-        )
-        self._trailer_schema["Record Terminator"] = "CR"
+    def _chunk_records(self, start, size):
+        _, line_count, _ = self._lines_of(start, size)
+        return 2 * size + 2 * int(line_count)
 
-    def generate_all_schemas(self):
-        self._generate_header_schema()
-        self._generate_claim_level_record_schema()
-        self._generate_claim_status_record_schema(
-            self._claim_status_record_schema, 1, "CLM"
-        )
-        self._generate_claim_line_level_record_schema()
-        self._generate_claim_status_record_schema(
-            self._claim_detail_status_record_schema,
-            self._claim_line_level_record_count,
-            "DTL",
+    def _compile_detail(self):
+        self._compile("claim", self.CLAIM)
+        self._compile(
+            "status",
+            status_record(self.status_weights) if self.status_weights else self.STATUS,
         )
-        self._generate_trailer_status_schema()
+        self._compile("line", self.LINE)
 
-        self._file_name = (
-            f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{self._payer_id}_test.cstat"
-        )
+    def _lines_of(self, start, size):
+        """
+        Flat line range of claims ``start`` to ``start + size`` and the claim
+        of every line, relative to ``start``.
+        """
+        offsets = self.line_offsets[start : start + size + 1]
+        owners = np.repeat(np.arange(size), np.diff(offsets))
+        return offsets[0], offsets[-1] - offsets[0], owners
 
-    def _one_line_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for key in schema.keys():
-                file.write(f"{schema[key]}|".encode("ascii", "ignore"))
-            file.write("\n".encode("ascii"))
-
-    def _2d_schemas_to_file(self, filepath):
-        counter = 2
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for _ in range(self._claim_level_record_count):
-                self._claim_level_record_schema["Record Number"][_] = counter
-                counter += 1
-                for key in self._claim_level_record_schema.keys():
-                    file.write(
-                        f"{self._claim_level_record_schema[key][_]}|".encode(
-                            "ascii", "ignore"
-                        )
-                    )
-                file.write("\n".encode("ascii"))
-                self._claim_status_record_schema["Record Number"][_][0] = counter
-                counter += 1
-                for key in self._claim_status_record_schema.keys():
-                    file.write(
-                        f"{self._claim_status_record_schema[key][_][0]}|".encode(
-                            "ascii", "ignore"
-                        )
-                    )
-                file.write("\n".encode("ascii"))
-                for __ in range(self._claim_line_level_record_count):
-                    self._claim_line_level_record["Record Number"][_] = counter
-                    counter += 1
-                    for line_level_key in self._claim_line_level_record.keys():
-                        file.write(
-                            f"{self._claim_line_level_record[line_level_key][_][__]}|".encode(
-                                "ascii", "ignore"
-                            )
-                        )
-                    file.write("\n".encode("ascii"))
-                    self._claim_detail_status_record_schema["Record Number"][
-                        _
-                    ] = counter
-                    counter += 1
-                    for (
-                        status_record_key
-                    ) in self._claim_detail_status_record_schema.keys():
-                        file.write(
-                            f"{self._claim_detail_status_record_schema[status_record_key][_][__]}|".encode(
-                                "ascii", "ignore"
-                            )
-                        )
-                    file.write("\n".encode("ascii"))
-
-    def schemas_to_file(self, filepath=None):
-        now = datetime.now()
-        filepath = (
-            filepath
-            if filepath
-            else Path(f"{Path.cwd()}/{now.year}/{now.month}/{now.day}")
+    def _record_numbers(self, start, size):
+        """
+        Record Number of every claim and of every claim line of a chunk; the
+        status records follow them, so their numbers are one more.
+        """
+        claims = np.arange(start, start + size)
+        claim_numbers = 2 + 2 * claims + 2 * self.line_offsets[start : start + size]
+        first_line, line_count, owners = self._lines_of(start, size)
+        line_in_claim = (
+            np.arange(first_line, first_line + line_count)
+            - self.line_offsets[start + owners]
+        )
+        return claim_numbers, claim_numbers[owners] + 2 + 2 * line_in_claim
+
+    def _generate_records(self, ctx, name, size, **batch):
+        return self._records[name].generate(ctx.batch(size, **batch))
+
+    def _generate_chunk(self, ctx, start, size):
+        first_line, line_count, owners = self._lines_of(start, size)
+        claim_numbers, line_numbers = self._record_numbers(start, size)
+        claims = self._generate_records(
+            ctx, "claim", size, start=start, record_numbers=claim_numbers
+        )
+        lines = self._generate_records(
+            ctx,
+            "line",
+            line_count,
+            start=first_line,
+            record_numbers=line_numbers,
+            parent=claims,
+            parent_index=owners,
+        )
+        # claim statuses then line statuses, in a single batch
+        statuses = self._generate_records(
+            ctx,
+            "status",
+            size + line_count,
+            start=start + first_line,
+            record_numbers=np.concatenate([claim_numbers, line_numbers]) + 1,
+            parent={
+                CLAIM_ID: np.concatenate(
+                    [claims[CLAIM_ID], column_generator.blank(line_count)]
+                ),
+                LINE_ID: np.concatenate(
+                    [column_generator.blank(size), lines[LINE_ID]]
+                ),
+            },
+            parent_index=np.arange(size + line_count),
+        )
+        claim_statuses = {name: column[:size] for name, column in statuses.items()}
+        line_statuses = {name: column[size:] for name, column in statuses.items()}
+        return claims, claim_statuses, lines, line_statuses
+
+    def _store_chunk(self, chunk):
+        (
+            self.detail_schema,
+            self.claim_status_schema,
+            self.line_schema,
+            self.line_status_schema,
+        ) = chunk
+
+    def _slice_chunk(self, start, size):
+        first_line, line_count, _ = self._lines_of(start, size)
+        return tuple(
+            {name: column[first : first + count] for name, column in schema.items()}
+            for schema, first, count in [
+                (self.detail_schema, start, size),
+                (self.claim_status_schema, start, size),
+                (self.line_schema, first_line, line_count),
+                (self.line_status_schema, first_line, line_count),
+            ]
         )
-        Path(filepath).mkdir(exist_ok=True, parents=True)
-        self._one_line_schema_to_file(self._header_schema, filepath)
-        self._2d_schemas_to_file(filepath)
-        self._one_line_schema_to_file(self._trailer_schema, filepath)
 
-        return f"{filepath}/{self._file_name}"
+    def _chunk_bytes(self, chunk):
+        """
+        Interleave the four record types: every row goes to its Record Number
+        position within the chunk.
+        """
+        matrices = [
+            self._records[name].byte_matrix(columns)
+            for name, columns in zip(
+                ["claim", "status", "line", "status"], chunk
+            )
+        ]
+        positions = [columns["Record Number"] for columns in chunk]
+        first = positions[0][0] if len(positions[0]) else 0
+        buffer = np.zeros(
+            (
+                sum(len(matrix) for matrix in matrices),
+                max(matrix.shape[1] for matrix in matrices),
+            ),
+            dtype=np.uint8,
+        )
+        for matrix, position in zip(matrices, positions):
+            buffer[position - first, : matrix.shape[1]] = matrix
+        return packed(buffer)
 
 
 if __name__ == "__main__":
@@ -1,14 +1,33 @@
-import random
 import string
-from datetime import datetime
 
 import numpy as np
-from mimesis import Person, Datetime, Address, Code, Text
-from pathlib import Path
-
 from mimesis.enums import CountryCode
 
-from generator_helpers import string_generator
+from generator_helpers.member_index import MemberIndex
+from generator_helpers.rt_schema import (
+    OPTIONAL,
+    AlphaNumeric,
+    Bothify,
+    Branch,
+    Choice,
+    Concat,
+    Constant,
+    Date,
+    Digits,
+    Fake,
+    Field,
+    Given,
+    Integer,
+    Matches,
+    Numbered,
+    RecordCount,
+    RecordNumber,
+    RecordSpec,
+    RTFile,
+    header_fields,
+    header_is,
+    validation_code,
+)
 
 AN_DATA_TYPE = np.array(list(string.ascii_letters + string.digits))
 CODE_SET_A = np.array(
@@ -168,833 +187,335 @@ CODE_SET_E = np.array(
 )
 
 
-class RTEligibbility:
-    def __init__(
-        self, entries_number: int, load_type: str, optional_fields: bool = False
-    ):
-        self._fake_person = Person("en")
-        self._fake_date = Datetime()
-        self._fake_address = Address("en")
-        self._fake_code = Code()
-        self._fake_text = Text()
+def language_code(locale):
+    """"en-us" -> "EN"."""
+    return locale[:2].upper()
 
-        self.optional_fields = optional_fields
-        self.load_type = load_type
-        self._entries_number = entries_number
-        self._file_name = ""
-        self.header_schema = {}
-        self.detail_schema = {}
-        self.trailer_schema = {}
 
-    def _generate_header_schema(self):
-        self.header_schema["Record Id"] = "HDR"
-        self.header_schema["File Group ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self.header_schema["File Group Sequence Number"] = "1"
-        self.header_schema["File Group Count"] = "1"
-        self.header_schema["Creation Date"] = self._fake_date.date(
-            start=1980, end=2019
-        ).strftime("%Y%m%d")
-        self.header_schema["Creation Time"] = self._fake_date.time().strftime("%H%M%S")
-        self.header_schema["Trading Partner ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self.header_schema["Submitter Name"] = self._fake_person.first_name()
-        self.header_schema["Payer Contact Name"] = (
-            self._fake_person.first_name() if self.optional_fields else ""
-        )
-        self.header_schema["Payer Support Telephone Number"] = (
-            self._fake_person.telephone("##########") if self.optional_fields else ""
-        )
-        self.header_schema["Payer Support Email Address"] = (
-            self._fake_person.email() if self.optional_fields else ""
-        )
-        self.header_schema["Load Type"] = self.load_type
-        self.header_schema["Payer Unique File Identifier"] = datetime.now().strftime(
-            "%Y%m%d%H%M%S"
-        )
-        self.header_schema["File Type"] = "Elig"
-        self.header_schema["Version Code"] = "03"
-        self.header_schema["Release Code"] = "01"
-        self.header_schema["File Validation Code"] = (
-            5 if self.optional_fields else np.random.choice([0, 1, 2, 3, 4, 5])
-        )
-        self.header_schema["Rosters Indicator"] = "Y" if self.optional_fields else "N"
+ROSTERS = header_is("Rosters Indicator", "Y")
+LANGUAGE_CODE = Fake("code", "locale_code", format=language_code)
+YES = Constant("Y")
 
-    def _generate_detail_schema(self):
-        self.detail_schema["Record Id"] = np.array(
-            ["DTL" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Record Number"] = np.array(
-            [_ for _ in range(2, self._entries_number + 2)]
-        )
-        self.detail_schema["Payer ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Action Indicator"] = np.array(
-            [
-                np.random.choice(["I", "L"])
-                if self.header_schema["Load Type"] == "F"
-                else np.random.choice(["U", "D"])
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Maintenance Reason Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_A)
-                if self.header_schema["Rosters Indicator"] == "Y"
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Correction Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Primary Subscriber ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Unique Patient ID (UPID)"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Relationship to Subscriber"] = np.array(
-            [
-                np.random.choice(["01", "18", "19", "20", "21", "53", "G8"])
-                if self.header_schema["Rosters Indicator"] == "N"
-                else np.random.choice(CODE_SET_B)
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Date of Birth"] = np.array(
-            [
-                self._fake_date.date(start=1930, end=2019).strftime("%Y%m%d")
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Last Name"] = np.array(
-            [self._fake_person.last_name() for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Member First Name"] = np.array(
-            [self._fake_person.first_name() for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Member Middle Name"] = np.array(
-            [
-                self._fake_person.first_name() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Name Prefix"] = np.array(
-            [
-                np.random.choice(["Mr", "Ms", "Prince"]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Name Suffix"] = np.array(
-            [
-                np.random.choice(["I", "II", "III", "IV", "Jr", "Sr"])
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Gender"] = np.array(
-            [np.random.choice(["M", "F", "U"]) for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Member Street Address 1"] = np.array(
-            [self._fake_address.address() for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Member Street Address 2"] = np.array(
-            [
-                self._fake_address.address() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member City"] = np.array(
-            [
-                self._fake_address.city() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member State"] = np.array(
-            [
-                self._fake_address.state(True) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member ZIP Code"] = np.array(
-            [
-                self._fake_address.zip_code() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Country"] = np.array(
-            [
-                self._fake_address.country_code(CountryCode.A3)
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Country Subdivision"] = np.array(
-            [
-                self._fake_address.province() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Work Phone"] = np.array(
-            [
-                self._fake_person.telephone("##########")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Home Phone"] = np.array(
-            [
-                self._fake_person.telephone("##########")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Effective Date"] = np.array(
-            [
-                self._fake_date.date(start=1930, end=2019).strftime("%Y%m%d")
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Termination Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2030).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Name"] = np.array(
-            [
-                f"Plan {_}" if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Group Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.header_schema["File Validation Code"] in [2, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Group Name"] = np.array(
-            [
-                f"Group {_}" if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Insurance Policy Number"] = np.array(
-            [
-                f"{string_generator.bothify('??#####??')}"
-                if self.header_schema["File Validation Code"] in [2, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Insurance Policy Effective Date"] = np.array(
-            [
-                self._fake_date.date(start=1950, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Insurance Policy Expiration Date"] = np.array(
-            [
-                self._fake_date.date(start=2020, end=2030).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Status Code"] = np.array(
-            [
-                np.random.choice(["1", "2", "3", "4", "5", "6", "7", "8"])
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Social Security Number"] = np.array(
-            [
-                f"{random.randint(111111111, 999999999)}"
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Health Insurance Claim (HIC) Number"] = np.array(
-            [
-                "".join(np.random.choice(list(string.digits), size=10))
-                if self.header_schema["File Validation Code"] in [3, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Identity Card Number"] = np.array(
-            [
-                f"{random.randint(11111, 99999)}{random.randint(111111, 999999)}"
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Identity Card Serial Number"] = np.array(
-            [
-                self._fake_address.state(True) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Network Identification Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Plan Network Name"] = np.array(
-            [
-                f"Network Name {_}" if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Secondary Subscriber ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Tertiary Subscriber ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Current Medicaid Recipient ID Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Original Medicaid Recipient ID Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Family Unit Number"] = np.array(
-            [
-                np.random.choice(["1", "2", "3", "4", "5"])
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Birth Sequence Number"] = np.array(
-            [
-                np.random.choice([1, 2, 3, 4, 5]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Case Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Contract Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Medical Record Identification Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Issue Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Issue Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Care Management Eligible LOag"] = np.array(
-            ["Y" if self.optional_fields else "" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Authorization Indicator"] = np.array(
-            [
-                np.random.choice(["Y", "N"]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Student Status"] = np.array(
-            [
-                np.random.choice(["F", "P", "N"]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Handicap Status"] = np.array(
-            [
-                np.random.choice(["Y", "N"]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Disability type"] = np.array(
-            [
-                np.random.choice([1, 2, 3, 4]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Date of Death"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Period Start Date"] = np.array(
-            [
-                self._fake_date.date(start=1950, end=2000).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Period End Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Premium Paid To Start Date"] = np.array(
-            [
-                self._fake_date.date(start=1950, end=2000).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Premium Paid To End Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Message"] = np.array(
-            [
-                self._fake_text.sentence() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Medical Plan Indicator"] = np.array(
-            ["Y" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Dental Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Prescription Plan Indicator"] = np.array(
-            ["Y" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Vision Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Hospital Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Behavioral / Mental Health Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["TRICARE Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Retiree Drug Subsidy Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Taft-Hartley Plan Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["HSA Account Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["HRA Account Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["FSA Account Indicator"] = np.array(
-            ["Y" if self.optional_fields else "N" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Medicare Plan Code"] = np.array(
-            ["E" if self.optional_fields else "" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Medicare Eligibility Reason Code"] = np.array(
-            ["2" if self.optional_fields else "" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["ESRD Coordination Period End Date"] = np.array(
-            [
-                self._fake_date.date(start=1980, end=2019).strftime("%Y%m%d")
-                if self.detail_schema["Medicare Eligibility Reason Code"][_] == "2"
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Premium Amount"] = np.array(
-            [
-                random.randint(111111111, 999999999) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Rx Group Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Rx Insured ID Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Rx Plan Network Indicator"] = np.array(
-            [np.random.choice(["1", "2", "3"]) for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Small Employer Exception Indicator"] = np.array(
-            [
-                np.random.choice(["Y", "N"]) if self.optional_fields else "N"
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Employee Coverage Code"] = np.array(
-            [
-                np.random.choice(["1", "2", "3"])
-                if self.header_schema["File Validation Code"] in [1, 2, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Employee Status Code"] = np.array(
-            [
-                "CO"
-                if self.optional_fields
-                else np.random.choice(
-                    ["CO", "FT", "PT", "RT", "RW", "AC", "AO", "AU", "L1", "TE"]
-                )
-                if self.header_schema["File Validation Code"] in [1, 2, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["COBRA Begin Date"] = np.array(
-            [
-                self._fake_date.date(start=1960, end=2000).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["COBRA End Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Employment Class Code"] = np.array(
-            [
-                np.random.choice(
-                    [
-                        "01",
-                        "02",
-                        "03",
-                        "04",
-                        "05",
-                        "06",
-                        "07",
-                        "08",
-                        "09",
-                        "10",
-                        "11",
-                        "12",
-                        "17",
-                        "18",
-                        "19",
-                        "20",
-                        "21",
-                        "22",
-                        "23",
-                    ]
-                )
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Income Frequency"] = np.array(
-            [
-                np.random.choice(
-                    [
-                        "1",
-                        "2",
-                        "3",
-                        "4",
-                        "6",
-                        "7",
-                        "8",
-                        "9",
-                        "B",
-                        "C",
-                        "H",
-                        "Q",
-                        "S",
-                        "U",
-                    ]
-                )
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Income"] = np.array(
-            [
-                random.randint(111111111, 999999999) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["RRE ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.header_schema["File Validation Code"] in [1, 2, 4, 5]
-                and self.detail_schema["Medicare Plan Code"][_] not in ["E", "F"]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["COBA ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.header_schema["File Validation Code"] in [3, 4, 5]
-                and self.detail_schema["Medicare Plan Code"][_] == "E"
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["RDS Application Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self.header_schema["File Validation Code"] in [2, 5]
-                and self.detail_schema["Retiree Drug Subsidy Plan Indicator"][_] == "Y"
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Information Status Code"] = np.array(
-            [
-                np.random.choice(["A", "C", "L", "O", "P", "S", "T"])
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Status Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_E) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Service Affiliation Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_C) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Unit"] = np.array(
-            [
-                np.random.choice(
-                    ["corps", "division", "battalion", "company", "platoon"]
-                )
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Service Rank Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_D) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Service Start Date"] = np.array(
-            [
-                self._fake_date.date(start=1950, end=1999).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Military Service End Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2020).strftime("%Y%m%d")
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Health-related Code"] = np.array(
-            [
-                np.random.choice(["N", "S", "T", "U", "X"])
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Height"] = np.array(
-            [
-                self._fake_person.weight() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Weight"] = np.array(
-            [
-                self._fake_person.height() if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Language Code Qualifier"] = np.array(
-            [
-                np.random.choice(["LD", "LE"]) if self.optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Language Reading Code"] = np.array(
-            [
-                self._fake_code.locale_code()[:2].upper()
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Language Writing Code"] = np.array(
-            [
-                self._fake_code.locale_code()[:2].upper()
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Language Speaking Code"] = np.array(
-            [
-                self._fake_code.locale_code()[:2].upper()
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Native Language Code"] = np.array(
-            [
-                self._fake_code.locale_code()[:2].upper()
-                if self.optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
 
-    def _generate_trailer_schema(self):
-        self.trailer_schema["RecordID"] = "TRLR"
-        self.trailer_schema["Record Count"] = self._entries_number
+class RTEligibbility(RTFile):
+    HEADER = RecordSpec(
+        *header_fields("Elig", release_code="01"),
+        Field(
+            "File Validation Code",
+            Constant("5"),
+            when=OPTIONAL,
+            otherwise=Choice(["0", "1", "2", "3", "4", "5"]),
+        ),
+        Field("Rosters Indicator", YES, when=OPTIONAL, otherwise="N"),
+    )
+    DETAIL = RecordSpec(
+        Field("Record Id", Constant("DTL")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", AlphaNumeric()),
+        Field(
+            "Action Indicator",
+            Choice(["I", "L"]),
+            when=header_is("Load Type", "F"),
+            otherwise=Choice(["U", "D"]),
+        ),
+        Field("Maintenance Reason Code", Choice(CODE_SET_A), when=ROSTERS),
+        Field("Correction Indicator", YES, when=OPTIONAL, otherwise="N"),
+        Field("Primary Subscriber ID", AlphaNumeric(unique=True)),
+        Field("Unique Patient ID (UPID)", AlphaNumeric(unique=True), when=OPTIONAL),
+        Field(
+            "Member Relationship to Subscriber",
+            Choice(CODE_SET_B),
+            when=ROSTERS,
+            otherwise=Choice(["01", "18", "19", "20", "21", "53", "G8"]),
+        ),
+        Field("Member Date of Birth", Date(1930, 2019)),
+        Field("Member Last Name", Fake("person", "last_name")),
+        Field("Member First Name", Fake("person", "first_name")),
+        Field("Member Middle Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Member Name Prefix", Choice(["Mr", "Ms", "Prince"]), when=OPTIONAL),
+        Field(
+            "Member Name Suffix",
+            Choice(["I", "II", "III", "IV", "Jr", "Sr"]),
+            when=OPTIONAL,
+        ),
+        Field("Member Gender", Choice(["M", "F", "U"])),
+        Field("Member Street Address 1", Fake("address", "address")),
+        Field("Member Street Address 2", Fake("address", "address"), when=OPTIONAL),
+        Field("Member City", Fake("address", "city"), when=OPTIONAL),
+        Field("Member State", Fake("address", "state", True), when=OPTIONAL),
+        Field("Member ZIP Code", Fake("address", "zip_code"), when=OPTIONAL),
+        Field(
+            "Member Country",
+            Fake("address", "country_code", CountryCode.A3),
+            when=OPTIONAL,
+        ),
+        Field("Member Country Subdivision", Fake("address", "province"), when=OPTIONAL),
+        Field("Member Work Phone", Digits(10), when=OPTIONAL),
+        Field("Member Home Phone", Digits(10), when=OPTIONAL),
+        Field("Member Plan Effective Date", Date(1930, 2019)),
+        Field("Member Plan Termination Date", Date(2000, 2030), when=OPTIONAL),
+        Field("Member Plan Number", AlphaNumeric()),
+        Field("Member Plan Name", Numbered("Plan "), when=OPTIONAL),
+        Field("Member Group Number", AlphaNumeric(), when=validation_code(2, 5)),
+        Field("Member Group Name", Numbered("Group "), when=OPTIONAL),
+        Field(
+            "Member Insurance Policy Number",
+            Bothify("??#####??"),
+            when=validation_code(2, 5),
+        ),
+        Field(
+            "Member Insurance Policy Effective Date", Date(1950, 2020), when=OPTIONAL
+        ),
+        Field(
+            "Member Insurance Policy Expiration Date", Date(2020, 2030), when=OPTIONAL
+        ),
+        Field("Member Status Code", Choice(["1", "2", "3", "4", "5", "6", "7", "8"])),
+        Field(
+            "Member Social Security Number",
+            Integer(111111111, 1000000000),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Health Insurance Claim (HIC) Number",
+            Digits(10),
+            when=validation_code(3, 4, 5),
+        ),
+        Field(
+            "Member Identity Card Number",
+            Concat(Integer(11111, 100000), Integer(111111, 1000000)),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Member Identity Card Serial Number",
+            Fake("address", "state", True),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Member Plan Network Identification Number", AlphaNumeric(), when=OPTIONAL
+        ),
+        Field("Member Plan Network Name", Numbered("Network Name "), when=OPTIONAL),
+        Field("Secondary Subscriber ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Tertiary Subscriber ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Current Medicaid Recipient ID Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Original Medicaid Recipient ID Number", AlphaNumeric(), when=OPTIONAL),
+        Field(
+            "Member Family Unit Number",
+            Choice(["1", "2", "3", "4", "5"]),
+            when=OPTIONAL,
+        ),
+        Field("Member Birth Sequence Number", Choice([1, 2, 3, 4, 5]), when=OPTIONAL),
+        Field("Case Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Contract Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Medical Record Identification Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Issue Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Issue Date", Date(2000, 2020), when=OPTIONAL),
+        Field("Care Management Eligible LOag", YES, when=OPTIONAL),
+        Field("Authorization Indicator", Choice(["Y", "N"]), when=OPTIONAL),
+        Field("Member Student Status", Choice(["F", "P", "N"]), when=OPTIONAL),
+        Field("Member Handicap Status", Choice(["Y", "N"]), when=OPTIONAL),
+        Field("Disability type", Choice([1, 2, 3, 4]), when=OPTIONAL),
+        Field("Date of Death", Date(2000, 2020), when=OPTIONAL),
+        Field("Period Start Date", Date(1950, 2000), when=OPTIONAL),
+        Field("Period End Date", Date(2000, 2020), when=OPTIONAL),
+        Field("Premium Paid To Start Date", Date(1950, 2000), when=OPTIONAL),
+        Field("Premium Paid To End Date", Date(2000, 2020), when=OPTIONAL),
+        Field("Message", Fake("text", "sentence"), when=OPTIONAL),
+        Field("Medical Plan Indicator", YES),
+        Field("Dental Plan Indicator", YES, when=OPTIONAL, otherwise="N"),
+        Field("Prescription Plan Indicator", YES),
+        *(
+            Field(indicator, YES, when=OPTIONAL, otherwise="N")
+            for indicator in [
+                "Vision Plan Indicator",
+                "Hospital Plan Indicator",
+                "Behavioral / Mental Health Plan Indicator",
+                "TRICARE Plan Indicator",
+                "Retiree Drug Subsidy Plan Indicator",
+                "Taft-Hartley Plan Indicator",
+                "HSA Account Indicator",
+                "HRA Account Indicator",
+                "FSA Account Indicator",
+            ]
+        ),
+        Field("Medicare Plan Code", Constant("E"), when=OPTIONAL),
+        Field("Medicare Eligibility Reason Code", Constant("2"), when=OPTIONAL),
+        Field(
+            "ESRD Coordination Period End Date",
+            Date(1980, 2019),
+            when=Matches("Medicare Eligibility Reason Code", "2"),
+        ),
+        Field("Premium Amount", Integer(111111111, 1000000000), when=OPTIONAL),
+        Field("Rx Group Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Rx Insured ID Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Rx Plan Network Indicator", Choice(["1", "2", "3"])),
+        Field(
+            "Small Employer Exception Indicator",
+            Choice(["Y", "N"]),
+            when=OPTIONAL,
+            otherwise="N",
+        ),
+        Field(
+            "Employee Coverage Code",
+            Choice(["1", "2", "3"]),
+            when=validation_code(1, 2, 4, 5),
+        ),
+        Field(
+            "Employee Status Code",
+            Constant("CO"),
+            when=OPTIONAL,
+            otherwise=Branch(
+                Choice(["CO", "FT", "PT", "RT", "RW", "AC", "AO", "AU", "L1", "TE"]),
+                when=validation_code(1, 2, 4, 5),
+            ),
+        ),
+        Field("COBRA Begin Date", Date(1960, 2000), when=OPTIONAL),
+        Field("COBRA End Date", Date(2000, 2020), when=OPTIONAL),
+        Field(
+            "Employment Class Code",
+            Choice(
+                [
+                    "01",
+                    "02",
+                    "03",
+                    "04",
+                    "05",
+                    "06",
+                    "07",
+                    "08",
+                    "09",
+                    "10",
+                    "11",
+                    "12",
+                    "17",
+                    "18",
+                    "19",
+                    "20",
+                    "21",
+                    "22",
+                    "23",
+                ]
+            ),
+            when=OPTIONAL,
+        ),
+        Field(
+            "Member Income Frequency",
+            Choice(
+                ["1", "2", "3", "4", "6", "7", "8", "9", "B", "C", "H", "Q", "S", "U"]
+            ),
+            when=OPTIONAL,
+        ),
+        Field("Member Income", Integer(111111111, 1000000000), when=OPTIONAL),
+        Field(
+            "RRE ID",
+            Branch(AlphaNumeric(), when=validation_code(1, 2, 4, 5)),
+            when=Matches("Medicare Plan Code", "E", "F", negate=True),
+        ),
+        Field(
+            "COBA ID",
+            Branch(AlphaNumeric(), when=validation_code(3, 4, 5)),
+            when=Matches("Medicare Plan Code", "E"),
+        ),
+        Field(
+            "RDS Application Number",
+            Branch(AlphaNumeric(), when=validation_code(2, 5)),
+            when=Matches("Retiree Drug Subsidy Plan Indicator", "Y"),
+        ),
+        Field(
+            "Military Information Status Code",
+            Choice(["A", "C", "L", "O", "P", "S", "T"]),
+            when=OPTIONAL,
+        ),
+        Field("Military Status Code", Choice(CODE_SET_E), when=OPTIONAL),
+        Field("Military Service Affiliation Code", Choice(CODE_SET_C), when=OPTIONAL),
+        Field(
+            "Military Unit",
+            Choice(["corps", "division", "battalion", "company", "platoon"]),
+            when=OPTIONAL,
+        ),
+        Field("Military Service Rank Code", Choice(CODE_SET_D), when=OPTIONAL),
+        Field("Military Service Start Date", Date(1950, 1999), when=OPTIONAL),
+        Field("Military Service End Date", Date(2000, 2020), when=OPTIONAL),
+        Field(
+            "Health-related Code", Choice(["N", "S", "T", "U", "X"]), when=OPTIONAL
+        ),
+        Field("Member Height", Fake("person", "weight"), when=OPTIONAL),
+        Field("Member Weight", Fake("person", "height"), when=OPTIONAL),
+        Field("Language Code Qualifier", Choice(["LD", "LE"]), when=OPTIONAL),
+        Field("Language Reading Code", LANGUAGE_CODE, when=OPTIONAL),
+        Field("Language Writing Code", LANGUAGE_CODE, when=OPTIONAL),
+        Field("Language Speaking Code", LANGUAGE_CODE, when=OPTIONAL),
+        Field("Native Language Code", LANGUAGE_CODE, when=OPTIONAL),
+    )
+    TRAILER = RecordSpec(
+        Field("RecordID", Constant("TRLR")),
+        Field("Record Count", RecordCount()),
+    )
+    FILE_NAME = "{timestamp}_{header[Trading Partner ID]}_test.elig31.txt"
 
-    def generate_all_schemas(self):
 
-        self._generate_header_schema()
-        self._generate_detail_schema()
-        self._generate_trailer_schema()
-        self._file_name = f'{datetime.now().strftime("%Y%m%d%H%M%S")}_{self.header_schema["Trading Partner ID"]}_test.elig31.txt'
+class RTEligibilityDelta(RTEligibbility):
+    """
+    Delta ("D") or incremental ("I") eligibility load against an existing
+    member population: updates and deletes reference subscriber IDs of the
+    member index, adds get new IDs. Only the changed members are generated.
 
-    def _one_line_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for key in schema.keys():
-                file.write(f"{schema[key]}|".encode("ascii", "ignore"))
-            file.write("\n".encode("ascii"))
+    :param member_index: MemberIndex of the full load
+    :param churn_rate: changed members over the population size
+    :param action_mix: dict of action indicator -> share of changed members
+    """
 
-    def _detailed_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for _ in range(self._entries_number):
-                for key in schema.keys():
-                    file.write(f"{schema[key][_]}|".encode("ascii", "ignore"))
-                file.write("\n".encode("ascii"))
+    def __init__(
+        self,
+        member_index,
+        churn_rate=0.01,
+        load_type="D",
+        optional_fields=False,
+        chunk_size=None,
+        seed=None,
+        processes=1,
+        action_mix=None,
+    ):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(3,)))
+        self.subscriber_ids, self.actions = member_index.delta(
+            churn_rate, rng, action_mix
+        )
+        self.member_index = member_index
+        super().__init__(
+            len(self.subscriber_ids),
+            load_type,
+            optional_fields,
+            chunk_size,
+            seed,
+            processes,
+        )
 
-    def schemas_to_file(self, filepath=None):
-        now = datetime.now()
-        filepath = (
-            filepath
-            if filepath
-            else Path(f"{Path.cwd()}/{now.year}/{now.month}/{now.day}")
+    def _compile_detail(self):
+        self._compile(
+            "detail",
+            self.DETAIL.replaced(
+                {
+                    "Primary Subscriber ID": Given(self.subscriber_ids),
+                    "Action Indicator": Given(self.actions),
+                }
+            ),
         )
-        Path(filepath).mkdir(exist_ok=True, parents=True)
 
-        self._one_line_schema_to_file(self.header_schema, filepath)
-        self._detailed_schema_to_file(self.detail_schema, filepath)
-        self._one_line_schema_to_file(self.trailer_schema, filepath)
+    def updated_member_index(self):
+        """MemberIndex after this load, the base of the next delta."""
+        return self.member_index.applied(self.subscriber_ids, self.actions)
+
 
-        return f"{filepath}/{self._file_name}"
+def member_index(path):
+    """
+    MemberIndex of an eligibility file, read from its Primary Subscriber ID
+    field, or loaded from a ``.npy`` index saved by ``MemberIndex.save``.
+    """
+    if str(path).endswith(".npy"):
+        return MemberIndex.load(path)
+    position = [field.name for field in RTEligibbility.DETAIL.fields].index(
+        "Primary Subscriber ID"
+    )
+    return MemberIndex.from_file(path, position)
 
 
 if __name__ == "__main__":
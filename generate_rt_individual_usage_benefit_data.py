@@ -1,10 +1,31 @@
-from datetime import datetime
-from pathlib import Path
-
 import numpy as np
-from mimesis import Person, Datetime, Code, Address, Text
 
-from generate_rt_eligibility_data import AN_DATA_TYPE
+from generate_rt_plan_benefit_data import MEDICAL_ASSISTANCE_CATEGORY, PERCENTAGE
+from generate_rt_standart_benefit_entity_data import (
+    COVERAGE_LEVEL_CODES,
+    ENTITY,
+    ENTITY_IDENTIFIER_CODES,
+    ENTITY_ROLE_CODES,
+)
+from generator_helpers.entity_catalog import EntityCatalog
+from generator_helpers.rt_schema import (
+    OPTIONAL,
+    AlphaNumeric,
+    Choice,
+    Constant,
+    Date,
+    Fake,
+    Field,
+    Integer,
+    Mapped,
+    Parent,
+    RecordCount,
+    RecordNumber,
+    RecordSpec,
+    RTFile,
+    header_fields,
+    validation_code,
+)
 
 CODE_SET_B = np.array(
     [
@@ -314,56 +335,6 @@ CODE_SET_F = np.array(
         "YY",
     ]
 )
-CODE_SET_G = np.array(
-    [
-        "AD",
-        "AT",
-        "BI",
-        "CO",
-        "CV",
-        "H",
-        "HH",
-        "LA",
-        "OT",
-        "P1",
-        "P2",
-        "PC",
-        "PE",
-        "R",
-        "RF",
-        "SB",
-        "SK",
-        "SU",
-    ]
-)
-CODE_SET_H = np.array(
-    [
-        "13",
-        "1I",
-        "1P",
-        "2B",
-        "36",
-        "FE",
-        "73",
-        "FA",
-        "GP",
-        "GW",
-        "I3",
-        "IL",
-        "LR",
-        "OC",
-        "P3",
-        "P4",
-        "P5",
-        "PR",
-        "PRP",
-        "SEP",
-        "TTP",
-        "VN",
-        "VY",
-        "X3",
-    ]
-)
 CODE_SET_I = np.array(
     ["24", "34", "46", "FA", "FI", "MI", "II", "NI", "PI", "PP", "PT", "SV", "XV", "XX"]
 )
@@ -434,426 +405,150 @@ INJURY_CODES = {
 }
 
 
-class RTIndividualUsageBenefitData:
-    def __init__(self, entries_number: int, load_type: str, optional_fields: bool):
-        self._fake_person = Person("en")
-        self._fake_date = Datetime()
-        self._fake_address = Address("en")
-        self._fake_code = Code()
-        self._fake_text = Text()
-
-        self._optional_fields = optional_fields
-        self._load_type = load_type
-        self._entries_number = entries_number
-        self._file_name = ""
-        self._header_schema = {}
-        self._detail_schema = {}
-        self._trailer_schema = {}
-
-    def _generate_header_schema(self):
-        self._header_schema["Record Id"] = "HDR"
-        self._header_schema["File Group ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self._header_schema["File Group Sequence Number"] = "1"
-        self._header_schema["File Group Count"] = "1"
-        self._header_schema["Creation Date"] = self._fake_date.date(
-            start=1980, end=2019
-        ).strftime("%Y%m%d")
-        self._header_schema["Creation Time"] = self._fake_date.time().strftime("%H%M%S")
-        self._header_schema["Trading Partner ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self._header_schema["Submitter Name"] = self._fake_person.first_name()
-        self._header_schema["Payer Contact Name"] = (
-            self._fake_person.first_name() if self._optional_fields else ""
-        )
-        self._header_schema["Payer Support Telephone Number"] = (
-            self._fake_person.telephone("##########") if self._optional_fields else ""
-        )
-        self._header_schema["Payer Support Email Address"] = (
-            self._fake_person.email() if self._optional_fields else ""
-        )
-        self._header_schema["Load Type"] = self._load_type
-        self._header_schema["Payer Unique File Identifier"] = datetime.now().strftime(
-            "%Y%m%d%H%M%S"
-        )
-        self._header_schema["File Type"] = "IndiUsag"
-        self._header_schema["Version Code"] = "03"
-        self._header_schema["Release Code"] = "00"
-        self._header_schema["File Validation Code"] = np.random.choice(
-            [0, 1, 2, 3, 4, 5]
-        )
-
-    def _generate_detail_schema(self):
-        self._detail_schema["Record ID"] = np.array(
-            ["DTL" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Record Number"] = np.array(
-            [_ for _ in range(2, self._entries_number + 2)]
-        )
-        self._detail_schema["Payer ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Maintenance Type Code"] = np.array(
-            [
-                np.random.choice(["D", "I", "L", "U"])
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Patient ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Subscriber ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Information"] = np.array(
-            [
-                np.random.choice(CODE_SET_B_REQUIRED)
-                if self._header_schema["File Validation Code"] in [1, 2, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Coverage Level Code"] = np.array(
-            [
-                np.random.choice(
-                    ["CHD", "DEP", "ECH", "EMP", "ESP", "FAM", "IND", "SPC", "SPO"]
-                )
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Service Type Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_C)
-                if self._header_schema["File Validation Code"] in [1, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Insurance Type Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_D) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Procedure Qualifier"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Code"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Range End"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Modifier 1"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Modifier 2"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Modifier 3"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Procedure Modifier 4"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Plan Coverage Description"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Time Period Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_E) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Amount"] = np.array(
-            [
-                np.random.randint(11111, 99999) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Percentage"] = np.array(
-            [
-                str(np.random.randint(1, 100) / 100)[1:]
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Quantity Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_F) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Quantity"] = np.array(
-            [
-                np.random.randint(1, 99999) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Authorization/Certification Indicator"] = np.array(
-            [
-                np.random.choice(["Y", "N"]) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["In Plan Network Indicator"] = np.array(
-            [
-                np.random.choice(["Y", "N", "U", "W"]) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Member Plan Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Member Group Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Message 1"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Benefit Message 2"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Benefit Message 3"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Benefit Message 4"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Benefit Message 5"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self._detail_schema["Nature of Injury Code Qualifier"] = np.array(
-            [
-                np.random.choice(["GR", "NI"]) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Nature of Injury Code"] = np.array(
-            [
-                np.random.choice(list(INJURY_CODES.keys()))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Injured Body Part Name"] = np.array(
-            [
-                INJURY_CODES[self._detail_schema["Nature of Injury Code"][_]]
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Facility Type Code"] = np.array(
-            [
-                np.random.choice([1, 2, 3, 4, 6, 7, 8]) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Alternative List ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Coverage List ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Drug Formulary Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=5))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Medical Assistance Category"] = np.array(
-            [
-                np.random.choice(
-                    [
-                        "HIV/ AIDS",
-                        "Medicaid and Medicare",
-                        "Medicare Social Security",
-                        "Disability Assistance",
-                        "Veterans Health",
-                        "Children's Health",
-                        "Counsel and Counseling",
-                    ]
-                )
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Begin Date"] = np.array(
-            [
-                self._fake_date.date(start=2000, end=2010).strftime("%Y%m%d")
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit End Date"] = np.array(
-            [
-                self._fake_date.date(start=2010, end=2020).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Entity Identifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_H)
-                if self._header_schema["File Validation Code"] in [1, 2, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Entity ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Entity ID Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_I)
-                if self._header_schema["File Validation Code"] in [1, 2, 4, 5]
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Benefit Entity Role"] = np.array(
-            [
-                np.random.choice(CODE_SET_G) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Quantity Qualifier"] = np.array(
-            [
-                np.random.choice(["DY", "LO", "HS", "MN", "VS"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Quantity"] = np.array(
-            [
-                np.random.randint(1, 50) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Sampling Frequency Qualifier"] = np.array(
-            [
-                np.random.choice(["DY", "LO", "HS", "MN", "VS"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Sampling Frequency"] = np.array(
-            [
-                np.random.randint(1, 10) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Period Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_L) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Period Count"] = np.array(
-            [
-                np.random.randint(1, 50) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Pattern Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_K) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self._detail_schema["Delivery Time Code"] = np.array(
-            [
-                np.random.choice(["A", "B", "C", "D", "E", "F", "G", "Y"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-
-    def _generate_trailer_schema(self):
-        self._trailer_schema["RecordID"] = "TRLR"
-        self._trailer_schema["Record Count"] = self._entries_number
-
-    def generate_all_schemas(self):
-        self._generate_header_schema()
-        self._generate_detail_schema()
-        self._generate_trailer_schema()
-        self._file_name = f'{datetime.now().strftime("%Y%m%d%H%M%S")}_{self._header_schema["Trading Partner ID"]}_test.indi'
+class RTIndividualUsageBenefitData(RTFile):
+    HEADER = RecordSpec(
+        *header_fields("IndiUsag"),
+        Field("File Validation Code", Choice(["0", "1", "2", "3", "4", "5"])),
+    )
+    DETAIL = RecordSpec(
+        Field("Record ID", Constant("DTL")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", AlphaNumeric()),
+        Field("Maintenance Type Code", Choice(["D", "I", "L", "U"])),
+        Field("Patient ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Subscriber ID", AlphaNumeric()),
+        Field(
+            "Benefit Information",
+            Choice(CODE_SET_B_REQUIRED),
+            when=validation_code(1, 2, 4, 5),
+        ),
+        Field(
+            "Coverage Level Code",
+            Choice(COVERAGE_LEVEL_CODES),
+            when=OPTIONAL,
+        ),
+        Field("Service Type Code", Choice(CODE_SET_C), when=validation_code(1, 4, 5)),
+        Field("Insurance Type Code", Choice(CODE_SET_D), when=OPTIONAL),
+        Field("Procedure Qualifier", Constant("")),
+        Field("Procedure Code", Constant("")),
+        Field("Procedure Range End", Constant("")),
+        Field("Procedure Modifier 1", Constant("")),
+        Field("Procedure Modifier 2", Constant("")),
+        Field("Procedure Modifier 3", Constant("")),
+        Field("Procedure Modifier 4", Constant("")),
+        Field("Plan Coverage Description", Fake("text", "sentence"), when=OPTIONAL),
+        Field("Time Period Qualifier", Choice(CODE_SET_E), when=OPTIONAL),
+        Field("Benefit Amount", Integer(11111, 99999), when=OPTIONAL),
+        Field("Benefit Percentage", PERCENTAGE, when=OPTIONAL),
+        Field("Quantity Qualifier", Choice(CODE_SET_F), when=OPTIONAL),
+        Field("Quantity", Integer(1, 99999), when=OPTIONAL),
+        Field(
+            "Authorization/Certification Indicator", Choice(["Y", "N"]), when=OPTIONAL
+        ),
+        Field("In Plan Network Indicator", Choice(["Y", "N", "U", "W"]), when=OPTIONAL),
+        Field("Member Plan Number", AlphaNumeric()),
+        Field("Member Group Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Benefit Message 1", Constant("")),
+        Field("Benefit Message 2", Constant("")),
+        Field("Benefit Message 3", Constant("")),
+        Field("Benefit Message 4", Constant("")),
+        Field("Benefit Message 5", Constant("")),
+        Field("Nature of Injury Code Qualifier", Choice(["GR", "NI"]), when=OPTIONAL),
+        Field("Nature of Injury Code", Choice(list(INJURY_CODES)), when=OPTIONAL),
+        Field(
+            "Injured Body Part Name",
+            Mapped("Nature of Injury Code", INJURY_CODES),
+            when=OPTIONAL,
+        ),
+        Field("Facility Type Code", Choice([1, 2, 3, 4, 6, 7, 8]), when=OPTIONAL),
+        Field("Alternative List ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Coverage List ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Drug Formulary Number", AlphaNumeric(5), when=OPTIONAL),
+        Field("Medical Assistance Category", MEDICAL_ASSISTANCE_CATEGORY),
+        Field("Benefit Begin Date", Date(2000, 2010)),
+        Field("Benefit End Date", Date(2010, 2020), when=OPTIONAL),
+        Field(
+            "Benefit Entity Identifier",
+            Choice(ENTITY_IDENTIFIER_CODES),
+            when=validation_code(1, 2, 4, 5),
+        ),
+        Field("Benefit Entity ID", AlphaNumeric(), when=OPTIONAL),
+        Field(
+            "Benefit Entity ID Qualifier",
+            Choice(CODE_SET_I),
+            when=validation_code(1, 2, 4, 5),
+        ),
+        Field("Benefit Entity Role", Choice(ENTITY_ROLE_CODES), when=OPTIONAL),
+        Field(
+            "Delivery Quantity Qualifier",
+            Choice(["DY", "LO", "HS", "MN", "VS"]),
+            when=OPTIONAL,
+        ),
+        Field("Delivery Quantity", Integer(1, 50), when=OPTIONAL),
+        Field(
+            "Delivery Sampling Frequency Qualifier",
+            Choice(["DY", "LO", "HS", "MN", "VS"]),
+            when=OPTIONAL,
+        ),
+        Field("Delivery Sampling Frequency", Integer(1, 10), when=OPTIONAL),
+        Field("Delivery Period Qualifier", Choice(CODE_SET_L), when=OPTIONAL),
+        Field("Delivery Period Count", Integer(1, 50), when=OPTIONAL),
+        Field("Delivery Pattern Code", Choice(CODE_SET_K), when=OPTIONAL),
+        Field(
+            "Delivery Time Code",
+            Choice(["A", "B", "C", "D", "E", "F", "G", "Y"]),
+            when=OPTIONAL,
+        ),
+    )
+    TRAILER = RecordSpec(
+        Field("RecordID", Constant("TRLR")),
+        Field("Record Count", RecordCount()),
+    )
+    FILE_NAME = "{timestamp}_{header[Trading Partner ID]}_test.indi"
 
-    def _one_line_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for key in schema.keys():
-                file.write(f"{schema[key]}|".encode("ascii", "ignore"))
-            file.write("\n".encode("ascii"))
+    def __init__(
+        self,
+        entries_number: int,
+        load_type: str,
+        optional_fields: bool = False,
+        chunk_size: int = None,
+        seed: int = None,
+        processes: int = 1,
+        entity_catalog: EntityCatalog = None,
+    ):
+        """
+        :param entity_catalog: EntityCatalog of the standard benefit entity
+            file; every record then references one of its entities instead
+            of random entity fields
+        """
+        super().__init__(
+            entries_number, load_type, optional_fields, chunk_size, seed, processes
+        )
+        self.entity_catalog = entity_catalog
 
-    def _detailed_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for _ in range(self._entries_number):
-                for key in schema.keys():
-                    file.write(f"{schema[key][_]}|".encode("ascii", "ignore"))
-                file.write("\n".encode("ascii"))
+    def _compile_detail(self):
+        if self.entity_catalog is None:
+            return super()._compile_detail()
+        kinds = {field.name: Parent(field.name) for field in ENTITY.fields}
+        # the reference to the entity is always written, the entity fields
+        # keep the rules of the layout
+        detail = self.DETAIL.replaced(
+            {"Benefit Entity ID": kinds.pop("Benefit Entity ID")}
+        ).replaced(kinds, keep_rules=True)
+        self._compile("detail", detail)
 
-    def schemas_to_file(self, filepath=None):
-        now = datetime.now()
-        filepath = (
-            filepath
-            if filepath
-            else Path(f"{Path.cwd()}/{now.year}/{now.month}/{now.day}")
+    def _generate_chunk(self, ctx, start, size):
+        if self.entity_catalog is None:
+            return super()._generate_chunk(ctx, start, size)
+        entities = ctx.rng.integers(0, len(self.entity_catalog), size=size)
+        return self._records["detail"].generate(
+            ctx.batch(
+                size,
+                start=start,
+                parent=self.entity_catalog.columns,
+                parent_index=entities,
+            )
         )
-        Path(filepath).mkdir(exist_ok=True, parents=True)
-
-        self._one_line_schema_to_file(self._header_schema, filepath)
-        self._detailed_schema_to_file(self._detail_schema, filepath)
-        self._one_line_schema_to_file(self._trailer_schema, filepath)
-
-        return f"{filepath}/{self._file_name}"
 
 
 if __name__ == "__main__":
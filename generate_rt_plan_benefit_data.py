@@ -1,10 +1,23 @@
-from datetime import datetime
-
 import numpy as np
-from mimesis import Person, Datetime, Address, Code, Text
-from pathlib import Path
 
-from generate_rt_eligibility_data import AN_DATA_TYPE
+from generator_helpers.rt_schema import (
+    OPTIONAL,
+    AlphaNumeric,
+    CatalogRecord,
+    Choice,
+    Constant,
+    Date,
+    Fake,
+    Field,
+    Integer,
+    Mapped,
+    PayerId,
+    RecordCount,
+    RecordNumber,
+    RecordSpec,
+    RTFile,
+    header_fields,
+)
 
 BODY_PART_NAME = np.array(
     [
@@ -415,409 +428,153 @@ CODE_SET_I = np.array(
 )
 
 
-class RTPlanBenefitData:
-    def __init__(
-        self, entries_number: int, load_type: str, optional_fields: bool = False
-    ):
-        self._fake_person = Person("en")
-        self._fake_date = Datetime()
-        self._fake_text = Text()
-
-        self._optional_fields = optional_fields
-        self.load_type = load_type
-        self._entries_number = entries_number
-        self._file_name = ""
-        self._payer_id = "".join(np.random.choice(AN_DATA_TYPE, size=10))
-        self.header_schema = {}
-        self.detail_schema = {}
-        self.trailer_schema = {}
-
-    def _generate_header_schema(self):
-        self.header_schema["Record Id"] = "HDR"
-        self.header_schema["File Group ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self.header_schema["File Group Sequence Number"] = "1"
-        self.header_schema["File Group Count"] = "1"
-        self.header_schema["Creation Date"] = self._fake_date.date(
-            start=1980, end=2019
-        ).strftime("%Y%m%d")
-        self.header_schema["Creation Time"] = self._fake_date.time().strftime("%H%M%S")
-        self.header_schema["Trading Partner ID"] = "".join(
-            np.random.choice(AN_DATA_TYPE, size=10)
-        )
-        self.header_schema["Submitter Name"] = self._fake_person.first_name()
-        self.header_schema["Payer Contact Name"] = (
-            self._fake_person.first_name() if self._optional_fields else ""
-        )
-        self.header_schema["Payer Support Telephone Number"] = (
-            self._fake_person.telephone("##########") if self._optional_fields else ""
-        )
-        self.header_schema["Payer Support Email Address"] = (
-            self._fake_person.email() if self._optional_fields else ""
-        )
-        self.header_schema["Load Type"] = self.load_type
-        self.header_schema["Payer Unique File Identifier"] = datetime.now().strftime(
-            "%Y%m%d%H%M%S"
-        )
-        self.header_schema["File Type"] = "Planbene"
-        self.header_schema["Version Code"] = "03"
-        self.header_schema["Release Code"] = "00"
-        self.header_schema["File Validation Code"] = (
-            5 if self._optional_fields else np.random.choice([0, 1, 2, 3, 4, 5])
-        )
-        self.header_schema["Record Terminator"] = "CR"
-
-    def _generate_detail_schema(self):
-        self.detail_schema["Record Id"] = np.array(
-            ["DTL" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Record Number"] = np.array(
-            [_ for _ in range(2, self._entries_number + 2)]
-        )
-        self.detail_schema["Payer ID"] = np.array(
-            [self._payer_id for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Maintenance Type Code"] = np.array(
-            ["030" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Member Plan Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Member Group Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Information"] = np.array(
-            [np.random.choice(CODE_SET_C) for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Service Type Code"] = np.array(
-            [np.random.choice(CODE_SET_B) for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Coverage Level Code"] = np.array(
-            [
-                np.random.choice(
-                    np.array(
-                        ["CHD", "DEP", "ECH", "EMP", "ESP", "FAM", "IND", "SPC", "SPO"]
-                    )
-                )
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Insurance Type Code"] = np.array(
-            [
-                np.random.choice(CODE_SET_D) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Procedure Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_G) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Procedure Code"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=5))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Procedure Range End"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=5))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Procedure Modifier 1"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Procedure Modifier 2"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Procedure Modifier 3"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Procedure Modifier 4"] = np.array(
-            ["" for _ in range(self._entries_number)]
-        )
-        self.detail_schema["Plan Coverage Description"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Time Period Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_E) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Amount"] = np.array(
-            [
-                np.random.randint(1, 9999999) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Percentage"] = np.array(
-            [
-                str(np.random.randint(1, 100) / 100)[1:]
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Quantity Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_F) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Quantity"] = np.array(
-            [
-                np.random.randint(1, 9999999) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Authorization/Certification Indicator"] = np.array(
-            [
-                np.random.choice(np.array(["Y", "N", "U"]))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["In Plan Network Indicator"] = np.array(
-            [
-                np.random.choice(np.array(["Y", "N", "U", "W"]))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefits Effective Date"] = np.array(
-            [
-                self._fake_date.date(start=2010, end=2015).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefits Termination Date"] = np.array(
-            [
-                self._fake_date.date(start=2015, end=2020).strftime("%Y%m%d")
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Message 1"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Message 2"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Message 3"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Message 4"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Benefit Message 5"] = np.array(
-            [
-                self._fake_text.sentence() if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Nature of Injury Code Qualifier"] = np.array(
-            [
-                np.random.choice(list(NOIC.keys())) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Nature of Injury Code"] = np.array(
-            [
-                NOIC[self.detail_schema["Nature of Injury Code Qualifier"][_]]
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Injured Body Part Name"] = np.array(
-            [
-                np.random.choice(BODY_PART_NAME) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Facility Type Code"] = np.array(
-            [
-                np.random.choice([1, 2, 3, 4, 6, 7, 8]) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Alternative List ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Coverage List ID"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=10))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Drug Formulary Number"] = np.array(
-            [
-                "".join(np.random.choice(AN_DATA_TYPE, size=5))
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Medical Assistance Category"] = np.array(
-            [
-                np.random.choice(
-                    [
-                        "HIV/ AIDS",
-                        "Medicaid and Medicare",
-                        "Medicare Social Security",
-                        "Disability Assistance",
-                        "Veterans Health",
-                        "Children's Health",
-                        "Counsel and Counseling",
-                    ]
-                )
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Quantity Qualifier"] = np.array(
-            [
-                np.random.choice(["DY", "LO", "HS", "MN", "VS"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Quantity"] = np.array(
-            [
-                np.random.randint(1, 50) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Sampling Frequency Qualifier"] = np.array(
-            [
-                np.random.choice(["DA", "MO", "VS", "WK", "YR"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Sampling Frequency"] = np.array(
-            [
-                np.random.randint(1, 10) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Period Qualifier"] = np.array(
-            [
-                np.random.choice(CODE_SET_I) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Period Count "] = np.array(
-            [
-                np.random.randint(1, 10) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Pattern Code "] = np.array(
-            [
-                np.random.choice(CODE_SET_H) if self._optional_fields else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Delivery Time Code"] = np.array(
-            [
-                np.random.choice(["A", "B", "C", "D", "E", "F", "G", "Y"])
-                if self._optional_fields
-                else ""
-                for _ in range(self._entries_number)
-            ]
-        )
-        self.detail_schema["Record Terminator "] = np.array(
-            ["CR" for _ in range(self._entries_number)]
-        )
-
-    def _generate_trailer_schema(self):
-        self.trailer_schema["RecordID"] = "TRLR"
-        self.trailer_schema["Record Count"] = self._entries_number
-        self.trailer_schema["Record Terminator "] = "CR"
-
-    def generate_all_schemas(self):
+PERCENTAGE = Choice([str(percent / 100)[1:] for percent in range(1, 100)])
+SENTENCE = Fake("text", "sentence")
+MEDICAL_ASSISTANCE_CATEGORY = Choice(
+    [
+        "HIV/ AIDS",
+        "Medicaid and Medicare",
+        "Medicare Social Security",
+        "Disability Assistance",
+        "Veterans Health",
+        "Children's Health",
+        "Counsel and Counseling",
+    ]
+)
 
-        self._generate_header_schema()
-        self._generate_detail_schema()
-        self._generate_trailer_schema()
-        self._file_name = (
-            f'{datetime.now().strftime("%Y%m%d%H%M%S")}_{self._payer_id}_test.plan'
-        )
 
-    def _one_line_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for key in schema.keys():
-                file.write(f"{schema[key]}|".encode("ascii", "ignore"))
-            file.write("\n".encode("ascii"))
+class RTPlanBenefitData(RTFile):
+    HEADER = RecordSpec(
+        *header_fields("Planbene"),
+        Field(
+            "File Validation Code",
+            Constant("5"),
+            when=OPTIONAL,
+            otherwise=Choice(["0", "1", "2", "3", "4", "5"]),
+        ),
+        Field("Record Terminator", Constant("CR")),
+    )
+    DETAIL = RecordSpec(
+        Field("Record Id", Constant("DTL")),
+        Field("Record Number", RecordNumber()),
+        Field("Payer ID", PayerId()),
+        Field("Maintenance Type Code", Constant("030")),
+        Field("Member Plan Number", AlphaNumeric()),
+        Field("Member Group Number", AlphaNumeric(), when=OPTIONAL),
+        Field("Benefit Information", Choice(CODE_SET_C)),
+        Field("Service Type Code", Choice(CODE_SET_B)),
+        Field(
+            "Coverage Level Code",
+            Choice(["CHD", "DEP", "ECH", "EMP", "ESP", "FAM", "IND", "SPC", "SPO"]),
+            when=OPTIONAL,
+        ),
+        Field("Insurance Type Code", Choice(CODE_SET_D), when=OPTIONAL),
+        Field("Procedure Qualifier", Choice(CODE_SET_G), when=OPTIONAL),
+        Field("Procedure Code", AlphaNumeric(5), when=OPTIONAL),
+        Field("Procedure Range End", AlphaNumeric(5), when=OPTIONAL),
+        Field("Procedure Modifier 1", Constant("")),
+        Field("Procedure Modifier 2", Constant("")),
+        Field("Procedure Modifier 3", Constant("")),
+        Field("Procedure Modifier 4", Constant("")),
+        Field("Plan Coverage Description", SENTENCE, when=OPTIONAL),
+        Field("Time Period Qualifier", Choice(CODE_SET_E), when=OPTIONAL),
+        Field("Benefit Amount", Integer(1, 9999999), when=OPTIONAL),
+        Field("Benefit Percentage", PERCENTAGE, when=OPTIONAL),
+        Field("Quantity Qualifier", Choice(CODE_SET_F), when=OPTIONAL),
+        Field("Quantity", Integer(1, 9999999), when=OPTIONAL),
+        Field(
+            "Authorization/Certification Indicator",
+            Choice(["Y", "N", "U"]),
+            when=OPTIONAL,
+        ),
+        Field("In Plan Network Indicator", Choice(["Y", "N", "U", "W"]), when=OPTIONAL),
+        Field("Benefits Effective Date", Date(2010, 2015), when=OPTIONAL),
+        Field("Benefits Termination Date", Date(2015, 2020), when=OPTIONAL),
+        Field("Benefit Message 1", SENTENCE, when=OPTIONAL),
+        Field("Benefit Message 2", SENTENCE, when=OPTIONAL),
+        Field("Benefit Message 3", SENTENCE, when=OPTIONAL),
+        Field("Benefit Message 4", SENTENCE, when=OPTIONAL),
+        Field("Benefit Message 5", SENTENCE, when=OPTIONAL),
+        Field("Nature of Injury Code Qualifier", Choice(list(NOIC)), when=OPTIONAL),
+        Field(
+            "Nature of Injury Code",
+            Mapped("Nature of Injury Code Qualifier", NOIC),
+            when=OPTIONAL,
+        ),
+        Field("Injured Body Part Name", Choice(BODY_PART_NAME), when=OPTIONAL),
+        Field("Facility Type Code", Choice([1, 2, 3, 4, 6, 7, 8]), when=OPTIONAL),
+        Field("Alternative List ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Coverage List ID", AlphaNumeric(), when=OPTIONAL),
+        Field("Drug Formulary Number", AlphaNumeric(5), when=OPTIONAL),
+        Field("Medical Assistance Category", MEDICAL_ASSISTANCE_CATEGORY),
+        Field(
+            "Delivery Quantity Qualifier",
+            Choice(["DY", "LO", "HS", "MN", "VS"]),
+            when=OPTIONAL,
+        ),
+        Field("Delivery Quantity", Integer(1, 50), when=OPTIONAL),
+        Field(
+            "Delivery Sampling Frequency Qualifier",
+            Choice(["DA", "MO", "VS", "WK", "YR"]),
+            when=OPTIONAL,
+        ),
+        Field("Delivery Sampling Frequency", Integer(1, 10), when=OPTIONAL),
+        Field("Delivery Period Qualifier", Choice(CODE_SET_I), when=OPTIONAL),
+        Field("Delivery Period Count ", Integer(1, 10), when=OPTIONAL),
+        Field("Delivery Pattern Code ", Choice(CODE_SET_H), when=OPTIONAL),
+        Field(
+            "Delivery Time Code",
+            Choice(["A", "B", "C", "D", "E", "F", "G", "Y"]),
+            when=OPTIONAL,
+        ),
+        Field("Record Terminator ", Constant("CR")),
+    )
+    TRAILER = RecordSpec(
+        Field("RecordID", Constant("TRLR")),
+        Field("Record Count", RecordCount()),
+        Field("Record Terminator ", Constant("CR")),
+    )
+    FILE_NAME = "{timestamp}_{payer_id}_test.plan"
+    # fields that differ between members sharing a catalog plan
+    MEMBER_FIELDS = ("Record Id", "Record Number", "Member Group Number")
 
-    def _detailed_schema_to_file(self, schema, filepath):
-        with open(f"{filepath}/{self._file_name}", "ab") as file:
-            for _ in range(self._entries_number):
-                for key in schema.keys():
-                    file.write(f"{schema[key][_]}|".encode("ascii", "ignore"))
-                file.write("\n".encode("ascii"))
+    def __init__(
+        self,
+        entries_number: int,
+        load_type: str,
+        optional_fields: bool = False,
+        chunk_size: int = None,
+        seed: int = None,
+        processes: int = 1,
+        plan_count: int = None,
+    ):
+        """
+        :param plan_count: number of distinct plan benefit definitions the
+            members are assigned to, every row is random if None
+        """
+        super().__init__(
+            entries_number, load_type, optional_fields, chunk_size, seed, processes
+        )
+        self.plan_count = plan_count
+        self.catalog = None
 
-    def schemas_to_file(self, filepath=None):
-        now = datetime.now()
-        filepath = (
-            filepath
-            if filepath
-            else Path(f"{Path.cwd()}/{now.year}/{now.month}/{now.day}")
-        )
-        Path(filepath).mkdir(exist_ok=True, parents=True)
+    def _compile_detail(self):
+        record = self._compile("detail", self.DETAIL)
+        if self.plan_count:
+            self.catalog = CatalogRecord(record, self.MEMBER_FIELDS)
+            self.catalog.generate_catalog(
+                self._context(total=self.plan_count), self.plan_count
+            )
 
-        self._one_line_schema_to_file(self.header_schema, filepath)
-        self._detailed_schema_to_file(self.detail_schema, filepath)
-        self._one_line_schema_to_file(self.trailer_schema, filepath)
+    def _generate_chunk(self, ctx, start, size):
+        if not self.catalog:
+            return super()._generate_chunk(ctx, start, size)
+        return self.catalog.generate(ctx.batch(size, start=start))
 
-        return f"{filepath}/{self._file_name}"
+    def _chunk_bytes(self, chunk):
+        if not self.catalog:
+            return super()._chunk_bytes(chunk)
+        return self.catalog.to_bytes(chunk)
 
 
 if __name__ == "__main__":
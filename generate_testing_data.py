@@ -4,13 +4,59 @@ import time
 import numpy as np
 import pandas as pd
 from mimesis import Person, Finance, Address
-import random
 from datetime import datetime
 from pathlib import Path
-from generator_helpers import date_generator, string_generator
+from core.constants import (
+    GENDER_CODES,
+    OCCUPATION_TYPES,
+    SUBSCRIBER_RELATIONSHIPS,
+    SUPPORTED_TEST_TYPES,
+)
+from generator_helpers import column_generator, date_generator, reference_data
+from generator_helpers.column_csv import write_csv
 import boto3
 
 
+INSURANCE_MASTER_LIST = (
+    "templates/onsite/Banana Care Insurance Master List 14-May-2021.csv"
+)
+LOCATION_MASTER_LIST = (
+    "templates/onsite/Banana Care Location Master List 14-May-2021 v2.csv"
+)
+# Organization IDs entries are drawn from
+ORGANIZATION_COUNT = 37
+# lab name -> short name, address, city, state or province, postal code
+LABS = {
+    "banana M1": ("bananam01", "7000 NW 46th Street", "Stryi", "LO", "99313"),
+    "banana CARE Lab Services": (
+        "banana",
+        "1151 E 3900 SO, Suite B120",
+        "Sweet River Town",
+        "LV",
+        "84124",
+    ),
+}
+LAB_COLUMNS = (
+    "lab_short_name",
+    "lab_address",
+    "lab_city",
+    "lab_state_or_province",
+    "lab_postal_code",
+)
+# test types without symptoms questions
+ASYMPTOMATIC_TEST_TYPES = ("rt_pcr_oral",)
+SYMPTOM_COLUMNS = (
+    "asymptomatic",
+    "cough",
+    "fever",
+    "decreased_smell",
+    "muscle_aches",
+    "sore_throat",
+    "shortness_of_breath",
+)
+UTC_SUFFIX = b" UTC"
+
+
 class TestingData:
     def __init__(self, onsite_data):
         self.entries_number = onsite_data.entries
@@ -25,457 +71,235 @@ class TestingData:
         self.fake_businees = Finance("en")
         self.address = Address("en")
 
-    def generate_entries(self):
-        insurance_data = pd.read_csv(
-            "templates/onsite/banana CARE Insurance Master List 14-May-2021.csv"
+    def _given_or(self, value, column):
+        """The requested value on every row if any, else ``column()``."""
+        if value:
+            return np.full(self.entries_number, str(value).encode())
+        return column()
+
+    def _phone_numbers(self, rng):
+        size = self.entries_number
+        formats = (
+            column_generator.concat(
+                column_generator.integers(100, 1000, size, rng),
+                column_generator.integers(100, 1000, size, rng),
+                column_generator.integers(1000, 10000, size, rng),
+            ),
+            column_generator.concat(
+                "(",
+                column_generator.integers(100, 1000, size, rng),
+                ") ",
+                column_generator.integers(100, 1000, size, rng),
+                "-",
+                column_generator.integers(1000, 10000, size, rng),
+            ),
+            column_generator.concat(
+                "+", column_generator.integers(10**12, 10**13, size, rng)
+            ),
+            column_generator.blank(size, "NA"),
         )
-        location_data = pd.read_csv(
-            "templates/onsite/banana CARE Location Master List 14-May-2021 v2.csv"
+        return np.choose(rng.integers(0, len(formats), size), formats)
+
+    def columns(self, rng=None):
+        """
+        Onsite entries column by column: categorical columns are drawn with
+        NumPy, dependent columns derived with masks and timestamp arithmetic,
+        master list columns taken by row index.
+        :param rng: np.random.Generator
+        :return: dict of column name -> np.ndarray of S (utf-8), in file order
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        size = self.entries_number
+        insurance = reference_data.master_list(INSURANCE_MASTER_LIST)
+        locations = reference_data.master_list(LOCATION_MASTER_LIST)
+
+        screening = date_generator.timestamps_between("-3M", size=size, rng=rng)
+        sample = date_generator.timestamps_between(screening, size=size, rng=rng)
+        result = date_generator.timestamps_between(sample, size=size, rng=rng)
+        appointment = date_generator.timestamps_between(result, size=size, rng=rng)
+        has_appointment = rng.random(size) < 0.5
+        test_alias = column_generator.choice(SUPPORTED_TEST_TYPES, size, rng)
+        symptomatic = ~np.isin(
+            test_alias, column_generator.ascii_array(ASYMPTOMATIC_TEST_TYPES)
         )
-        insurance_member_id_str = np.array(
-            [
-                f"{string_generator.bothify('??#####??')}"
-                for i in range(insurance_data["insurance_member_id_str"].count())
-            ]
+        occupation = column_generator.choice(OCCUPATION_TYPES + [""], size, rng)
+        lab = rng.integers(0, len(LABS), size)
+        has_subscriber = rng.random(size) < 0.5
+        insured = np.arange(size) % 10 == 0
+        # the member ids of the master list are replaced on every run
+        member_ids = column_generator.bothify("??#####??", len(insurance), rng)
+        member = np.where(
+            insured, rng.integers(0, len(insurance), size), insurance.missing
         )
-        insurance_data["insurance_member_id_str"] = insurance_member_id_str
-        screening_datetime_list = np.array(
-            [
-                date_generator.date_time_between(start_date="-3M")
-                for i in range(self.entries_number)
-            ]
+        organization = rng.integers(1, ORGANIZATION_COUNT + 1, size)
+        location = locations.rows("Organization ID", organization)
+
+        def yes_no(mask):
+            return np.where(mask, column_generator.choice(["Y", "N"], size, rng), b"")
+
+        columns = {
+            "ResultSet ID": column_generator.concat(
+                "Result#", column_generator.integers(1111111, 10000000, size, rng)
+            ),
+            "Patient ID": column_generator.concat(
+                "Patient#", column_generator.integers(1111111, 10000000, size, rng)
+            ),
+            "Patient Last Name": self._given_or(
+                self.patient_last_name,
+                lambda: column_generator.sample(
+                    self.fake_person.last_name, size, rng
+                ),
+            ),
+            "Patient First Name": self._given_or(
+                self.patient_first_name,
+                lambda: column_generator.sample(
+                    self.fake_person.first_name, size, rng
+                ),
+            ),
+            "Patient DOB": self._given_or(
+                self.patient_dob,
+                lambda: column_generator.compact_dates(
+                    date_generator.timestamps_between("-90y", size=size, rng=rng)
+                ),
+            ),
+            "Patient Gender": column_generator.choice(GENDER_CODES, size, rng),
+            "Patient Address": column_generator.sample(self.address.address, size, rng),
+            "Patient City": column_generator.sample(self.address.city, size, rng),
+            "Patient State": column_generator.sample(
+                lambda: self.address.state(abbr=True), size, rng
+            ),
+            "Patient Zip": column_generator.sample(
+                self.address.postal_code, size, rng
+            ),
+            "Patient Phone": self._given_or(
+                self.patient_phone, lambda: self._phone_numbers(rng)
+            ),
+            "Patient Email": self._given_or(
+                self.patient_email,
+                lambda: column_generator.sample(
+                    lambda: self.fake_person.email(
+                        domains=[
+                            "bananamail.com" if self.banana_email else "example.com"
+                        ]
+                    ),
+                    size,
+                    rng,
+                ),
+            ),
+            "Test Kit ID": column_generator.concat(
+                "TestKit#",
+                np.choose(
+                    rng.integers(0, 3, size),
+                    [
+                        column_generator.bothify(mask, size, rng)
+                        for mask in ("?#?##??", "?#?????", "?#?####")
+                    ],
+                ),
+            ),
+            "MRN": column_generator.bothify("#####-#####", size, rng),
+            "Screening Date & Time": column_generator.concat(
+                column_generator.iso_datetimes(screening), UTC_SUFFIX
+            ),
+            "Sample Date & Time": column_generator.concat(
+                column_generator.iso_datetimes(sample), UTC_SUFFIX
+            ),
+            "Sample Value": column_generator.choice(["pending", "complete"], size, rng),
+            "Result Date & Time": column_generator.concat(
+                column_generator.iso_datetimes(result), UTC_SUFFIX
+            ),
+            "Result Value": column_generator.choice(
+                [
+                    "SARS-CoV-2 Not Detected",
+                    "SARS-CoV-2 Detected",
+                    "SARS-CoV-2 Indeterminant",
+                ],
+                size,
+                rng,
+            ),
+            "Appointment": has_appointment,
+            "Appointment Time": np.where(
+                has_appointment,
+                column_generator.concat(
+                    column_generator.iso_datetimes(appointment), UTC_SUFFIX
+                ),
+                b"",
+            ),
+            "Organization ID": organization.astype("S"),
+            "Sample Test Alias": test_alias,
+        }
+        for name in SYMPTOM_COLUMNS:
+            columns[name] = yes_no(symptomatic)
+        columns["insurance_member_id_str"] = np.append(member_ids, b"")[member]
+        columns["occupation"] = occupation
+        columns["occupation_ident"] = np.where(
+            occupation != b"", column_generator.bothify("#######", size, rng), b""
         )
-        sample_datetime_list = np.array(
-            [
-                date_generator.date_time_between(start_date=screening_datetime)
-                for screening_datetime in screening_datetime_list
-            ]
+        columns["work_outside_home"] = column_generator.choice(
+            ["Y", "N", ""], size, rng
         )
-        result_datetime_list = np.array(
-            [
-                date_generator.date_time_between(start_date=sample_datetime)
-                for sample_datetime in sample_datetime_list
-            ]
+        columns["work_requires_covid_test"] = column_generator.choice(
+            ["Y", "N", ""], size, rng
         )
-        appointment_datetime_list = np.array(
-            [
-                random.choice(
-                    [date_generator.date_time_between(start_date=result_datetime), ""]
-                )
-                for result_datetime in result_datetime_list
-            ]
+        columns["lab_name"] = column_generator.ascii_array(LABS)[lab]
+        for position, name in enumerate(LAB_COLUMNS):
+            columns[name] = column_generator.ascii_array(
+                values[position] for values in LABS.values()
+            )[lab]
+        columns["subscriber_forename"] = np.where(
+            has_subscriber,
+            column_generator.sample(self.fake_person.first_name, size, rng),
+            b"",
         )
-        sample_test_alias_list = np.array(
-            [
-                random.choice(
-                    [
-                        "rt_pcr_oral",
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                )
-                for i in range(self.entries_number)
-            ]
+        columns["subscriber_surname"] = np.where(
+            has_subscriber,
+            column_generator.sample(self.fake_person.last_name, size, rng),
+            b"",
         )
-        occupation_list = np.array(
-            [
-                random.choice(
-                    ["faculty_employee", "student", "employee_or_volunteer", ""]
-                )
-                for i in range(self.entries_number)
-            ]
+        columns["subscriber_birth_date"] = np.where(
+            has_subscriber,
+            column_generator.iso_dates(
+                date_generator.timestamps_between("-90y", size=size, rng=rng)
+            ),
+            b"",
         )
-        lab_names_list = np.array(
-            [
-                random.choice(["banana M1", "banana CARE Lab Services"])
-                for i in range(self.entries_number)
-            ]
+        columns["subscriber_gender"] = np.where(
+            has_subscriber, column_generator.choice(["m", "f"], size, rng), b""
         )
-        subscriber_birthdate_list = np.array(
-            [
-                random.choice(
-                    [
-                        date_generator.date_time_between(start_date="-90y").strftime(
-                            "%Y-%m-%d"
-                        ),
-                        "",
-                    ]
-                )
-                for i in range(self.entries_number)
-            ]
+        columns["subscriber_ssn"] = column_generator.integers(
+            100000000, 1000000000, size, rng
         )
-        schema = {
-            "ResultSet ID": np.array(
-                [
-                    f"Result#{random.randint(1111111, 9999999)}"
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient ID": np.array(
-                [
-                    f"Patient#{random.randint(1111111, 9999999)}"
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient Last Name": np.array(
-                [
-                    self.patient_last_name
-                    if self.patient_last_name
-                    else self.fake_person.last_name()
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient First Name": np.array(
-                [
-                    self.patient_first_name
-                    if self.patient_first_name
-                    else self.fake_person.first_name()
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient DOB": np.array(
-                [
-                    self.patient_dob
-                    if self.patient_dob
-                    else date_generator.date_time_between(start_date="-90y").strftime(
-                        "%Y%m%d"
-                    )
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient Gender": np.array(
-                [random.choice(["M", "F"]) for i in range(self.entries_number)]
-            ),
-            "Patient Address": np.array(
-                [self.address.address() for i in range(self.entries_number)]
-            ),
-            "Patient City": np.array(
-                [self.address.city() for i in range(self.entries_number)]
-            ),
-            "Patient State": np.array(
-                [self.address.state(abbr=True) for i in range(self.entries_number)]
-            ),
-            "Patient Zip": np.array(
-                [f"{self.address.postal_code()}" for i in range(self.entries_number)]
-            ),
-            "Patient Phone": np.array(
-                [
-                    f"{self.patient_phone}"
-                    if self.patient_phone
-                    else random.choice(
-                        [
-                            f"{random.randint(100, 999)}{random.randint(100, 999)}{random.randint(1000, 9999)}",
-                            f"({random.randint(100, 999)}) {random.randint(100, 999)}-{random.randint(1000, 9999)}",
-                            f"+{random.randint(1000000000000, 9999999999999)}",
-                            "NA",
-                        ]
-                    )
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Patient Email": np.array(
-                [
-                    self.patient_email
-                    if self.patient_email
-                    else self.fake_person.email(
-                        domains=[
-                            "bananamail.com"
-                            if self.banana_email
-                            else "example.com"
-                        ]
-                    )
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Test Kit ID": np.array(
-                [
-                    random.choice(
-                        [
-                            f'TestKit#{string_generator.bothify(text="?#?##??")}',
-                            f'TestKit#{string_generator.bothify(text="?#?????")}',
-                            f'TestKit#{string_generator.bothify(text="?#?####")}',
-                        ]
-                    )
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "MRN": np.array(
-                [
-                    string_generator.bothify(text="#####-#####")
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Screening Date & Time": np.array(
-                [
-                    screening_datetime.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    for screening_datetime in screening_datetime_list
-                ]
-            ),
-            "Sample Date & Time": np.array(
-                [
-                    sample_datetime.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    for sample_datetime in sample_datetime_list
-                ]
-            ),
-            "Sample Value": np.array(
-                [
-                    random.choice(["pending", "complete"])
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "Result Date & Time": np.array(
-                [
-                    result_datetime.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    for result_datetime in result_datetime_list
-                ]
-            ),
-            "Result Value": np.array(
-                [
-                    random.choice(
-                        [
-                            "SARS-CoV-2 Not Detected",
-                            "SARS-CoV-2 Detected",
-                            "SARS-CoV-2 Indeterminant",
-                        ]
-                    )
-                    for i in range(self.entries_number)
-                ]
-            ),
-            # "Location Name": [],
-            # "Location Street 1": [],
-            # "Location Street 2": [],
-            # "Location City": [],
-            # "Location State": [],
-            # "Location Zipcode": [],
-            "Appointment": np.array(
-                [
-                    True if appointment else False
-                    for appointment in appointment_datetime_list
-                ]
-            ),
-            "Appointment Time": np.array(
-                [
-                    appointment_datetime.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    if appointment_datetime
-                    else ""
-                    for appointment_datetime in appointment_datetime_list
-                ]
-            ),
-            "Organization ID": np.array(
-                [random.randint(1, 37) for i in range(self.entries_number)]
-            ),
-            "Sample Test Alias": sample_test_alias_list,
-            "asymptomatic": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "cough": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "fever": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "decreased_smell": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "muscle_aches": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "sore_throat": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "shortness_of_breath": np.array(
-                [
-                    random.choice(["Y", "N"])
-                    if el
-                    in [
-                        "rt_pcr_oral_logix_smart",
-                        "rt_pcr_nasal",
-                        "covid_ag",
-                        "rt_pcr_saliva",
-                    ]
-                    else ""
-                    for el in sample_test_alias_list
-                ]
-            ),
-            "insurance_member_id_str": np.array(
-                [
-                    random.choice(insurance_member_id_str) if count % 10 == 0 else ""
-                    for count, i in enumerate(range(self.entries_number))
-                ]
-            ),
-            "occupation": occupation_list,
-            "occupation_ident": np.array(
-                [
-                    f'{string_generator.bothify(text="#######")}' if occupation else ""
-                    for occupation in occupation_list
-                ]
-            ),
-            "work_outside_home": np.array(
-                [random.choice(["Y", "N", ""]) for i in range(self.entries_number)]
-            ),
-            "work_requires_covid_test": np.array(
-                [random.choice(["Y", "N", ""]) for i in range(self.entries_number)]
-            ),
-            "lab_name": lab_names_list,
-            "lab_short_name": np.array(
-                ["bananam01" if lab == "banana M1" else "banana" for lab in lab_names_list]
-            ),
-            "lab_address": np.array(
-                [
-                    "7000 NW 46th Street"
-                    if lab == "banana M1"
-                    else "1151 E 3900 SO, Suite B120"
-                    for lab in lab_names_list
-                ]
-            ),
-            "lab_city": np.array(
-                [
-                    "Stryi" if lab == "banana M1" else "Sweet River Town"
-                    for lab in lab_names_list
-                ]
-            ),
-            "lab_state_or_province": np.array(
-                ["LO" if lab == "banana M1" else "LV" for lab in lab_names_list]
-            ),
-            "lab_postal_code": np.array(
-                ["99313" if lab == "banana M1" else "84124" for lab in lab_names_list]
-            ),
-            "subscriber_forename": np.array(
-                [
-                    self.fake_person.first_name() if birthdate else ""
-                    for birthdate in subscriber_birthdate_list
-                ]
-            ),
-            "subscriber_surname": np.array(
-                [
-                    self.fake_person.last_name() if birthdate else ""
-                    for birthdate in subscriber_birthdate_list
-                ]
-            ),
-            "subscriber_birth_date": subscriber_birthdate_list,
-            "subscriber_gender": np.array(
-                [
-                    random.choice(["m", "f"]) if birthdate else ""
-                    for birthdate in subscriber_birthdate_list
-                ]
-            ),
-            "subscriber_ssn": np.array(
-                [
-                    f"{random.randint(100000000, 999999999)}"
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "patient_ssn": np.array(
-                [
-                    f"{random.randint(100000000, 999999999)}"
-                    for i in range(self.entries_number)
-                ]
-            ),
-            "subscriber_relationship_to_patient": np.array(
-                [
-                    random.choice(["parent", "spouse", "child", "self"])
-                    if birthdate
-                    else ""
-                    for birthdate in subscriber_birthdate_list
-                ]
-            ),
-            "patient_identifier": ["" for _ in range(self.entries_number)],
-        }
-
-        onsite_data_frame = pd.DataFrame(schema, columns=schema.keys())
-        merged_insurance = onsite_data_frame.merge(
-            insurance_data[
-                [
-                    "insurance_company_name",
-                    "insurance_plan_phone_number",
-                    "insurance_member_id_str",
-                ]
-            ],
-            on=["insurance_member_id_str"],
-            how="left",
+        columns["patient_ssn"] = column_generator.integers(
+            100000000, 1000000000, size, rng
         )
-        merged_insurance.insurance_plan_phone_number = merged_insurance.insurance_plan_phone_number.fillna(
-            "0"
-        ).astype(
-            str
+        columns["subscriber_relationship_to_patient"] = np.where(
+            has_subscriber,
+            column_generator.choice(SUBSCRIBER_RELATIONSHIPS, size, rng),
+            b"",
         )
-
-        merged_location = merged_insurance.merge(
-            location_data, on=["Organization ID"], how="left"
+        columns["patient_identifier"] = column_generator.blank(size)
+        columns["insurance_company_name"] = insurance.columns[
+            "insurance_company_name"
+        ][member]
+        columns["insurance_plan_phone_number"] = np.where(
+            insured, insurance.columns["insurance_plan_phone_number"][member], b"0"
         )
-        merged_location.fillna("")
-        merged_location["Organization ID"] = merged_location["Organization ID"].apply(
-            str
+        for name, column in locations.columns.items():
+            if name != "Organization ID":
+                columns[name] = column[location]
+        return columns
+
+    def generate_entries(self):
+        """
+        :return: pd.DataFrame of the entries, see ``columns``
+        """
+        return pd.DataFrame(
+            {
+                name: column
+                if column.dtype.kind == "b"
+                else np.char.decode(column, "utf-8")
+                for name, column in self.columns().items()
+            }
         )
-        return merged_location
 
     def csv(self, filepath=None):
         now = datetime.now()
@@ -487,8 +311,7 @@ class TestingData:
         Path(filepath).mkdir(exist_ok=True, parents=True)
 
         filename = f"{filepath}/mock_onsite_sample_{int(now.timestamp())}.csv"
-        self.generate_entries().to_csv(filename, index=False, header=True)
-        return filename
+        return write_csv(filename, self.columns())
 
     def json(self, filepath=None):
         now = datetime.now()
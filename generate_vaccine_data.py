@@ -1,11 +1,31 @@
 import random
-from generator_helpers import date_generator, string_generator
+from generator_helpers import (
+    column_generator,
+    date_generator,
+    reference_data,
+    string_generator,
+)
 from mimesis import Person, Finance, Address
+import numpy as np
 import pandas as pd
 import time
 from datetime import datetime
 from pathlib import Path
 
+INSURANCE_MASTER_LIST = (
+    "templates/databus/Banana Care Insurance Master List 14-May-2021.csv"
+)
+LOCATION_MASTER_LIST = (
+    "templates/databus/Banana Care Location Master List 14-May-2021 v2.csv"
+)
+# Organization IDs encounters are drawn from
+ORGANIZATION_COUNT = 37
+
+
+def _nullable(column):
+    """Master list values decoded, None where empty as pandas reads them."""
+    return np.where(column != b"", np.char.decode(column, "utf-8"), None)
+
 
 class Generator:
     def generate_entries(self):
@@ -48,24 +68,23 @@ class Encounters(Generator):
         self.person = Person("en")
 
     def generate_entries(self):
-        insurance_data = pd.read_csv(
-            "templates/databus/Banana Care Insurance Master List 14-May-2021.csv"
+        rng = np.random.default_rng()
+        insurance = reference_data.master_list(INSURANCE_MASTER_LIST)
+        locations = reference_data.master_list(LOCATION_MASTER_LIST)
+
+        # the member ids of the master list are replaced on every run
+        member_ids = column_generator.bothify("??#####??", len(insurance), rng)
+        insured = np.arange(self.entries_number) % 10 == 0
+        member = np.where(
+            insured,
+            rng.integers(0, len(insurance), self.entries_number),
+            insurance.missing,
         )
-        location_data = pd.read_csv(
-            "templates/databus/Banana Care Location Master List 14-May-2021 v2.csv"
+        location = locations.rows(
+            "Organization ID",
+            rng.integers(1, ORGANIZATION_COUNT + 1, self.entries_number),
         )
-
-        insurance_member_id_str = [
-            f"{string_generator.bothify('??#####??')}"
-            for i in range(insurance_data["memberID"].count())
-        ]
-        insurance_data["memberID"] = insurance_member_id_str
-
-        member_ids_list = [
-            random.choice(insurance_member_id_str) if count % 10 == 0 else ""
-            # , string_generator.bothify(text="1???7")
-            for count, i in enumerate(range(self.entries_number))
-        ]
+        member_ids_list = np.char.decode(np.append(member_ids, b"")[member], "utf-8")
 
         schema = {
             "mrnNumber": [
@@ -86,9 +105,7 @@ class Encounters(Generator):
             #     self.address.state(abbr=True) for i in range(self.entries_number)
             # ],
             "memberID": member_ids_list,
-            "no_insurance": [
-                False if member_id else True for member_id in member_ids_list
-            ],
+            "no_insurance": ~insured,
             # "insurance_name": [self.business.company() for _ in range(self.entries_number)],
             # "insurance_plan_phone": [self.person.telephone() for _ in range(self.entries_number)],
             "procedure": [
@@ -105,40 +122,16 @@ class Encounters(Generator):
                 }
                 for _ in range(self.entries_number)
             ],
-            "Organization ID": [
-                random.randint(1, 37) for _ in range(self.entries_number)
-            ],
+            "insurance_name": _nullable(insurance.columns["insurance_name"][member]),
+            # numbers, as pandas reads them from the master lists
+            "insurance_plan_phone": insurance.numbers("insurance_plan_phone", member),
+            "locationAddress": _nullable(
+                locations.columns["locationAddress"][location]
+            ),
+            "locationCity": _nullable(locations.columns["locationCity"][location]),
+            "locationZipCode": locations.numbers("locationZipCode", location),
         }
-        encounter_data_frame = pd.DataFrame(schema, columns=schema.keys())
-        merged_insurance = encounter_data_frame.merge(
-            insurance_data[["insurance_name", "insurance_plan_phone", "memberID"]],
-            on=["memberID"],
-            how="left",
-        )
-        merged_insurance.insurance_plan_phone_number = merged_insurance.insurance_plan_phone.fillna(
-            0
-        ).astype(
-            int
-        )
-        merged_location = merged_insurance.merge(
-            location_data[
-                [
-                    "locationAddress",
-                    "locationCity",
-                    "locationZipCode",
-                    "Organization ID",
-                ]
-            ],
-            on=["Organization ID"],
-            how="left",
-        )
-        merged_location.fillna("")
-        merged_location["Organization ID"] = merged_location["Organization ID"].apply(
-            str
-        )
-
-        del merged_location["Organization ID"]
-        return merged_location
+        return pd.DataFrame(schema, columns=schema.keys())
 
 
 class EncounterPatient(Generator):
@@ -0,0 +1,53 @@
+"""
+Column batches: rows generated by a pool worker, handed to the parent as one
+structured array (one fixed width ``S`` field per text column) instead of a
+pickled dict per row. A batch crosses the process boundary as a single
+buffer, and writers read it column by column without building the rows.
+"""
+import numpy as np
+
+
+def pack_columns(columns):
+    """
+    :param columns: dict of column name -> list of str or numbers, same length
+    :return: structured np.ndarray, text utf-8 encoded and as wide as its
+        longest value
+    """
+    arrays = {}
+    for name, values in columns.items():
+        if values and isinstance(values[0], str):
+            arrays[name] = np.array([value.encode() for value in values], dtype=bytes)
+        else:
+            arrays[name] = np.asarray(values)
+    size = len(next(iter(arrays.values()))) if arrays else 0
+    batch = np.empty(
+        size, dtype=[(name, array.dtype) for name, array in arrays.items()]
+    )
+    for name, array in arrays.items():
+        batch[name] = array
+    return batch
+
+
+def column_lists(batch):
+    """
+    :param batch: structured np.ndarray of ``pack_columns``
+    :return: dict of column name -> list of python values, text decoded
+    """
+    columns = {}
+    for name in batch.dtype.names:
+        values = batch[name].tolist()
+        if batch.dtype[name].kind == "S":
+            values = [value.decode() for value in values]
+        columns[name] = values
+    return columns
+
+
+def batch_rows(batch):
+    """:return: list of rows of the batch, tuples in column order"""
+    return list(zip(*column_lists(batch).values()))
+
+
+def batch_dicts(batch):
+    """:return: list of rows of the batch, dicts of column name -> value"""
+    names = batch.dtype.names
+    return [dict(zip(names, row)) for row in batch_rows(batch)]
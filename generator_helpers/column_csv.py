@@ -0,0 +1,87 @@
+"""
+CSV files written from whole columns instead of row by row.
+
+Columns (``S`` arrays, booleans or integers) are rendered to bytes and laid
+out as one byte matrix per chunk of rows, padded with zero bytes that are
+dropped when the chunk is written, the way the RT writers serialize their
+records. Fields are quoted like ``csv.QUOTE_MINIMAL`` does.
+"""
+import numpy as np
+
+from core.constants import CSV_CHUNK_SIZE
+
+# characters that make a field quoted
+QUOTED_CHARS = (b",", b'"', b"\n", b"\r")
+
+
+def csv_field(column):
+    """
+    Column rendered as csv fields.
+    :param column: np.ndarray of S (utf-8), bool or int
+    :return: np.ndarray of S
+    """
+    if column.dtype.kind == "b":
+        return np.where(column, b"True", b"False")
+    if column.dtype.kind != "S":
+        return column.astype("S")
+    # one scan of the whole buffer per character, most columns have none
+    buffer = column.tobytes()
+    if not any(char in buffer for char in QUOTED_CHARS):
+        return column
+    quoted = np.zeros(len(column), dtype=bool)
+    for char in QUOTED_CHARS:
+        quoted |= np.char.find(column, char) >= 0
+    if not quoted.any():
+        return column
+    values = np.char.add(
+        np.char.add(b'"', np.char.replace(column[quoted], b'"', b'""')), b'"'
+    )
+    column = column.astype(f"S{max(column.dtype.itemsize, values.dtype.itemsize)}")
+    column[quoted] = values
+    return column
+
+
+def _chunk_bytes(fields):
+    # blocks only as wide as the longest field of the chunk
+    blocks = [
+        np.ascontiguousarray(field)
+        .view(np.uint8)
+        .reshape(len(field), -1)[:, : max(np.char.str_len(field).max(), 1)]
+        for field in fields
+    ]
+    matrix = np.zeros(
+        (len(blocks[0]), sum(block.shape[1] for block in blocks) + len(blocks)),
+        dtype=np.uint8,
+    )
+    offset = 0
+    for block in blocks:
+        matrix[:, offset : offset + block.shape[1]] = block
+        offset += block.shape[1]
+        matrix[:, offset] = ord(",")
+        offset += 1
+    matrix[:, -1] = ord("\n")
+    return matrix.tobytes().translate(None, b"\0")
+
+
+def write_csv(path, columns, chunk_size=CSV_CHUNK_SIZE):
+    """
+    Write columns as a csv file with a header line.
+    :param path: file to write
+    :param columns: dict of column name -> np.ndarray, same length
+    :param chunk_size: rows rendered at a time
+    :return: path
+    """
+    header = csv_field(np.array([name.encode() for name in columns], dtype="S"))
+    rows = len(next(iter(columns.values()))) if columns else 0
+    with open(path, "wb") as file:
+        file.write(b",".join(header.tolist()) + b"\n")
+        for start in range(0, rows, chunk_size):
+            file.write(
+                _chunk_bytes(
+                    [
+                        csv_field(column[start : start + chunk_size])
+                        for column in columns.values()
+                    ]
+                )
+            )
+    return path
@@ -0,0 +1,258 @@
+"""
+Vectorized column builders for the RT fixed-format generators.
+
+Every helper returns a whole column of ``size`` values produced by a single
+NumPy call, instead of calling ``np.random.choice`` or a mimesis provider once
+per row inside a list comprehension.
+
+Columns are ASCII byte strings (``S{width}``, one byte per character) rather
+than ``<U`` arrays (four bytes per character): the files are written as
+ASCII anyway, and the serializer copies ``S`` columns as they are.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from generator_helpers import id_generator
+
+# number of distinct values drawn from a mimesis provider before sampling rows
+POOL_SIZE = 2048
+
+
+def ascii_bytes(value):
+    """``str(value)`` encoded as ASCII, other characters are dropped."""
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode("ascii", "ignore")
+
+
+def ascii_array(values):
+    """
+    Values as an ``S`` array, e.g. a code set or a provider pool.
+    :param values: iterable of str (or anything ``str`` accepts)
+    :return: np.ndarray of S{longest value}
+    """
+    return np.array([ascii_bytes(value) for value in values], dtype="S")
+
+
+def blank(size, value=""):
+    """
+    Column filled with one value, used for disabled optional fields.
+    :param size: number of rows
+    :param value: filler value
+    :return: np.ndarray of S
+    """
+    return np.full(size, ascii_bytes(value))
+
+
+def choice(values, size, rng):
+    """
+    Draw a categorical / code set column.
+    :param values: code set to draw from
+    :param size: number of rows
+    :param rng: np.random.Generator
+    :return: np.ndarray of S
+    """
+    values = np.asarray(values)
+    if values.dtype.kind != "S":
+        values = ascii_array(values)
+    return values[rng.integers(0, len(values), size=size)]
+
+
+def weighted_choice(values, cumulative, size, rng):
+    """
+    Draw a code set column with per-code probabilities.
+    :param values: np.ndarray of S, the code set
+    :param cumulative: cumulative probabilities of ``values``, ending with 1
+    :param size: number of rows
+    :param rng: np.random.Generator
+    :return: np.ndarray of S
+    """
+    index = np.searchsorted(cumulative, rng.random(size), side="right")
+    return values[index.clip(0, len(values) - 1)]
+
+
+def digits(size, length, rng):
+    """
+    Fixed length numeric identifiers (leading zeros allowed).
+    """
+    return id_generator.ids(size, length, rng, alphabet=id_generator.DIGITS)
+
+
+def _fixed_width(values, width):
+    """
+    Render non-negative integers as zero-padded strings of ``width`` digits
+    without the per-element cost of ``astype(str)``.
+    """
+    codes = np.empty((len(values), width), dtype=np.uint8)
+    for position in range(width - 1, -1, -1):
+        codes[:, position] = values % 10 + ord("0")
+        values = values // 10
+    return codes.view(f"S{width}").reshape(len(codes))
+
+
+def integers(low, high, size, rng):
+    """
+    Random integers in ``[low, high)`` rendered as strings.
+    """
+    values = rng.integers(low, high, size=size)
+    width = len(str(high - 1))
+    if low >= 0 and len(str(low)) == width:
+        return _fixed_width(values, width)
+    return values.astype("S")
+
+
+def dates(start_year, end_year, size, rng):
+    """
+    Random calendar dates between Jan 1 of ``start_year`` and Dec 31 of
+    ``end_year`` formatted as ``%Y%m%d``, same range as mimesis ``Datetime.date``.
+    """
+    calendar = _calendar(start_year, end_year)
+    return calendar[rng.integers(0, len(calendar), size=size)]
+
+
+def times(size, rng):
+    """
+    Random times of day formatted as ``%H%M%S``.
+    """
+    seconds = rng.integers(0, 24 * 60 * 60, size=size)
+    hhmmss = seconds // 3600 * 10000 + seconds // 60 % 60 * 100 + seconds % 60
+    return _fixed_width(hhmmss, 6)
+
+
+def _date_stamps(seconds):
+    """
+    ``%Y%m%d`` of timestamps as integers, civil dates computed with integer
+    arithmetic (days from civil, H. Hinnant) rather than datetime64 casts.
+    """
+    days = seconds // (24 * 60 * 60) + 719468
+    era = days // 146097
+    day_of_era = days - era * 146097
+    year_of_era = (
+        day_of_era
+        - day_of_era // 1460
+        + day_of_era // 36524
+        - day_of_era // 146096
+    ) // 365
+    day_of_year = day_of_era - (
+        365 * year_of_era + year_of_era // 4 - year_of_era // 100
+    )
+    month_index = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * month_index + 2) // 5 + 1
+    month = np.where(month_index < 10, month_index + 3, month_index - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+    return year * 10000 + month * 100 + day
+
+
+def compact_dates(seconds):
+    """
+    Timestamps (seconds since the epoch, UTC) formatted as ``%Y%m%d``.
+    """
+    return _fixed_width(_date_stamps(seconds), 8)
+
+
+def iso_dates(seconds):
+    """
+    Timestamps (seconds since the epoch, UTC) formatted as ``%Y-%m-%d``.
+    """
+    digits = compact_dates(seconds).view(np.uint8).reshape(len(seconds), 8)
+    codes = np.full((len(seconds), 10), ord("-"), dtype=np.uint8)
+    codes[:, [0, 1, 2, 3, 5, 6, 8, 9]] = digits
+    return codes.view("S10").reshape(len(seconds))
+
+
+def iso_datetimes(seconds):
+    """
+    Timestamps (seconds since the epoch, UTC) formatted as
+    ``%Y-%m-%d %H:%M:%S``.
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    day_seconds = seconds % (24 * 60 * 60)
+    hhmmss = day_seconds // 3600 * 10000 + day_seconds // 60 % 60 * 100
+    hhmmss += day_seconds % 60
+    digits = _fixed_width(hhmmss, 6).view(np.uint8).reshape(len(seconds), 6)
+    codes = np.full((len(seconds), 19), ord(":"), dtype=np.uint8)
+    codes[:, :10] = iso_dates(seconds).view(np.uint8).reshape(len(seconds), 10)
+    codes[:, 10] = ord(" ")
+    codes[:, [11, 12, 14, 15, 17, 18]] = digits
+    return codes.view("S19").reshape(len(seconds))
+
+
+@lru_cache(maxsize=None)
+def _calendar(start_year, end_year):
+    """
+    Every day between the two years as ``%Y%m%d`` strings, the lookup table
+    date columns are drawn from.
+    """
+    days = np.arange(
+        np.datetime64(f"{start_year}-01-01", "D"),
+        np.datetime64(f"{end_year + 1}-01-01", "D"),
+    )
+    years = days.astype("datetime64[Y]")
+    months = days.astype("datetime64[M]")
+    stamp = (
+        (years.astype(np.int64) + 1970) * 10000
+        + ((months - years).astype(np.int64) + 1) * 100
+        + (days - months).astype(np.int64)
+        + 1
+    )
+    return _fixed_width(stamp, 8)
+
+
+def sample(factory, size, rng, pool_size=POOL_SIZE):
+    """
+    Column of provider values (names, addresses, sentences...).
+    The provider is called at most ``pool_size`` times and rows are drawn from
+    that pool with one NumPy call.
+    :param factory: zero-argument callable, e.g. ``Person("en").first_name``
+    :param size: number of rows
+    :param rng: np.random.Generator
+    :param pool_size: max number of provider calls
+    :return: np.ndarray of S
+    """
+    pool = provider_pool(factory, min(size, pool_size))
+    return pool[rng.integers(0, len(pool), size=size)]
+
+
+def provider_pool(factory, pool_size):
+    """
+    Distinct provider calls rows are drawn from, at least one.
+    :param factory: zero-argument callable
+    :param pool_size: number of provider calls
+    :return: np.ndarray of S
+    """
+    return ascii_array(factory() for _ in range(max(pool_size, 1)))
+
+
+def concat(*columns):
+    """
+    Row-wise string concatenation of columns and/or literal strings.
+    """
+    columns = [
+        column if isinstance(column, np.ndarray) else ascii_bytes(column)
+        for column in columns
+    ]
+    result = columns[0]
+    for column in columns[1:]:
+        result = np.char.add(result, column)
+    return result
+
+
+def bothify(text, size, rng):
+    """
+    Vectorized ``string_generator.bothify``: '#' becomes a random digit and
+    '?' a random ASCII letter, other characters are kept as is.
+    :param text: mask, e.g. '??#####??'
+    :param size: number of rows
+    :param rng: np.random.Generator
+    :return: np.ndarray of S{len(text)}
+    """
+    matrix = np.empty((size, len(text)), dtype=np.uint8)
+    for position, char in enumerate(text):
+        if char == "#":
+            matrix[:, position] = rng.choice(id_generator.DIGITS, size=size)
+        elif char == "?":
+            matrix[:, position] = rng.choice(id_generator.LETTERS, size=size)
+        else:
+            matrix[:, position] = ord(char)
+    return matrix.view(f"S{len(text)}").reshape(size)
@@ -0,0 +1,108 @@
+"""
+EDI control numbers (ISA13 interchange, GS06 group, ST02 transaction set)
+unique across threads and processes.
+
+Every counter is a small file holding the next free number. A process
+reserves a block of ``block_size`` numbers at a time under an exclusive
+``flock`` and hands them out from memory under a thread lock, so the file
+is locked once per block rather than once per number. A forked child never
+reuses the block of its parent: blocks belong to the process that reserved
+them.
+"""
+import fcntl
+import os
+import threading
+from pathlib import Path
+
+from core.constants import EDI_CONTROL_NUMBER_BLOCK, EDI_CONTROL_NUMBER_DIR
+
+# ISA13 and GS06 are at most 9 digits
+MAX_CONTROL_NUMBER = 999_999_999
+
+
+class ControlNumberAllocator:
+    """
+    Unique numbers from a shared counter file, wrapping around after
+    ``MAX_CONTROL_NUMBER``.
+    :param path: counter file, created on first use
+    :param block_size: numbers reserved per file lock
+    """
+
+    def __init__(self, path, block_size=EDI_CONTROL_NUMBER_BLOCK):
+        self.path = Path(path)
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._pid = None
+        self._next = 0
+        self._stop = 0
+
+    def _reserve(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a+") as counter:
+            fcntl.flock(counter, fcntl.LOCK_EX)
+            try:
+                counter.seek(0)
+                start = int(counter.read().strip() or 1)
+                if start + self.block_size > MAX_CONTROL_NUMBER + 1:
+                    start = 1
+                counter.seek(0)
+                counter.truncate()
+                counter.write(str(start + self.block_size))
+                counter.flush()
+            finally:
+                fcntl.flock(counter, fcntl.LOCK_UN)
+        self._pid = os.getpid()
+        self._next, self._stop = start, start + self.block_size
+
+    def next(self):
+        """:return: the next unused number"""
+        with self._lock:
+            if self._pid != os.getpid() or self._next >= self._stop:
+                self._reserve()
+            number = self._next
+            self._next += 1
+            return number
+
+
+class ControlNumbers:
+    """
+    Interchange, group and transaction set counters of a directory.
+    :param directory: directory of the counter files
+    :param block_size: numbers reserved per file lock
+    """
+
+    def __init__(self, directory=EDI_CONTROL_NUMBER_DIR, block_size=None):
+        block_size = block_size or EDI_CONTROL_NUMBER_BLOCK
+        self._interchange = ControlNumberAllocator(
+            Path(directory) / "interchange", block_size
+        )
+        self._group = ControlNumberAllocator(Path(directory) / "group", block_size)
+        self._transaction = ControlNumberAllocator(
+            Path(directory) / "transaction", block_size
+        )
+
+    def interchange(self):
+        """ISA13, 9 digits."""
+        return f"{self._interchange.next():09d}"
+
+    def group(self):
+        """GS06."""
+        return str(self._group.next())
+
+    def transaction(self):
+        """ST02, at least 4 digits."""
+        return f"{self._transaction.next():04d}"
+
+
+# counters of every directory used by the process, shared by its threads
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def control_numbers(directory=EDI_CONTROL_NUMBER_DIR):
+    """ControlNumbers of ``directory``, shared by the whole process."""
+    key = str(Path(directory).resolve())
+    with _counters_lock:
+        if key not in _counters:
+            _counters[key] = ControlNumbers(key)
+        return _counters[key]
@@ -3,6 +3,8 @@ from calendar import timegm
 from datetime import datetime, date, timedelta
 import random
 
+import numpy as np
+
 
 class ParseError(ValueError):
     pass
@@ -95,6 +97,26 @@ def date_time_between(start_date="-30y", end_date="now", tzinfo=None):
         ).astimezone(tzinfo)
 
 
+def timestamps_between(start_date="-30y", end_date="now", size=1, rng=None):
+    """
+    Vectorized ``date_time_between``: random timestamps, in seconds since the
+    epoch, between two dates.
+
+    :param start_date: like ``date_time_between``, or np.ndarray of
+        timestamps, one start per row
+    :param end_date: like ``date_time_between``
+    :param size: number of rows
+    :param rng: np.random.Generator
+    :return np.ndarray of int64
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    if not isinstance(start_date, np.ndarray):
+        start_date = _parse_date_time(start_date)
+    end_date = _parse_date_time(end_date)
+    span = np.maximum(end_date - start_date, 0) + 1
+    return start_date + (rng.random(size) * span).astype(np.int64)
+
+
 def date_between_dates(date_start=None, date_end=None):
     """
     Takes two Date objects and returns a random date between the two given dates.
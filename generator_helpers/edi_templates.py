@@ -0,0 +1,90 @@
+"""
+Compiled EDI segment templates.
+
+Templates in ``templates/edi/`` are ``string.Template`` texts. They are read
+and compiled once per process into ``str.format`` strings, so building a
+segment is a single ``format_map`` call instead of a file read plus a fresh
+``Template`` per segment. ``refresh`` re-reads a template whose modification
+time changed, callers run it once per document rather than per segment.
+"""
+import os
+from pathlib import Path
+from string import Template
+
+# compiled templates of every directory used by the process
+_directories = {}
+
+
+def compile_template(text):
+    """
+    ``string.Template`` text as an equivalent ``str.format`` string.
+    :param text: template text with ``$name``, ``${name}`` and ``$$``
+    :return: format string for ``format_map``
+    """
+    parts, end = [], 0
+    for match in Template.pattern.finditer(text):
+        parts.append(text[end : match.start()].replace("{", "{{").replace("}", "}}"))
+        name = match.group("named") or match.group("braced")
+        if name:
+            parts.append("{%s}" % name)
+        elif match.group("escaped") is not None:
+            parts.append("$")
+        else:
+            raise ValueError(f"invalid placeholder in template: {text!r}")
+        end = match.end()
+    parts.append(text[end:].replace("{", "{{").replace("}", "}}"))
+    return "".join(parts)
+
+
+class SegmentTemplates:
+    """
+    Compiled templates of a directory.
+    :param directory: directory of the ``*.txt`` templates
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        # file name -> (mtime_ns, text, format string)
+        self._templates = {}
+
+    def _load(self, name, mtime=None):
+        path = self.directory / name
+        mtime = mtime if mtime is not None else os.stat(path).st_mtime_ns
+        text = path.read_text()
+        self._templates[name] = (mtime, text, compile_template(text))
+        return self._templates[name]
+
+    def _template(self, name):
+        template = self._templates.get(name)
+        return template if template is not None else self._load(name)
+
+    def refresh(self):
+        """Recompile the templates changed on disk since they were loaded."""
+        for name, (mtime, _, _) in list(self._templates.items()):
+            try:
+                current = os.stat(self.directory / name).st_mtime_ns
+            except FileNotFoundError:
+                del self._templates[name]
+                continue
+            if current != mtime:
+                self._load(name, current)
+
+    def text(self, name):
+        """Raw text of template ``name``."""
+        return self._template(name)[1]
+
+    def render(self, name, values=None):
+        """
+        :param name: template file name, e.g. ``"ISA.txt"``
+        :param values: dict of placeholder values
+        :return: segment string
+        """
+        return self._template(name)[2].format_map(values or {})
+
+
+def segment_templates(directory):
+    """SegmentTemplates of ``directory``, shared by the whole process."""
+    key = str(Path(directory).resolve())
+    if key not in _directories:
+        _directories[key] = SegmentTemplates(key)
+    return _directories[key]
@@ -0,0 +1,67 @@
+"""
+Catalog of entities shared between RT files, e.g. the benefit entities of a
+standard benefit entity file that individual usage records refer to.
+
+Catalog rows are generated once per run from a record spec and kept as one
+structured array (one ``S`` field per column), saved to a ``.npy`` file that
+is memory-mapped on load. Files referencing the catalog only draw an integer
+row index per record: the referenced columns are taken with that index, a
+vectorized join instead of one random draw per column and row.
+"""
+import numpy as np
+
+from generator_helpers.rt_schema import SchemaContext
+
+
+class EntityCatalog:
+    """
+    Entities of a run.
+    :param rows: structured np.ndarray with one S field per column
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def columns(self):
+        """dict of column name -> np.ndarray of S, views of the rows."""
+        return {name: self.rows[name] for name in self.rows.dtype.names}
+
+    @classmethod
+    def generate(cls, spec, size, seed=None):
+        """
+        :param spec: RecordSpec of an entity, without file level rules
+        :param size: number of entities
+        :param seed: seed of the entity values, random if None
+        """
+        ctx = SchemaContext(
+            rng=np.random.default_rng(seed),
+            fakers={},
+            optional_fields=True,
+            load_type="F",
+            payer_id="",
+            total=size,
+        )
+        columns = spec.compile(ctx).generate(ctx.batch(size))
+        rows = np.empty(
+            size, dtype=[(name, column.dtype) for name, column in columns.items()]
+        )
+        for name, column in columns.items():
+            rows[name] = column
+        return cls(rows)
+
+    @classmethod
+    def load(cls, path):
+        """Catalog saved by ``save``, memory-mapped."""
+        return cls(np.load(path, mmap_mode="r"))
+
+    def save(self, path):
+        """
+        :param path: ``.npy`` file
+        :return: path
+        """
+        np.save(path, np.asarray(self.rows))
+        return path
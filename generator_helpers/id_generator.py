@@ -0,0 +1,87 @@
+"""
+Bulk fixed-length identifiers for the RT generators.
+
+A whole column of IDs is drawn as one ``(size, length)`` uint8 matrix of
+ASCII codes and viewed as ``S{length}`` byte strings, instead of joining
+``np.random.choice(AN_DATA_TYPE, size=10)`` once per row.
+
+Unique IDs end with a suffix that encodes the row index through a
+per-file bijection (``y = (a * x + b) mod base ** k`` with ``a`` coprime to
+``base``). Uniqueness then holds across chunks and workers without
+remembering the IDs already issued.
+"""
+import math
+import string
+
+import numpy as np
+
+from core.exceptions import InvalidGeneratorConfigError
+
+ALPHANUMERIC = np.frombuffer(
+    (string.ascii_letters + string.digits).encode("ascii"), dtype=np.uint8
+)
+DIGITS = np.frombuffer(string.digits.encode("ascii"), dtype=np.uint8)
+LETTERS = np.frombuffer(string.ascii_letters.encode("ascii"), dtype=np.uint8)
+
+
+def ids(size, length=10, rng=None, alphabet=ALPHANUMERIC):
+    """
+    Random fixed length identifiers, duplicates are possible.
+    :param size: number of IDs
+    :param length: characters per ID
+    :param rng: np.random.Generator
+    :param alphabet: uint8 array of ASCII codes to draw from
+    :return: np.ndarray of S{length}
+    """
+    rng = rng or np.random.default_rng()
+    codes = alphabet[rng.integers(0, len(alphabet), size=(size, length))]
+    return codes.view(f"S{length}").reshape(size)
+
+
+class UniqueKey:
+    """
+    File-scoped parameters of the row index -> ID suffix bijection.
+    :param length: characters per ID
+    :param rng: np.random.Generator
+    :param alphabet: uint8 array of ASCII codes
+    """
+
+    def __init__(self, length, rng, alphabet=ALPHANUMERIC):
+        base = len(alphabet)
+        # a * x must fit in int64 for x < base ** suffix_length
+        self.suffix_length = min(length, int(31 // math.log2(base)))
+        self.capacity = base**self.suffix_length
+        multiplier = int(rng.integers(1, self.capacity))
+        while math.gcd(multiplier, base) != 1:
+            multiplier = int(rng.integers(1, self.capacity))
+        self.multiplier = multiplier
+        self.offset = int(rng.integers(0, self.capacity))
+
+
+def unique_ids(size, length=10, rng=None, alphabet=ALPHANUMERIC, start=0, key=None):
+    """
+    Identifiers unique among rows ``0 .. capacity`` of a file.
+    :param size: number of IDs
+    :param length: characters per ID
+    :param rng: np.random.Generator, draws the random prefix
+    :param alphabet: uint8 array of ASCII codes to draw from
+    :param start: index of the first row, for chunked generation
+    :param key: UniqueKey shared by every chunk of the file
+    :return: np.ndarray of S{length}
+    """
+    rng = rng or np.random.default_rng()
+    key = key or UniqueKey(length, rng, alphabet)
+    if start + size > key.capacity:
+        raise InvalidGeneratorConfigError(
+            "not enough unique identifiers",
+            details={"requested": start + size, "capacity": key.capacity},
+        )
+    base = len(alphabet)
+    rows = np.arange(start, start + size, dtype=np.int64)
+    scrambled = (rows * key.multiplier + key.offset) % key.capacity
+    powers = base ** np.arange(key.suffix_length - 1, -1, -1, dtype=np.int64)
+    codes = np.empty((size, length), dtype=np.uint8)
+    prefix = length - key.suffix_length
+    codes[:, :prefix] = alphabet[rng.integers(0, base, size=(size, prefix))]
+    codes[:, prefix:] = alphabet[scrambled[:, None] // powers % base]
+    return codes.view(f"S{length}").reshape(size)
@@ -0,0 +1,98 @@
+"""
+Master lists (insurances, locations) the generated entries are joined with.
+
+A master list csv is read once per process and kept as ``S`` arrays with an
+extra empty last row, the row taken by entries without a match: a join is
+an integer row index per entry and a ``take`` of the columns, no DataFrame
+merge. The cached list is read again when its file is modified.
+"""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+class MasterList:
+    """
+    Rows of a master list.
+    :param columns: dict of column name -> np.ndarray of S (utf-8), one row
+        longer than the list, the last row empty
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        for column in columns.values():
+            column.flags.writeable = False
+        self._indexes = {}
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) - 1
+
+    @property
+    def missing(self):
+        """Row index of the empty row."""
+        return len(self)
+
+    @classmethod
+    def read(cls, path):
+        """:param path: csv file, values kept as written, missing values empty"""
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+        return cls(
+            {
+                name: np.array(
+                    [value.encode() for value in frame[name]] + [b""], dtype="S"
+                )
+                for name in frame.columns
+            }
+        )
+
+    def rows(self, name, keys):
+        """
+        Row of every key in the integer column ``name``, e.g. Organization ID.
+        :param keys: np.ndarray of int
+        :return: np.ndarray of row indexes, ``missing`` for keys not listed
+        """
+        if name not in self._indexes:
+            listed = self.columns[name][:-1].astype(np.int64)
+            index = np.full(listed.max() + 2, self.missing)
+            index[listed] = np.arange(len(self))
+            self._indexes[name] = index
+        index = self._indexes[name]
+        # keys past the listed ones all land on the last, unlisted, key
+        return index.take(np.clip(keys, 0, len(index) - 1))
+
+    def numbers(self, name, rows):
+        """
+        Column ``name`` taken at ``rows`` as numbers, the way pandas reads
+        them: integers, or floats with NaN where a taken value is empty.
+        :param rows: np.ndarray of row indexes
+        :return: np.ndarray of int64 or float
+        """
+        column = self.columns[name][rows]
+        filled = column != b""
+        if filled.all():
+            return column.astype(np.int64)
+        values = np.full(len(column), np.nan)
+        values[filled] = column[filled].astype(np.float64)
+        return values
+
+
+# master lists read by the process, by path
+_master_lists = {}
+_master_lists_lock = threading.Lock()
+
+
+def master_list(path):
+    """
+    MasterList of the csv file ``path``, shared by the whole process and read
+    again when the file is modified.
+    """
+    key = str(Path(path).resolve())
+    modified = os.stat(key).st_mtime_ns
+    with _master_lists_lock:
+        cached = _master_lists.get(key)
+        if cached is None or cached[0] != modified:
+            cached = _master_lists[key] = (modified, MasterList.read(key))
+        return cached[1]
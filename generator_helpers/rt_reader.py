@@ -0,0 +1,304 @@
+"""
+Vectorized reader and validator for generated RT files.
+
+Files are memory-mapped and parsed in newline-aligned blocks: separator and
+newline positions of a block are found with NumPy, so a multi-GB file is
+checked without splitting every line in Python or loading it into pandas.
+
+    with RTFileReader(path, RTEligibbility) as reader:
+        summary = reader.validate()
+        offsets = reader.record_offsets()
+        record = reader.record(1_000_002)
+"""
+import mmap
+from typing import NamedTuple
+
+import numpy as np
+
+from generator_helpers.rt_schema import Constant, RecordSpec
+
+SEPARATOR = ord("|")
+NEWLINE = ord("\n")
+BLOCK_SIZE = 64 * 2**20
+# first detail record, the header is record 1
+FIRST_RECORD = 2
+
+
+class Issue(NamedTuple):
+    """A validation failure at a line of the file (the header is line 1)."""
+
+    line: int
+    offset: int
+    message: str
+
+
+class _Block:
+    """
+    Whole lines of a file, parsed on demand: newline positions always,
+    separator positions only when a field is read.
+    """
+
+    def __init__(self, start, first_line, data):
+        self.start = start
+        self.first_line = first_line
+        self.data = data
+        newlines = np.flatnonzero(data == NEWLINE)
+        self.line_starts = np.concatenate([[0], newlines[:-1] + 1])
+        self._separators = None
+
+    def _first_separators(self):
+        if self._separators is None:
+            separators = np.flatnonzero(self.data == SEPARATOR)
+            bounds = np.append(self.line_starts, len(self.data))
+            self._separators = separators, np.searchsorted(separators, bounds)
+        return self._separators
+
+    def separator_counts(self):
+        """Fields of every line, each field ends with a separator."""
+        _, first = self._first_separators()
+        return np.diff(first)
+
+    def field(self, position):
+        """One field of every line as an S array."""
+        separators, first = self._first_separators()
+        first = first[:-1]
+        # lines with fewer fields get garbage bounds, callers check
+        # separator_counts() first
+        last = max(len(separators) - 1, 0)
+        ends = separators[(first + position).clip(0, last)]
+        starts = self.line_starts
+        if position:
+            previous = separators[(first + position - 1).clip(0, last)]
+            starts = np.minimum(previous + 1, ends)
+        width = max(int((ends - starts).max()) if len(starts) else 1, 1)
+        index = starts[:, None] + np.arange(width)
+        values = np.where(
+            index < ends[:, None], self.data[index.clip(0, len(self.data) - 1)], 0
+        )
+        return values.astype(np.uint8).view(f"S{width}").reshape(len(starts))
+
+
+def _record_fields(generator_class):
+    """Record Id -> number of fields, from the record specs of an RTFile."""
+    fields = {}
+    for name in dir(generator_class) if generator_class else []:
+        spec = getattr(generator_class, name)
+        if isinstance(spec, RecordSpec) and spec.fields:
+            kind = spec.fields[0].kind
+            if isinstance(kind, Constant):
+                fields[kind.value.encode()] = len(spec.fields)
+    return fields
+
+
+def _integers(values):
+    """Decimal S values as int64, -1 where a value is not a number."""
+    codes = np.ascontiguousarray(values).view(np.uint8).reshape(len(values), -1)
+    digits = codes.astype(np.int64) - ord("0")
+    present = codes != 0
+    valid = present.any(axis=1) & ((digits >= 0) & (digits <= 9) | ~present).all(
+        axis=1
+    )
+    number = np.zeros(len(values), dtype=np.int64)
+    for column in range(codes.shape[1]):
+        number = np.where(present[:, column], number * 10 + digits[:, column], number)
+    return np.where(valid, number, -1)
+
+
+class RTFileReader:
+    """
+    Memory-mapped RT file.
+    :param path: RT file
+    :param generator_class: RTFile subclass the file was generated with,
+        enables the field count checks
+    :param block_size: bytes parsed at a time
+    """
+
+    def __init__(self, path, generator_class=None, block_size=BLOCK_SIZE):
+        self.path = path
+        self.block_size = block_size
+        self._record_fields = _record_fields(generator_class)
+        self._file = None
+        self._mapped = None
+        self._data = None
+        self.records_scanned = 0
+
+    def __enter__(self):
+        self._file = open(self.path, "rb")
+        if self._file.seek(0, 2):
+            self._mapped = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._data = np.frombuffer(self._mapped, dtype=np.uint8)
+        return self
+
+    def __exit__(self, *exc_info):
+        # the NumPy view must be released before the map is closed
+        self._data = None
+        if self._mapped is not None:
+            self._mapped.close()
+        self._file.close()
+
+    @property
+    def size(self):
+        return len(self._mapped) if self._mapped is not None else 0
+
+    def _detail_range(self):
+        """Byte range of the detail records, header and trailer excluded."""
+        if not self.size:
+            return 0, 0
+        start = self._mapped.find(b"\n") + 1
+        # the last newline ends the trailer, the one before it the last record
+        stop = self._mapped.rfind(b"\n", 0, self.size - 1) + 1
+        return start, max(start, stop)
+
+    def _line(self, start):
+        end = self._mapped.find(b"\n", start)
+        return self._mapped[start : end if end >= 0 else self.size]
+
+    @property
+    def header(self):
+        """Header fields as bytes."""
+        return self._line(0).split(b"|")[:-1] if self.size else []
+
+    @property
+    def trailer(self):
+        """Trailer fields as bytes."""
+        start, stop = self._detail_range()
+        if not start:
+            return []
+        return self._line(stop).split(b"|")[:-1]
+
+    def blocks(self):
+        """Newline-aligned blocks of detail records, parsed."""
+        start, stop = self._detail_range()
+        line = FIRST_RECORD
+        while start < stop:
+            limit = stop
+            if start + self.block_size < stop:
+                limit = self._mapped.rfind(b"\n", start, start + self.block_size) + 1
+                if limit <= start:
+                    limit = self._mapped.find(b"\n", start) + 1
+            block = _Block(start, line, self._data[start:limit])
+            yield block
+            line += len(block.line_starts)
+            start = limit
+
+    def field(self, position):
+        """
+        One field of every detail record.
+        :param position: index of the field in the record
+        :return: np.ndarray of S
+        """
+        columns = [block.field(position) for block in self.blocks()]
+        return np.concatenate(columns) if columns else np.array([], dtype="S1")
+
+    def record_offsets(self):
+        """
+        Byte offset of every detail record, record ``n`` starts at
+        ``offsets[n - 2]``; uint32 when the file is under 4 GiB.
+        """
+        dtype = np.uint32 if self.size < 2**32 else np.int64
+        offsets = [
+            (block.line_starts + block.start).astype(dtype) for block in self.blocks()
+        ]
+        return np.concatenate(offsets) if offsets else np.array([], dtype=dtype)
+
+    def record(self, number, offsets=None):
+        """
+        Fields of the detail record with Record Number ``number``.
+        :param offsets: ``record_offsets()``, O(1) lookups when given
+        """
+        if offsets is None:
+            offsets = self.record_offsets()
+        return self._line(int(offsets[number - FIRST_RECORD])).split(b"|")[:-1]
+
+    def issues(self):
+        """
+        Validation failures, yielded as the file is scanned: header and
+        trailer record types, field counts, Record Number sequence and the
+        trailer record count.
+        """
+        header = self.header
+        if header[:1] != [b"HDR"]:
+            yield Issue(1, 0, "header record must start with HDR")
+        elif self._record_fields and len(header) != self._record_fields[b"HDR"]:
+            yield Issue(1, 0, f"header has {len(header)} fields")
+
+        records = 0
+        for block in self.blocks():
+            lines = len(block.line_starts)
+            expected = np.arange(block.first_line, block.first_line + lines)
+            numbers = np.where(
+                block.separator_counts() >= 2, _integers(block.field(1)), -1
+            )
+            for line in np.flatnonzero(numbers != expected):
+                yield Issue(
+                    int(expected[line]),
+                    block.start + int(block.line_starts[line]),
+                    f"Record Number {numbers[line]} out of sequence"
+                    if numbers[line] >= 0
+                    else "missing or invalid Record Number",
+                )
+            if self._record_fields:
+                yield from self._field_count_issues(block, expected)
+            records += lines
+        self.records_scanned = records
+
+        trailer = self.trailer
+        line = FIRST_RECORD + records
+        if trailer[:1] != [b"TRLR"]:
+            yield Issue(line, self._detail_range()[1], "trailer must start with TRLR")
+        elif len(trailer) < 2 or _integers(np.array(trailer[1:2]))[0] != records:
+            yield Issue(
+                line,
+                self._detail_range()[1],
+                f"trailer count {trailer[1:2]} does not match {records} records",
+            )
+
+    def _field_count_issues(self, block, expected):
+        counts = block.separator_counts()
+        record_ids = block.field(0)
+        for record_id in np.unique(record_ids):
+            rows = record_ids == record_id
+            fields = self._record_fields.get(bytes(record_id))
+            wrong = np.flatnonzero(rows & (counts != (fields or -1)))
+            for line in wrong:
+                message = (
+                    f"{record_id.decode()} record has {counts[line]} fields"
+                    if fields
+                    else f"unknown record type {record_id.decode()}"
+                )
+                yield Issue(
+                    int(expected[line]),
+                    block.start + int(block.line_starts[line]),
+                    message,
+                )
+
+    def validate(self, max_issues=100):
+        """
+        Scan the whole file.
+        :param max_issues: issues kept in the summary, all are counted
+        :return: dict with the detail record count, issue count and first
+            issues
+        """
+        kept, count = [], 0
+        for issue in self.issues():
+            count += 1
+            if len(kept) < max_issues:
+                kept.append(issue)
+        return {
+            "valid": not count,
+            "records": self.records_scanned,
+            "issue_count": count,
+            "issues": kept,
+        }
+
+
+def read_field(path, position, block_size=BLOCK_SIZE):
+    """
+    Values of one field of every detail record of an RT file.
+    :param path: RT file
+    :param position: index of the field in the detail record
+    :param block_size: bytes parsed at a time
+    :return: np.ndarray of S
+    """
+    with RTFileReader(path, block_size=block_size) as reader:
+        return reader.field(position)
@@ -0,0 +1,1072 @@
+"""
+Declarative field specs shared by the RT fixed-format generators.
+
+Every RT file type (eligibility, claim status, plan benefit, individual usage,
+standard benefit entity) declares its header, detail and trailer records as a
+table of ``Field(name, kind, when, otherwise)`` rows:
+
+- ``kind`` builds the whole column for a batch of rows (see the column kinds
+  below), e.g. ``Choice(CODE_SET_A)`` or ``Date(1930, 2019)``;
+- ``when`` is the optional-field rule, e.g. ``OPTIONAL`` or
+  ``validation_code(2, 5)``; rules are evaluated once per file, except
+  ``Matches`` which depends on another column of the same row;
+- ``otherwise`` is the value (or another ``Branch``) used when the rule fails.
+
+``RecordSpec.compile`` resolves the rules once per file into a list of batched
+column generators plus the row format used by the serializer, and ``RTFile``
+implements generation and writing once for all file types.
+"""
+import json
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from mimesis import Address, Code, Datetime, Person, Text
+
+from core.constants import RT_CHUNK_SIZE
+from core.exceptions import InvalidGeneratorConfigError
+from generator_helpers import column_generator, id_generator
+from generator_helpers.worker_pool import (
+    bounded_imap,
+    run_state,
+    task_state,
+    worker_pool,
+)
+
+
+class SchemaContext:
+    """
+    State shared by the column kinds while a batch of records is generated.
+
+    :param rng: np.random.Generator used by every column of the file
+    :param fakers: mimesis providers by name ("person", "address", ...)
+    :param optional_fields: fill optional fields
+    :param load_type: file load type, "F"/"I"/"D"
+    :param payer_id: payer identifier shared by the file
+    :param total: total number of rows of the record type, bounds provider pools
+    """
+
+    def __init__(
+        self, rng, fakers, optional_fields, load_type, payer_id, total=1, header=None
+    ):
+        self.rng = rng
+        self.fakers = fakers
+        self.optional_fields = optional_fields
+        self.load_type = load_type
+        self.payer_id = payer_id
+        self.total = total
+        self.header = header or {}
+        self.record_count = 0
+        self.cache = {}
+        self.size = 0
+        self.start = 0
+        self.columns = {}
+        self.record_numbers = None
+        self.record_offset = 0
+        self.parent = {}
+        self.parent_index = None
+
+    def batch(
+        self, size, start=0, record_numbers=None, parent=None, parent_index=None
+    ):
+        """
+        Reset per-batch state before a record batch is generated.
+        :param size: number of rows in the batch
+        :param start: index of the first row of the batch in the file
+        :param record_numbers: global "Record Number" of every row
+        :param parent: columns of the parent record (claim for claim lines)
+        :param parent_index: parent row of every row
+        """
+        self.size = size
+        self.start = start
+        self.columns = {}
+        self.record_numbers = (
+            record_numbers
+            if record_numbers is not None
+            else np.arange(start + 2, start + size + 2)
+        )
+        self.parent = parent or {}
+        self.parent_index = parent_index
+        return self
+
+
+# column kinds
+
+
+class Constant:
+    def __init__(self, value):
+        self.value = str(value)
+
+    def __call__(self, ctx):
+        return column_generator.blank(ctx.size, self.value)
+
+
+class Choice:
+    """
+    Values drawn from a code set, uniformly or with ``weights`` (one per
+    value, normalized).
+    """
+
+    def __init__(self, values, weights=None):
+        self.values = column_generator.ascii_array(values)
+        self.cumulative = None
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            self.cumulative = np.cumsum(weights) / weights.sum()
+
+    def __call__(self, ctx):
+        if self.cumulative is None:
+            return column_generator.choice(self.values, ctx.size, ctx.rng)
+        return column_generator.weighted_choice(
+            self.values, self.cumulative, ctx.size, ctx.rng
+        )
+
+
+class AlphaNumeric:
+    """
+    Alphanumeric identifiers, ``unique`` ones never repeat within the file.
+    """
+
+    def __init__(self, length=10, unique=False, alphabet=id_generator.ALPHANUMERIC):
+        self.length = length
+        self.unique = unique
+        self.alphabet = alphabet
+
+    def __call__(self, ctx):
+        if not self.unique:
+            return id_generator.ids(ctx.size, self.length, ctx.rng, self.alphabet)
+        key = ctx.cache.get(self)
+        if key is None:
+            key = ctx.cache[self] = id_generator.UniqueKey(
+                self.length, ctx.rng, self.alphabet
+            )
+        return id_generator.unique_ids(
+            ctx.size, self.length, ctx.rng, self.alphabet, start=ctx.start, key=key
+        )
+
+
+class Digits:
+    def __init__(self, length):
+        self.length = length
+
+    def __call__(self, ctx):
+        return column_generator.digits(ctx.size, self.length, ctx.rng)
+
+
+class Integer:
+    """Integers in ``[low, high)``, same bounds as ``np.random.randint``."""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def __call__(self, ctx):
+        return column_generator.integers(self.low, self.high, ctx.size, ctx.rng)
+
+
+class Date:
+    """
+    ``%Y%m%d`` dates between two years; with ``relative=True`` the years are
+    offsets from the current year.
+    """
+
+    def __init__(self, start, end, relative=False):
+        self.start = start
+        self.end = end
+        self.relative = relative
+
+    def __call__(self, ctx):
+        offset = datetime.now().year if self.relative else 0
+        return column_generator.dates(
+            self.start + offset, self.end + offset, ctx.size, ctx.rng
+        )
+
+
+class Time:
+    """``%H%M%S`` time of day."""
+
+    def __call__(self, ctx):
+        return column_generator.times(ctx.size, ctx.rng)
+
+
+class Timestamp:
+    def __init__(self, fmt="%Y%m%d%H%M%S"):
+        self.fmt = fmt
+
+    def __call__(self, ctx):
+        return column_generator.blank(ctx.size, datetime.now().strftime(self.fmt))
+
+
+class Bothify:
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __call__(self, ctx):
+        return column_generator.bothify(self.mask, ctx.size, ctx.rng)
+
+
+class Fake:
+    """
+    Values of a mimesis provider method, sampled from a bounded pool.
+    :param provider: key of ``SchemaContext.fakers``
+    :param method: provider method name
+    :param args: method arguments
+    :param format: optional callable applied to every provider value
+    """
+
+    def __init__(self, provider, method, *args, format=None):
+        self.provider = provider
+        self.method = method
+        self.args = args
+        self.format = format
+
+    def _value(self, factory):
+        value = factory(*self.args)
+        return self.format(value) if self.format else value
+
+    def __call__(self, ctx):
+        # the pool is drawn once per file and reused by every chunk
+        pool = ctx.cache.get(self)
+        if pool is None:
+            factory = getattr(ctx.fakers[self.provider], self.method)
+            pool = ctx.cache[self] = column_generator.provider_pool(
+                lambda: self._value(factory),
+                min(ctx.total, column_generator.POOL_SIZE),
+            )
+        return pool[ctx.rng.integers(0, len(pool), size=ctx.size)]
+
+
+class Numbered:
+    """``f"{prefix}{row index}"``, e.g. "Plan 0", "Plan 1"..."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+    def __call__(self, ctx):
+        rows = np.arange(ctx.start, ctx.start + ctx.size)
+        prefix = column_generator.ascii_bytes(self.prefix)
+        return np.char.add(prefix, rows.astype("S"))
+
+
+class RecordNumber:
+    """Position of the record in its file, ``ctx.record_offset`` based."""
+
+    def __call__(self, ctx):
+        return ctx.record_numbers - ctx.record_offset
+
+
+class RecordCount:
+    def __call__(self, ctx):
+        return column_generator.blank(ctx.size, str(ctx.record_count))
+
+
+class LoadType:
+    def __call__(self, ctx):
+        return column_generator.blank(ctx.size, ctx.load_type)
+
+
+class PayerId:
+    def __call__(self, ctx):
+        return column_generator.blank(ctx.size, ctx.payer_id)
+
+
+class Copy:
+    """Same value as another column of the row."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __call__(self, ctx):
+        return ctx.columns[self.field]
+
+
+class Parent:
+    """Value of a column of the parent record, e.g. the claim of a claim line."""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __call__(self, ctx):
+        return ctx.parent[self.field][ctx.parent_index]
+
+
+class Mapped:
+    """Dependent column looked up from another column through ``mapping``."""
+
+    def __init__(self, field, mapping):
+        keys = column_generator.ascii_array(mapping.keys())
+        order = np.argsort(keys)
+        self.field = field
+        self.keys = keys[order]
+        self.values = column_generator.ascii_array(mapping.values())[order]
+
+    def __call__(self, ctx):
+        source = ctx.columns[self.field]
+        index = np.searchsorted(self.keys, source).clip(0, len(self.keys) - 1)
+        return np.where(self.keys[index] == source, self.values[index], b"")
+
+
+class Given:
+    """
+    Column supplied by the generator for every row of the file, e.g. the
+    existing subscriber IDs a delta load updates.
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    def __call__(self, ctx):
+        return self.values[ctx.start : ctx.start + ctx.size]
+
+
+class Concat:
+    """Row-wise concatenation of kinds and literal strings."""
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def __call__(self, ctx):
+        return column_generator.concat(
+            *(part(ctx) if callable(part) else part for part in self.parts)
+        )
+
+
+# optional-field rules
+
+
+def OPTIONAL(ctx):
+    return ctx.optional_fields
+
+
+def header_is(field, *values):
+    """Header ``field`` has one of ``values``."""
+    return lambda ctx: str(ctx.header[field]) in values
+
+
+def validation_code(*codes):
+    """Header "File Validation Code" is one of ``codes``."""
+    return header_is("File Validation Code", *(str(code) for code in codes))
+
+
+def all_of(*rules):
+    return lambda ctx: all(rule(ctx) for rule in rules)
+
+
+class Matches:
+    """Row level rule: another column of the row has one of ``values``."""
+
+    row_level = True
+
+    def __init__(self, field, *values, negate=False):
+        self.field = field
+        self.values = column_generator.ascii_array(values)
+        self.negate = negate
+
+    def __call__(self, ctx):
+        mask = np.isin(ctx.columns[self.field], self.values)
+        return ~mask if self.negate else mask
+
+
+# specs
+
+
+class Branch(NamedTuple):
+    """Conditional column: ``kind`` if ``when`` holds, else ``otherwise``."""
+
+    kind: Any
+    when: Any = None
+    otherwise: Any = ""
+
+
+class Field(NamedTuple):
+    name: str
+    kind: Any
+    when: Any = None
+    otherwise: Any = ""
+
+
+class _Masked:
+    def __init__(self, rule, kind, otherwise):
+        self.rule = rule
+        self.kind = kind
+        self.otherwise = otherwise
+
+    def __call__(self, ctx):
+        # both sides are always generated so every chunk draws the same
+        # columns, whatever rows it happens to contain
+        return np.where(self.rule(ctx), self.kind(ctx), self.otherwise(ctx))
+
+
+def _resolve(kind, when, otherwise, ctx):
+    """
+    Resolve a conditional column into a single column generator for this file.
+    """
+    if isinstance(kind, Branch):
+        kind = _resolve(*kind, ctx)
+    if isinstance(otherwise, Branch):
+        otherwise = _resolve(*otherwise, ctx)
+    elif not callable(otherwise):
+        otherwise = Constant(otherwise)
+    if when is None:
+        return kind
+    if getattr(when, "row_level", False):
+        return _Masked(when, kind, otherwise)
+    return kind if when(ctx) else otherwise
+
+
+SEPARATOR = ord("|")
+NEWLINE = ord("\n")
+
+
+def _integer_bytes(values):
+    """
+    ASCII digits of non-negative integers as a uint8 matrix, leading zeros
+    are left as 0 bytes so they are dropped with the padding.
+    """
+    width = len(str(values.max())) if len(values) else 1
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = values[:, None] // powers
+    significant = (digits > 0) | (powers == 1)
+    return np.where(significant, digits % 10 + ord("0"), 0).astype(np.uint8)
+
+
+def column_bytes(column):
+    """
+    Column as a ``(rows, width)`` uint8 matrix padded with 0 bytes. Non ASCII
+    characters become 0 bytes too, the same as ``encode("ascii", "ignore")``.
+    """
+    column = np.asarray(column)
+    if column.dtype.kind in "iu" and (not len(column) or column.min() >= 0):
+        return _integer_bytes(column)
+    if column.dtype.kind == "S":
+        codes = np.ascontiguousarray(column).view(np.uint8)
+        codes = codes.reshape(len(column), column.dtype.itemsize)
+        return np.where(codes < 128, codes, 0).astype(np.uint8)
+    if column.dtype.kind != "U":
+        column = column.astype(str)
+    column = np.ascontiguousarray(column)
+    width = column.dtype.itemsize // 4
+    codes = column.view(np.uint32).reshape(len(column), width)
+    return np.where(codes < 128, codes, 0).astype(np.uint8)
+
+
+class CompiledRecord:
+    """
+    Record spec resolved for one file: column generators and row format.
+    """
+
+    def __init__(self, names, generators):
+        self.names = names
+        self.generators = generators
+        self.row_format = "{}|" * len(names) + "\n"
+
+    def generate(self, ctx):
+        """
+        Generate every column of a batch, ``ctx.batch`` must be called first.
+        :return: dict of column name -> np.ndarray of ``ctx.size`` values
+        """
+        for name, generator in zip(self.names, self.generators):
+            ctx.columns[name] = generator(ctx)
+        return ctx.columns
+
+    def line(self, record):
+        """
+        Serialize a single record (header, trailer).
+        :param record: dict of field values in field order
+        """
+        return self.row_format.format(*record.values()).encode("ascii", "ignore")
+
+    def byte_matrix(self, columns):
+        """
+        Records of a batch laid out as ``value|value|...|\n`` rows of a
+        uint8 matrix, padding bytes are 0.
+        :param columns: dict of equal length columns in field order
+        :return: np.ndarray of shape (rows, width)
+        """
+        return _fields_matrix(
+            [column_bytes(column) for column in columns.values()], newline=True
+        )
+
+    def to_bytes(self, columns):
+        """
+        Serialize a batch of records into one bytes buffer.
+        :param columns: dict of equal length columns in field order
+        """
+        return packed(self.byte_matrix(columns))
+
+
+def _fields_matrix(blocks, newline=False):
+    """
+    Lay out field byte blocks as ``value|value|...|`` rows, optionally
+    ending with a newline.
+    """
+    rows = len(blocks[0])
+    matrix = np.zeros(
+        (rows, sum(block.shape[1] for block in blocks) + len(blocks) + newline),
+        dtype=np.uint8,
+    )
+    offset = 0
+    for block in blocks:
+        matrix[:, offset : offset + block.shape[1]] = block
+        offset += block.shape[1]
+        matrix[:, offset] = SEPARATOR
+        offset += 1
+    if newline:
+        matrix[:, offset] = NEWLINE
+    return matrix
+
+
+def packed(matrix):
+    """Drop the padding of a byte matrix, rows stay in order."""
+    return matrix[matrix != 0].tobytes()
+
+
+CATALOG_INDEX = "Catalog Index"
+
+
+class CatalogRecord:
+    """
+    Dictionary-encoded record: the catalog fields are generated once for
+    ``size`` distinct catalog rows and serialized once; every entry only
+    generates its own ``row_fields`` and the index of its catalog row
+    (``CATALOG_INDEX`` column), and is expanded through the catalog when
+    written. Row fields may not depend on catalog fields.
+
+    :param record: CompiledRecord of the full spec
+    :param row_fields: names of the fields generated for every entry
+    """
+
+    def __init__(self, record, row_fields):
+        self.names = record.names
+        self.is_row_field = [name in row_fields for name in record.names]
+        generators = dict(zip(record.names, record.generators))
+        self.rows = CompiledRecord(
+            [name for name in self.names if name in row_fields],
+            [generators[name] for name in self.names if name in row_fields],
+        )
+        self.catalog_fields = CompiledRecord(
+            [name for name in self.names if name not in row_fields],
+            [generators[name] for name in self.names if name not in row_fields],
+        )
+        self.catalog = {}
+        self._segments = []
+
+    def generate_catalog(self, ctx, size):
+        """Generate and pre-serialize the ``size`` catalog rows."""
+        self.catalog = dict(self.catalog_fields.generate(ctx.batch(size)))
+        catalog_bytes = iter(
+            [column_bytes(self.catalog[name]) for name in self.catalog_fields.names]
+        )
+        # runs of consecutive catalog fields become one (size, width) matrix
+        self._segments = []
+        for is_row_field, names in _runs(self.names, self.is_row_field):
+            if is_row_field:
+                self._segments.append((True, names))
+            else:
+                blocks = [next(catalog_bytes) for _ in names]
+                self._segments.append((False, _fields_matrix(blocks)))
+        return self.catalog
+
+    def generate(self, ctx):
+        """Row fields of a batch plus the catalog row of every entry."""
+        columns = dict(self.rows.generate(ctx))
+        size = len(next(iter(self.catalog.values())))
+        columns[CATALOG_INDEX] = ctx.rng.integers(0, size, size=ctx.size).astype(
+            np.int32 if size < 2**31 else np.int64
+        )
+        return columns
+
+    def expand(self, columns):
+        """Every field of the entries, in field order."""
+        index = columns[CATALOG_INDEX]
+        return {
+            name: columns[name] if name in columns else self.catalog[name][index]
+            for name in self.names
+        }
+
+    def byte_matrix(self, columns):
+        index = columns[CATALOG_INDEX]
+        blocks = []
+        for is_row_field, segment in self._segments:
+            if is_row_field:
+                fields = [column_bytes(columns[name]) for name in segment]
+                blocks.append(_fields_matrix(fields))
+            else:
+                blocks.append(segment[index])
+        newline = np.full((len(index), 1), NEWLINE, dtype=np.uint8)
+        return np.hstack(blocks + [newline])
+
+    def to_bytes(self, columns):
+        return packed(self.byte_matrix(columns))
+
+
+def _runs(names, flags):
+    """Consecutive names sharing the same flag, as ``(flag, names)``."""
+    runs = []
+    for name, flag in zip(names, flags):
+        if runs and runs[-1][0] == flag:
+            runs[-1][1].append(name)
+        else:
+            runs.append((flag, [name]))
+    return runs
+
+
+class RecordSpec:
+    """Table of fields describing one RT record type."""
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+    def replaced(self, kinds, keep_rules=False):
+        """
+        Same spec with the kind of some fields replaced.
+        :param kinds: dict of field name -> kind
+        :param keep_rules: keep the ``when``/``otherwise`` rules of the
+            replaced fields, else they are always filled
+        """
+        fields = []
+        for field in self.fields:
+            if field.name in kinds:
+                field = (
+                    field._replace(kind=kinds[field.name])
+                    if keep_rules
+                    else Field(field.name, kinds[field.name])
+                )
+            fields.append(field)
+        return RecordSpec(*fields)
+
+    def compile(self, ctx):
+        """
+        Resolve the file level rules of every field.
+        :param ctx: SchemaContext with the file settings and header
+        :return: CompiledRecord
+        """
+        return CompiledRecord(
+            [field.name for field in self.fields],
+            [
+                _resolve(field.kind, field.when, field.otherwise, ctx)
+                for field in self.fields
+            ],
+        )
+
+
+def header_fields(file_type, release_code="00"):
+    """
+    Header fields common to every RT file type.
+    :param file_type: "Elig", "CStat", "Planbene"...
+    :param release_code: format release
+    """
+    return (
+        Field("Record Id", Constant("HDR")),
+        Field("File Group ID", AlphaNumeric()),
+        Field("File Group Sequence Number", Constant("1")),
+        Field("File Group Count", Constant("1")),
+        Field("Creation Date", Date(1980, 2019)),
+        Field("Creation Time", Time()),
+        Field("Trading Partner ID", AlphaNumeric()),
+        Field("Submitter Name", Fake("person", "first_name")),
+        Field("Payer Contact Name", Fake("person", "first_name"), when=OPTIONAL),
+        Field("Payer Support Telephone Number", Digits(10), when=OPTIONAL),
+        Field("Payer Support Email Address", Fake("person", "email"), when=OPTIONAL),
+        Field("Load Type", LoadType()),
+        Field("Payer Unique File Identifier", Timestamp()),
+        Field("File Type", Constant(file_type)),
+        Field("Version Code", Constant("03")),
+        Field("Release Code", Constant(release_code)),
+    )
+
+
+class RTFile:
+    """
+    Base class of the spec-driven RT generators.
+
+    Subclasses declare ``HEADER``, ``DETAIL`` and ``TRAILER`` record specs and
+    the ``FILE_NAME`` pattern, formatted with ``timestamp``, ``payer_id`` and
+    ``header``.
+
+    With ``chunk_size`` set, detail records are not kept in ``detail_schema``:
+    ``schemas_to_file`` generates and writes them ``chunk_size`` rows at a
+    time, so memory does not grow with ``entries_number``. Every chunk then
+    draws from its own RNG stream derived from ``seed`` and the chunk index,
+    so with ``processes > 1`` chunks are generated by a process pool and the
+    detail records are the same bytes whatever the number of processes.
+    """
+
+    HEADER = RecordSpec()
+    DETAIL = RecordSpec()
+    TRAILER = RecordSpec()
+    FILE_NAME = "{timestamp}_{payer_id}_test.txt"
+
+    def __init__(
+        self,
+        entries_number: int,
+        load_type: str,
+        optional_fields: bool = False,
+        chunk_size: int = None,
+        seed: int = None,
+        processes: int = 1,
+    ):
+        """
+        :param seed: seed of every random value of the file, random if None
+        :param processes: worker processes generating chunks, streaming only
+        """
+        self.optional_fields = optional_fields
+        self.load_type = load_type
+        self.chunk_size = chunk_size
+        self.processes = processes
+        self._entries_number = entries_number
+        self._seed = np.random.SeedSequence(seed)
+        self._rng = np.random.default_rng(self._seed)
+        faker_seed = int(self._seed.generate_state(1)[0])
+        self._fakers = {
+            "person": Person("en", seed=faker_seed),
+            "address": Address("en", seed=faker_seed),
+            "datetime": Datetime(seed=faker_seed),
+            "code": Code(seed=faker_seed),
+            "text": Text(seed=faker_seed),
+        }
+        self._payer_id = id_generator.ids(1, 10, self._rng)[0].decode()
+        self._records = {}
+        self._file_name = ""
+        self.header_schema = {}
+        self.detail_schema = {}
+        self.trailer_schema = {}
+
+    @property
+    def record_count(self):
+        """Number of records reported by the trailer."""
+        return self._entries_number
+
+    @property
+    def rows_per_chunk(self):
+        """Detail entries generated (streaming mode) or serialized per chunk."""
+        return self.chunk_size or RT_CHUNK_SIZE
+
+    def _context(self, total=1):
+        ctx = SchemaContext(
+            rng=self._rng,
+            fakers=self._fakers,
+            optional_fields=self.optional_fields,
+            load_type=self.load_type,
+            payer_id=self._payer_id,
+            total=total,
+            header=self.header_schema,
+        )
+        ctx.record_count = self.record_count
+        return ctx
+
+    def _compile(self, name, spec):
+        """
+        Compile a record spec once per file, header values are known by then.
+        """
+        self._records[name] = spec.compile(self._context())
+        return self._records[name]
+
+    def _one_line_schema(self, name, spec):
+        self._compile(name, spec)
+        return self._one_line_values(name, self._context())
+
+    def _one_line_values(self, name, ctx):
+        columns = self._records[name].generate(ctx.batch(1))
+        return {
+            key: column[0].decode() if column.dtype.kind == "S" else column[0]
+            for key, column in columns.items()
+        }
+
+    def _generate_header_schema(self):
+        self.header_schema = self._one_line_schema("header", self.HEADER)
+
+    def _compile_detail(self):
+        self._compile("detail", self.DETAIL)
+
+    def _generate_chunk(self, ctx, start, size):
+        """
+        Generate detail entries ``start`` to ``start + size``.
+        :return: columns of the chunk
+        """
+        return self._records["detail"].generate(ctx.batch(size, start=start))
+
+    def _store_chunk(self, chunk):
+        self.detail_schema = chunk
+
+    def _slice_chunk(self, start, size):
+        """Detail entries ``start`` to ``start + size`` of ``detail_schema``."""
+        return {
+            name: column[start : start + size]
+            for name, column in self.detail_schema.items()
+        }
+
+    def _chunk_bounds(self, rows_per_chunk=None):
+        """
+        ``(start, size)`` of every chunk, in detail entries.
+        :param rows_per_chunk: chunk size, ``rows_per_chunk`` if None
+        """
+        rows_per_chunk = rows_per_chunk or self.rows_per_chunk
+        for start in range(0, self._entries_number, rows_per_chunk):
+            yield start, min(rows_per_chunk, self._entries_number - start)
+
+    def _chunk_rng(self, index):
+        """RNG stream of chunk ``index``, independent of the other chunks."""
+        return np.random.default_rng(
+            np.random.SeedSequence(self._seed.entropy, spawn_key=(1, index))
+        )
+
+    def _streaming_context(self):
+        """
+        File context with the file-scoped caches (provider pools, unique ID
+        keys) filled up front, so chunks only differ by their RNG stream.
+        """
+        ctx = self._context(total=self._entries_number)
+        if self._entries_number:
+            self._generate_chunk(ctx, 0, 1)
+        return ctx
+
+    def _shard_bytes(self, ctx, index, start, size, record_offset=0):
+        """
+        Generate and serialize chunk ``index`` in streaming mode.
+        :param record_offset: records of the file group written to the
+            previous files, subtracted from every Record Number
+        """
+        ctx.rng = self._chunk_rng(index)
+        ctx.record_offset = record_offset
+        return self._chunk_bytes(self._generate_chunk(ctx, start, size))
+
+    def _chunks(self):
+        """Detail chunks of the generated schema in file order."""
+        for start, size in self._chunk_bounds():
+            yield self._slice_chunk(start, size)
+
+    def _detail_bytes(self):
+        """
+        Serialized detail chunks in file order: sliced from the generated
+        schema, or generated on demand in streaming mode, ``processes``
+        chunks at a time on the worker pool when ``processes > 1``.
+        """
+        if not self.chunk_size:
+            for chunk in self._chunks():
+                yield self._chunk_bytes(chunk)
+            return
+        ctx = self._streaming_context()
+        shards = [
+            (index, start, size)
+            for index, (start, size) in enumerate(self._chunk_bounds())
+        ]
+        processes = min(self.processes, len(shards))
+        if processes <= 1:
+            for shard in shards:
+                yield self._shard_bytes(ctx, *shard)
+            return
+        with task_state((self, ctx)) as state, worker_pool(processes) as pool:
+            yield from bounded_imap(
+                pool, _shard_worker, [(state, shard) for shard in shards], processes
+            )
+
+    def _chunk_bytes(self, chunk):
+        """Serialized records of a chunk in file order."""
+        return self._records["detail"].to_bytes(chunk)
+
+    def _chunk_records(self, start, size):
+        """Records written for detail entries ``start`` to ``start + size``."""
+        return size
+
+    def _group_header_line(self, sequence_number, count):
+        header = dict(self.header_schema)
+        header["File Group Sequence Number"] = sequence_number
+        header["File Group Count"] = count
+        return self._records["header"].line(header)
+
+    def _trailer_line(self, record_count):
+        ctx = self._context()
+        ctx.record_count = record_count
+        return self._records["trailer"].line(self._one_line_values("trailer", ctx))
+
+    def _rows_for_bytes(self, ctx, max_bytes):
+        """
+        Records per file that keep files under ``max_bytes``, estimated from
+        a sample chunk drawn from a separate RNG stream, with a 5% margin.
+        """
+        ctx.rng = np.random.default_rng(
+            np.random.SeedSequence(self._seed.entropy, spawn_key=(2,))
+        )
+        size = min(self._entries_number, 1000)
+        sample = self._chunk_bytes(self._generate_chunk(ctx, 0, size))
+        record_bytes = 1.05 * len(sample) / max(self._chunk_records(0, size), 1)
+        overhead = len(self._group_header_line(10**6, 10**6)) + len(
+            self._trailer_line(10**12)
+        )
+        return max(int((max_bytes - overhead) / max(record_bytes, 1)), 1)
+
+    def _file_groups(self, max_rows, rows_per_chunk):
+        """
+        Pack whole chunks into files of at most ``max_rows`` records, a single
+        chunk (one claim with its lines) is never split.
+        :param rows_per_chunk: chunk size of the file group
+        :return: list of ``(shards, record_count)`` per file
+        """
+        files = [([], 0)]
+        for index, (start, size) in enumerate(self._chunk_bounds(rows_per_chunk)):
+            records = int(self._chunk_records(start, size))
+            shards, count = files[-1]
+            if shards and count + records > max_rows:
+                files.append(([], 0))
+                shards, count = files[-1]
+            shards.append((index, start, size))
+            files[-1] = (shards, count + records)
+        return files
+
+    def _write_group_file(
+        self, ctx, path, sequence_number, count, shards, records, offset
+    ):
+        """Write one file of a file group, returns its manifest entry."""
+        with open(path, "wb") as file:
+            file.write(self._group_header_line(sequence_number, count))
+            for shard in shards:
+                file.write(self._shard_bytes(ctx, *shard, record_offset=offset))
+            file.write(self._trailer_line(records))
+        return {
+            "file_name": Path(path).name,
+            "file_group_sequence_number": sequence_number,
+            "record_count": records,
+            "size": Path(path).stat().st_size,
+        }
+
+    def _generate_detail_schema(self):
+        self._compile_detail()
+        if not self.chunk_size:
+            ctx = self._context(total=self._entries_number)
+            self._store_chunk(self._generate_chunk(ctx, 0, self._entries_number))
+
+    def _generate_trailer_schema(self):
+        self.trailer_schema = self._one_line_schema("trailer", self.TRAILER)
+
+    def generate_all_schemas(self):
+        self._generate_header_schema()
+        self._generate_detail_schema()
+        self._generate_trailer_schema()
+        self._file_name = self.FILE_NAME.format(
+            timestamp=datetime.now().strftime("%Y%m%d%H%M%S"),
+            payer_id=self._payer_id,
+            header=self.header_schema,
+        )
+
+    @staticmethod
+    def _output_dir(filepath):
+        now = datetime.now()
+        filepath = (
+            filepath
+            if filepath
+            else Path(f"{Path.cwd()}/{now.year}/{now.month}/{now.day}")
+        )
+        Path(filepath).mkdir(exist_ok=True, parents=True)
+        return filepath
+
+    def schemas_to_file(self, filepath=None):
+        filepath = self._output_dir(filepath)
+
+        with open(f"{filepath}/{self._file_name}", "ab") as file:
+            file.write(self._records["header"].line(self.header_schema))
+            for block in self._detail_bytes():
+                file.write(block)
+            file.write(self._records["trailer"].line(self.trailer_schema))
+
+        return f"{filepath}/{self._file_name}"
+
+    def schemas_to_file_group(self, filepath=None, max_rows=None, max_bytes=None):
+        """
+        Split the load into a group of files sharing the header File Group ID,
+        each with its own header, trailer and Record Numbers. Detail records
+        are streamed; with ``processes > 1`` the files are written
+        concurrently, one worker per file.
+        :param max_rows: maximum detail records per file
+        :param max_bytes: maximum file size, converted into a record limit
+        :return: path of the JSON manifest listing the files
+        """
+        if not max_rows and not max_bytes:
+            raise InvalidGeneratorConfigError(
+                "file group needs max_rows or max_bytes",
+                details={"max_rows": max_rows, "max_bytes": max_bytes},
+            )
+        filepath = self._output_dir(filepath)
+        ctx = self._streaming_context()
+        if max_bytes:
+            by_size = self._rows_for_bytes(ctx, max_bytes)
+            max_rows = min(max_rows, by_size) if max_rows else by_size
+        # chunks no larger than a file and tiling it evenly
+        rows_per_chunk = max_rows // -(-max_rows // self.rows_per_chunk)
+        groups = self._file_groups(max_rows, rows_per_chunk)
+
+        name = Path(self._file_name)
+        width = len(str(len(groups)))
+        files, offset = [], 0
+        for sequence_number, (shards, records) in enumerate(groups, start=1):
+            path = f"{filepath}/{name.stem}_{sequence_number:0{width}}{name.suffix}"
+            files.append(
+                (path, sequence_number, len(groups), shards, records, offset)
+            )
+            offset += records
+        processes = min(self.processes, len(files))
+        if processes <= 1:
+            entries = [self._write_group_file(ctx, *file) for file in files]
+        else:
+            with task_state((self, ctx)) as state, worker_pool(processes) as pool:
+                tasks = [(state, file) for file in files]
+                entries = list(
+                    bounded_imap(pool, _group_file_worker, tasks, processes)
+                )
+
+        manifest = {
+            "file_group_id": self.header_schema["File Group ID"],
+            "file_group_count": len(groups),
+            "record_count": self.record_count,
+            "files": entries,
+        }
+        manifest_path = f"{filepath}/{name.stem}.manifest.json"
+        with open(manifest_path, "w") as file:
+            json.dump(manifest, file, indent=2)
+        return manifest_path
+
+
+def _shard_worker(task):
+    """:param task: (task_state of the generator and file context, shard)"""
+    state, shard = task
+    generator, ctx = run_state(state)
+    return generator._shard_bytes(ctx, *shard)
+
+
+def _group_file_worker(task):
+    state, file = task
+    generator, ctx = run_state(state)
+    return generator._write_group_file(ctx, *file)
+
+
+def file_group_archive(manifest_path, archive_format="zip"):
+    """
+    Archive the files of a file group together with their manifest.
+    :param manifest_path: path returned by ``RTFile.schemas_to_file_group``
+        or ``generate_edi.generate_batch``
+    :param archive_format: "zip" (deflated) or "tar" (uncompressed stream)
+    :return: path of the archive
+    """
+    if archive_format not in ("zip", "tar"):
+        raise InvalidGeneratorConfigError(
+            "unknown archive format",
+            details={"archive_format": archive_format, "supported": ["zip", "tar"]},
+        )
+    manifest_path = Path(manifest_path)
+    manifest = json.loads(manifest_path.read_text())
+    archive = manifest_path.with_name(
+        manifest_path.name.replace(".manifest.json", f".{archive_format}")
+    )
+    names = [manifest_path.name] + [entry["file_name"] for entry in manifest["files"]]
+    if archive_format == "tar":
+        with tarfile.open(archive, "w") as tf:
+            for name in names:
+                tf.add(manifest_path.parent / name, name)
+        return str(archive)
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        for name in names:
+            zf.write(manifest_path.parent / name, name)
+    return str(archive)
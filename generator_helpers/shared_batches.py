@@ -0,0 +1,104 @@
+"""
+Shared memory transport of the column batches of pool workers.
+
+A worker copies the batch it generated (a structured array, see
+``column_batch``) into a new ``multiprocessing.shared_memory`` segment and
+only returns the segment name, dtype and length. The parent maps the segment
+and its reader (csv rows, member dicts, ...) works on the worker's buffer
+directly: batches are never pickled, and never held twice in the parent.
+
+Segment names are chosen by the parent, one per task, so it can unlink every
+segment of a run whatever happens: a segment is unlinked as soon as it is
+mapped, and on failure or when the consumer stops early the tasks still in
+flight are waited for and their segments unlinked too.
+"""
+import uuid
+from collections import deque
+from itertools import islice
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+
+def share_batch(function, args, name):
+    """
+    Worker side: generate a batch into shared memory segment ``name``.
+    :param function: function of ``args`` returning a structured np.ndarray
+    :param args: tuple of arguments of ``function``
+    :param name: name of the segment, unique per task
+    :return: (name, dtype, length) of the shared batch
+    """
+    batch = function(*args)
+    segment = SharedMemory(name, create=True, size=max(batch.nbytes, 1))
+    try:
+        np.ndarray(batch.shape, batch.dtype, buffer=segment.buf)[:] = batch
+    except BaseException:
+        segment.unlink()
+        raise
+    finally:
+        segment.close()
+    # the parent owns the segment from now on, the worker must not track it
+    resource_tracker.unregister(segment._name, "shared_memory")
+    return name, batch.dtype, len(batch)
+
+
+def _unlink(name):
+    try:
+        segment = SharedMemory(name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def _read(read, name, dtype, length):
+    segment = SharedMemory(name)
+    # the mapping outlives the name, nothing is left behind whatever ``read`` does
+    segment.unlink()
+    try:
+        return read(np.ndarray(length, dtype, buffer=segment.buf))
+    finally:
+        try:
+            segment.close()
+        except BufferError:
+            # ``read`` failed holding a view, the mapping goes with the error
+            pass
+
+
+def shared_batches(pool, function, tasks, read, buffered_batches):
+    """
+    Run ``function(*task)`` for every task on the pool and read each batch
+    from shared memory, in task order. At most ``buffered_batches`` batches
+    are generated ahead of the consumer.
+    :param pool: multiprocessing pool
+    :param function: picklable function returning a structured np.ndarray
+    :param tasks: iterable of argument tuples of ``function``
+    :param read: function of a mapped batch, e.g. ``column_batch.batch_rows``;
+        it must not return views of the batch, which is unmapped afterwards
+    :param buffered_batches: tasks in flight
+    :return: generator of ``read(batch)``
+    """
+    prefix = f"cdg_{uuid.uuid4().hex[:16]}"
+    tasks = enumerate(tasks)
+    pending = deque()
+
+    def submit(index, args):
+        name = f"{prefix}_{index}"
+        pending.append((name, pool.apply_async(share_batch, (function, args, name))))
+
+    try:
+        for index, args in islice(tasks, buffered_batches):
+            submit(index, args)
+        while pending:
+            name, result = pending[0]
+            shared = result.get()
+            pending.popleft()
+            task = next(tasks, None)
+            if task is not None:
+                submit(*task)
+            yield _read(read, *shared)
+    finally:
+        for name, result in pending:
+            result.wait()
+            _unlink(name)
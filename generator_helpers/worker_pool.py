@@ -0,0 +1,146 @@
+"""
+Worker processes shared by the row generators (MemberRoster, VaccinedPatient).
+
+The API starts one pool in its lifespan and every generator call runs on it,
+so a request pays neither the start nor the imports of fresh workers, and
+no worker outlives the app. Outside the app (scripts, tests) no shared pool
+is running and ``worker_pool`` falls back to a pool of its own, stopped once
+the work is done.
+
+Workers are forked on Linux by default. With WORKER_START_METHOD=forkserver
+(the Docker image sets it for the API) they are started from a forkserver
+preloaded with the generator modules (``worker_preload``): a new worker is a
+fork of that warm template process, neither a fresh interpreter importing
+everything nor a fork of the threaded app process. Like with spawn, the
+workers then import the main module, so a script starting them must guard
+its entry point with ``if __name__ == "__main__"``.
+
+Pool workers outlive a run, so the settings of a run (a generator, the
+members of a batch) cannot go through a pool initializer: ``task_state``
+pickles them once to a temporary file, the tasks only carry its key and a
+worker reads the file on its first task of the run (``run_state``). A run
+keeps at most ``processes`` tasks in flight (``bounded_imap``) whatever the
+size of the pool it runs on.
+"""
+import pickle
+import tempfile
+import threading
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from itertools import islice
+from multiprocessing import get_all_start_methods, get_context
+
+from core.constants import WORKER_POOL_SIZE, WORKER_START_METHOD
+
+_pool = None
+_pool_lock = threading.Lock()
+_context = None
+# state of the run the worker last served, see ``run_state``
+_run_state = {}
+
+
+def worker_context():
+    """
+    Multiprocessing context of the generator workers, WORKER_START_METHOD if
+    the platform supports it.
+    """
+    global _context
+    if _context is None:
+        method = WORKER_START_METHOD
+        if method not in get_all_start_methods():
+            method = None
+        context = get_context(method)
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(["generator_helpers.worker_preload"])
+        _context = context
+    return _context
+
+
+def start_worker_pool(processes=WORKER_POOL_SIZE):
+    """
+    Start the shared pool, unless it is already running.
+    :param processes: worker processes
+    :return: the shared pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = worker_context().Pool(processes)
+        return _pool
+
+
+def shutdown_worker_pool():
+    """Let the shared pool finish its queued tasks, then stop its workers."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+
+@contextmanager
+def worker_pool(processes):
+    """
+    The shared pool when it is running, else a pool of ``processes`` workers
+    stopped on exit.
+    :param processes: worker processes of the fallback pool
+    """
+    if _pool is not None:
+        yield _pool
+        return
+    pool = worker_context().Pool(processes)
+    try:
+        yield pool
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+@contextmanager
+def task_state(state):
+    """
+    Settings shared by the tasks of a run, pickled once for all its workers.
+    :param state: picklable object
+    :return: run key to send with every task, see ``run_state``
+    """
+    with tempfile.NamedTemporaryFile(prefix="cdg_run_", suffix=".pickle") as file:
+        pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+        file.flush()
+        yield uuid.uuid4().hex, file.name
+
+
+def run_state(key):
+    """
+    Worker side: the state of ``task_state``, read on the first task of a
+    run only.
+    :param key: run key of ``task_state``
+    """
+    if _run_state.get("key") != key:
+        _run_state.clear()
+        with open(key[1], "rb") as file:
+            _run_state.update(key=key, state=pickle.load(file))
+    return _run_state["state"]
+
+
+def bounded_imap(pool, function, tasks, in_flight):
+    """
+    ``pool.imap`` submitting at most ``in_flight`` tasks ahead of the
+    consumer. Tasks still running when the consumer stops are waited for.
+    :param in_flight: tasks submitted at a time, the processes of the run
+    :return: generator of ``function(task)`` in task order
+    """
+    tasks = iter(tasks)
+    pending = deque(
+        pool.apply_async(function, (task,)) for task in islice(tasks, in_flight)
+    )
+    try:
+        while pending:
+            result = pending.popleft().get()
+            for task in islice(tasks, 1):
+                pending.append(pool.apply_async(function, (task,)))
+            yield result
+    finally:
+        for result in pending:
+            result.wait()
@@ -0,0 +1,14 @@
+"""
+Template of the generator workers, imported once by the forkserver they are
+forked from (see ``worker_pool.worker_context``): imports the generator
+modules and runs their ``preload`` function, so every worker starts with the
+modules imported and their locale data built.
+"""
+from importlib import import_module
+
+from core.constants import WORKER_PRELOAD_MODULES
+
+for _name in WORKER_PRELOAD_MODULES:
+    _preload = getattr(import_module(_name), "preload", None)
+    if _preload is not None:
+        _preload()
@@ -0,0 +1,72 @@
+"""Tests for vectorized RT column builders."""
+
+import re
+from datetime import datetime, timezone
+
+import numpy as np
+
+from generator_helpers import column_generator
+
+
+class TestColumnGenerator:
+    """Test column shapes and value domains."""
+
+    rng = np.random.default_rng(7)
+
+    def test_choice_stays_in_code_set(self):
+        """Should only draw values from the code set."""
+        codes = ["01", "18", "G8"]
+        column = column_generator.choice(codes, 500, self.rng)
+        assert set(column) <= {code.encode() for code in codes}
+
+    def test_dates_in_range(self):
+        """Should format dates as %Y%m%d within the year range."""
+        column = column_generator.dates(2000, 2010, 1000, self.rng)
+        assert all(re.fullmatch(rb"\d{8}", value) for value in column)
+        assert min(column) >= b"20000101"
+        assert max(column) <= b"20101231"
+
+    def test_timestamps_formatted_like_strftime(self):
+        """Should format UTC timestamps like datetime.strftime."""
+        seconds = self.rng.integers(-(2**31), 2**32, 2000)
+        for second, date_time, iso_date, compact_date in zip(
+            seconds,
+            column_generator.iso_datetimes(seconds),
+            column_generator.iso_dates(seconds),
+            column_generator.compact_dates(seconds),
+        ):
+            expected = datetime.fromtimestamp(int(second), timezone.utc)
+            assert date_time == expected.strftime("%Y-%m-%d %H:%M:%S").encode()
+            assert iso_date == expected.strftime("%Y-%m-%d").encode()
+            assert compact_date == expected.strftime("%Y%m%d").encode()
+
+    def test_integers_fixed_width(self):
+        """Should render integers in [low, high) as strings."""
+        column = column_generator.integers(111111111, 1000000000, 1000, self.rng)
+        values = column.astype(np.int64)
+        assert values.min() >= 111111111
+        assert values.max() < 1000000000
+
+    def test_bothify_mask(self):
+        """Should replace '#' with digits and '?' with letters."""
+        column = column_generator.bothify("??#-#", 200, self.rng)
+        assert all(re.fullmatch(rb"[A-Za-z]{2}\d-\d", value) for value in column)
+
+    def test_sample_calls_provider_once_per_pool_entry(self):
+        """Should not call the provider once per row."""
+        calls = []
+        column = column_generator.sample(
+            lambda: calls.append(1) or "x", 10000, self.rng, pool_size=16
+        )
+        assert len(column) == 10000
+        assert len(calls) == 16
+
+    def test_empty_columns(self):
+        """Should handle zero rows."""
+        assert len(column_generator.sample(str, 0, self.rng)) == 0
+
+    def test_provider_values_are_ascii(self):
+        """Should store provider values as ASCII bytes, dropping other chars."""
+        column = column_generator.sample(lambda: "Zoë", 3, self.rng)
+        assert column.dtype == np.dtype("S2")
+        assert list(column) == [b"Zo", b"Zo", b"Zo"]
@@ -0,0 +1,49 @@
+"""Tests for the EDI control number allocator."""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import get_context
+
+from generate_edi import EDI
+from generator_helpers.control_numbers import ControlNumberAllocator, ControlNumbers
+
+
+def _allocate(path):
+    allocator = ControlNumberAllocator(path, block_size=7)
+    return [allocator.next() for _ in range(50)]
+
+
+class TestControlNumbers:
+    """Test uniqueness of control numbers across threads and processes."""
+
+    def test_threads_and_processes(self, tmp_path):
+        """Should never hand out a number twice."""
+        path = tmp_path / "interchange"
+        allocator = ControlNumberAllocator(path, block_size=5)
+        with ThreadPoolExecutor(8) as pool:
+            numbers = list(pool.map(lambda _: allocator.next(), range(400)))
+        with get_context("spawn").Pool(3) as pool:
+            for batch in pool.map(_allocate, [path] * 6):
+                numbers.extend(batch)
+        assert len(numbers) == len(set(numbers)) == 700
+
+    def test_forked_child_gets_its_own_block(self, tmp_path):
+        """Should not reuse the parent's reserved block after a fork."""
+        allocator = ControlNumberAllocator(tmp_path / "group", block_size=100)
+        parent = allocator.next()
+        read, write = os.pipe()
+        pid = os.fork()
+        if not pid:
+            os.write(write, str(allocator.next()).encode())
+            os._exit(0)
+        os.waitpid(pid, 0)
+        child = int(os.read(read, 32))
+        assert child == parent + 100
+        assert allocator.next() == parent + 1
+
+    def test_documents_get_distinct_control_numbers(self, tmp_path):
+        """Should give every interchange its own ISA13 and file."""
+        counters = ControlNumbers(tmp_path, block_size=3)
+        documents = [EDI(control_numbers=counters) for _ in range(5)]
+        assert len({edi.control_number for edi in documents}) == 5
+        assert all(len(edi.control_number) == 9 for edi in documents)
@@ -0,0 +1,91 @@
+"""Tests for the EDI 837 builder."""
+
+import json
+import tarfile
+import types
+
+import pytest
+
+from core.exceptions import InvalidGeneratorConfigError
+from generate_edi import EDI, generate_batch
+from generate_raw_data import MemberRoster
+from generator_helpers.rt_schema import file_group_archive
+
+
+def _members(count=5):
+    roster = MemberRoster(processes_number=1)
+    return [roster.member_schema(number) for number in range(count)]
+
+
+def _segments(document):
+    return [segment.strip() for segment in document.split("~") if segment.strip()]
+
+
+class TestEDI:
+    """Test the envelope and control totals of generated interchanges."""
+
+    def test_streamed_control_totals(self, tmp_path):
+        """Should count the segments of every transaction set and the sets."""
+        edi = EDI()
+        stream = edi.segments(25, _members())
+        assert isinstance(stream, types.GeneratorType)
+        filename = edi.writeEDIDocument(stream, path=tmp_path)
+        segments = _segments(open(filename).read())
+
+        assert segments[0].startswith("ISA*") and segments[1].startswith("GS*")
+        starts = [i for i, segment in enumerate(segments) if segment[:3] == "ST*"]
+        assert len(starts) == 25
+        for start in starts:
+            end = next(
+                i for i in range(start, len(segments)) if segments[i][:3] == "SE*"
+            )
+            count, control = segments[end].split("*")[1:3]
+            assert int(count) == end - start + 1
+            assert control == segments[start].split("*")[2]
+        assert segments[-2].split("*")[1] == "25"
+        assert segments[-1] == f"IEA*1*{edi.control_number}"
+
+    def test_generate_returns_segments(self):
+        """Should keep returning the list of template outputs."""
+        edi = EDI()
+        document = edi.generate(2, _members(1))
+        # ISA, GS, then ST, BHT, provider, subscriber, claim and SE per set
+        assert len(document) == 2 + 2 * 6 + 2
+        assert document[-2].startswith("GE*2*")
+
+    def test_streamed_members(self):
+        """Should use the streamed members in order, one per claim."""
+        members = list(MemberRoster(processes_number=1).stream(5, batch_size=2))
+        assert len(members) == 5
+        document = "".join(EDI().segments(5, iter(members)))
+        subscribers = [
+            segment.split("*")[-1]
+            for segment in _segments(document)
+            if segment.startswith("NM1*IL*")
+        ]
+        assert subscribers == [str(member["banana ID"]) for member in members]
+        with pytest.raises(InvalidGeneratorConfigError):
+            list(EDI().segments(3, iter(members[:2])))
+
+    def test_batch(self, tmp_path):
+        """Should write one file per interchange with distinct control numbers."""
+        manifest_path = generate_batch(
+            6,
+            3,
+            _members(),
+            tmp_path / "batch",
+            processes=2,
+            control_directory=tmp_path / "counters",
+        )
+        manifest = json.load(open(manifest_path))
+        assert manifest["interchange_count"] == 6
+        assert manifest["transaction_set_count"] == 18
+        numbers = [entry["interchange_control_number"] for entry in manifest["files"]]
+        assert len(set(numbers)) == 6
+        for entry in manifest["files"]:
+            document = (tmp_path / "batch" / entry["file_name"]).read_text()
+            assert entry["size"] == len(document)
+            control_number = entry["interchange_control_number"]
+            assert _segments(document)[-1] == f"IEA*1*{control_number}"
+        with tarfile.open(file_group_archive(manifest_path, "tar")) as archive:
+            assert len(archive.getnames()) == 7
@@ -0,0 +1,41 @@
+"""Tests for the compiled EDI segment templates."""
+
+import os
+from pathlib import Path
+from string import Template
+
+from generator_helpers.edi_templates import SegmentTemplates, compile_template
+
+TEMPLATES = Path(__file__).parent.parent / "templates/edi"
+
+
+class TestSegmentTemplates:
+    """Test template compilation and cache invalidation."""
+
+    def test_same_output_as_string_template(self):
+        """Should render every EDI template like string.Template."""
+        values = {
+            match.group("named") or match.group("braced"): "<value>"
+            for template in TEMPLATES.glob("*.txt")
+            for match in Template.pattern.finditer(template.read_text())
+        }
+        values["service_price"] = 12.3456789
+        templates = SegmentTemplates(TEMPLATES)
+        for template in TEMPLATES.glob("*.txt"):
+            assert templates.render(template.name, values) == Template(
+                template.read_text()
+            ).substitute(values)
+        assert compile_template("{a}$$b*${c}") == "{{a}}$b*{c}"
+
+    def test_changed_template_is_reloaded(self, tmp_path):
+        """Should recompile a template modified on disk on refresh."""
+        template = tmp_path / "ST.txt"
+        template.write_text("ST*837*$segment_number~")
+        templates = SegmentTemplates(tmp_path)
+        assert templates.render("ST.txt", {"segment_number": 1}) == "ST*837*1~"
+        template.write_text("ST*999*$segment_number~")
+        mtime = template.stat().st_mtime_ns + 10**9
+        os.utime(template, ns=(mtime, mtime))
+        assert templates.render("ST.txt", {"segment_number": 1}) == "ST*837*1~"
+        templates.refresh()
+        assert templates.render("ST.txt", {"segment_number": 2}) == "ST*999*2~"
@@ -0,0 +1,74 @@
+"""Tests for the benefit entities shared between RT files."""
+
+from generate_rt_individual_usage_benefit_data import RTIndividualUsageBenefitData
+from generate_rt_standart_benefit_entity_data import (
+    ENTITY,
+    RTStandardBenefitEntityData,
+    entity_catalog,
+)
+from generator_helpers.entity_catalog import EntityCatalog
+
+
+def _records(generator, directory):
+    generator.generate_all_schemas()
+    lines = open(generator.schemas_to_file(directory)).read().splitlines()
+    names = [field.name for field in type(generator).DETAIL.fields]
+    return [dict(zip(names, line.split("|"))) for line in lines[1:-1]]
+
+
+class TestEntityCatalog:
+    """Test the catalog and the files referencing it."""
+
+    def test_saved_catalog(self, tmp_path):
+        """Should generate unique entity IDs and load them memory-mapped."""
+        catalog = entity_catalog(300, seed=1)
+        assert list(catalog.columns) == [field.name for field in ENTITY.fields]
+        assert len(set(catalog.columns["Benefit Entity ID"])) == 300
+        loaded = EntityCatalog.load(catalog.save(tmp_path / "entities.npy"))
+        assert len(loaded) == 300
+        assert (loaded.rows == catalog.rows).all()
+        assert entity_catalog(300, seed=1).rows.tobytes() == catalog.rows.tobytes()
+
+    def test_usage_resolves_entities(self, tmp_path):
+        """Should only reference entities listed in the standard entity file."""
+        catalog = EntityCatalog.load(
+            entity_catalog(25, seed=2).save(tmp_path / "entities.npy")
+        )
+        entities = _records(
+            RTStandardBenefitEntityData(
+                25, "F", False, chunk_size=10, seed=2, entity_catalog=catalog
+            ),
+            tmp_path / "standard",
+        )
+        generator = RTIndividualUsageBenefitData(
+            200, "F", True, chunk_size=60, seed=4, entity_catalog=catalog
+        )
+        usage = _records(generator, tmp_path / "usage")
+        # a code with every entity field filled
+        assert generator.header_schema["File Validation Code"] == "2"
+        npis = [
+            entity["Benefit Entity National Provider Identification"]
+            for entity in entities
+        ]
+        entity_ids = catalog.columns["Benefit Entity ID"]
+        assert npis == [value.decode() for value in entity_ids]
+        rows = {value: index for index, value in enumerate(npis)}
+        for record in usage:
+            entity = catalog.rows[rows[record["Benefit Entity ID"]]]
+            assert record["Benefit Entity ID Qualifier"] == "XX"
+            for field in ENTITY.fields[2:]:
+                assert record[field.name] == entity[field.name].decode()
+
+    def test_usage_keeps_entity_rules(self, tmp_path):
+        """Should blank the entity fields the layout leaves out, but the ID."""
+        catalog = entity_catalog(25, seed=2)
+        generator = RTIndividualUsageBenefitData(
+            50, "F", False, chunk_size=20, seed=0, entity_catalog=catalog
+        )
+        usage = _records(generator, tmp_path)
+        assert generator.header_schema["File Validation Code"] == "0"
+        entity_ids = {value.decode() for value in catalog.columns["Benefit Entity ID"]}
+        for record in usage:
+            assert record["Benefit Entity ID"] in entity_ids
+            for field in ENTITY.fields[1:]:
+                assert record[field.name] == ""
@@ -0,0 +1,54 @@
+"""Tests for bulk RT identifiers."""
+
+import re
+
+import numpy as np
+import pytest
+
+from core.exceptions import InvalidGeneratorConfigError
+from generator_helpers import column_generator, id_generator
+
+
+class TestIdGenerator:
+    """Test ID columns and the uniqueness guarantee."""
+
+    rng = np.random.default_rng(11)
+
+    def test_ids_are_fixed_length_byte_strings(self):
+        """Should return S{length} alphanumeric IDs."""
+        ids = id_generator.ids(1000, 10, self.rng)
+        assert ids.dtype == np.dtype("S10")
+        assert all(re.fullmatch(rb"[A-Za-z0-9]{10}", value) for value in ids)
+
+    def test_digit_alphabet(self):
+        """Should only use the given alphabet."""
+        ids = id_generator.ids(200, 6, self.rng, alphabet=id_generator.DIGITS)
+        assert all(value.isdigit() for value in ids)
+        column = column_generator.digits(200, 6, self.rng)
+        assert column.dtype == np.dtype("S6")
+        assert all(value.isdigit() for value in column)
+
+    def test_empty_columns(self):
+        """Should handle zero rows."""
+        assert len(id_generator.ids(0, 10, self.rng)) == 0
+        assert len(column_generator.digits(0, 10, self.rng)) == 0
+
+    def test_unique_ids_across_chunks(self):
+        """Should not repeat IDs between chunks sharing a key."""
+        key = id_generator.UniqueKey(10, self.rng)
+        chunks = [
+            id_generator.unique_ids(5000, 10, self.rng, start=start, key=key)
+            for start in range(0, 20000, 5000)
+        ]
+        ids = np.concatenate(chunks)
+        assert len(np.unique(ids)) == 20000
+
+    def test_unique_short_ids_fill_capacity(self):
+        """Should use every short ID exactly once."""
+        ids = id_generator.unique_ids(100, 2, self.rng, alphabet=id_generator.DIGITS)
+        assert sorted(ids) == [f"{number:02}".encode() for number in range(100)]
+
+    def test_unique_ids_capacity(self):
+        """Should refuse to generate more IDs than the key can encode."""
+        with pytest.raises(InvalidGeneratorConfigError):
+            id_generator.unique_ids(11, 1, self.rng, alphabet=id_generator.DIGITS)
@@ -0,0 +1,66 @@
+"""Tests for delta loads against a member index."""
+
+import numpy as np
+
+from generate_rt_eligibility_data import (
+    RTEligibbility,
+    RTEligibilityDelta,
+    member_index,
+)
+from generator_helpers import id_generator
+from generator_helpers.member_index import ADD, DELETE, UPDATE, MemberIndex
+
+
+class TestMemberIndex:
+    """Test member selection and the index of generated files."""
+
+    rng = np.random.default_rng(5)
+
+    def test_delta_members(self):
+        """Should update and delete existing members and add new ones."""
+        index = MemberIndex(id_generator.unique_ids(1000, 10, self.rng))
+        ids, actions = index.delta(0.2, self.rng)
+        assert len(ids) == 200
+        assert len(set(ids)) == 200
+        existing = np.isin(ids, index.subscriber_ids)
+        assert existing[actions != ADD].all()
+        assert not existing[actions == ADD].any()
+        assert (actions == UPDATE).sum() == 140
+        assert (actions == DELETE).sum() == 30
+
+    def test_applied_delta(self):
+        """Should drop deleted members and append added ones."""
+        index = MemberIndex(id_generator.unique_ids(500, 10, self.rng))
+        ids, actions = index.delta(0.1, self.rng)
+        updated = index.applied(ids, actions)
+        assert len(updated) == 500 - (actions == DELETE).sum() + (actions == ADD).sum()
+        assert not np.isin(ids[actions == DELETE], updated.subscriber_ids).any()
+
+    def test_index_of_file(self, tmp_path):
+        """Should read subscriber IDs from a file and round trip them."""
+        generator = RTEligibbility(50, "F", True, chunk_size=20, seed=1)
+        generator.generate_all_schemas()
+        filename = generator.schemas_to_file(tmp_path)
+        index = member_index(filename)
+        position = [field.name for field in RTEligibbility.DETAIL.fields].index(
+            "Primary Subscriber ID"
+        )
+        lines = open(filename).read().splitlines()[1:-1]
+        assert [value.decode() for value in index.subscriber_ids] == [
+            line.split("|")[position] for line in lines
+        ]
+        saved = member_index(index.save(tmp_path / "members.npy"))
+        assert list(saved.subscriber_ids) == list(index.subscriber_ids)
+
+    def test_delta_file(self, tmp_path):
+        """Should write only the changed members with their actions."""
+        index = MemberIndex(id_generator.unique_ids(400, 10, self.rng))
+        generator = RTEligibilityDelta(index, 0.05, chunk_size=7, seed=2)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        records = [line.split("|") for line in lines[1:-1]]
+        assert lines[-1] == "TRLR|20|"
+        assert [record[3].encode() for record in records] == list(generator.actions)
+        assert [record[6].encode() for record in records] == list(
+            generator.subscriber_ids
+        )
@@ -0,0 +1,57 @@
+"""Tests for the member roster generator."""
+
+import csv
+
+from generate_raw_data import (
+    MEMBER_BATCH_SIZE,
+    MEMBER_FIELDS,
+    MemberRoster,
+    VaccinedPatient,
+    batch_sizes,
+)
+from generator_helpers.column_batch import batch_dicts, pack_columns
+
+
+class TestMemberRoster:
+    """Test the column batches of the member roster."""
+
+    def test_column_batch_round_trip(self):
+        """Should give back the packed values, text decoded and ints kept."""
+        columns = {"name": ["Zoë", "Al"], "id": [1234567, 7654321]}
+        batch = pack_columns(columns)
+        assert batch.dtype["name"].kind == "S" and batch.dtype["id"].kind == "i"
+        assert batch_dicts(batch) == [
+            {"name": "Zoë", "id": 1234567},
+            {"name": "Al", "id": 7654321},
+        ]
+
+    def test_generate_in_batches(self):
+        """Should generate every member, with the fields of the csv files."""
+        roster = MemberRoster(processes_number=2)
+        assert batch_sizes(5, MEMBER_BATCH_SIZE, 2) == [3, 2]
+        members = roster.generate(5)
+        assert len(members) == 5
+        assert all(tuple(member) == MEMBER_FIELDS for member in members)
+        assert all(isinstance(member["banana ID"], int) for member in members)
+        # every worker builds its own providers, never replaying another's
+        assert len({member["identity_id"] for member in members}) == 5
+        assert len({member["email"] for member in members}) == 5
+
+    def test_write_csv(self, tmp_path):
+        """Should write the header and a row per member."""
+        filename = tmp_path / "members.csv"
+        MemberRoster(processes_number=2).write_csv(filename, 7)
+        rows = list(csv.DictReader(open(filename)))
+        assert len(rows) == 7
+        assert tuple(rows[0]) == MEMBER_FIELDS
+        assert rows[0]["Plan"] == "MIGR-10010"
+
+    def test_vaccined_patients_csv(self, tmp_path):
+        """Should write a row per patient under the patient header."""
+        filename = VaccinedPatient(5, processes_number=2).csv(f"{tmp_path}/")
+        rows = list(csv.DictReader(open(filename)))
+        assert len(rows) == 5
+        assert all(
+            row["Full Name"] == f"{row['First Name']} {row['Last Name']}"
+            for row in rows
+        )
@@ -0,0 +1,58 @@
+"""Tests for the cached master lists."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from generate_vaccine_data import (
+    INSURANCE_MASTER_LIST,
+    LOCATION_MASTER_LIST,
+    Encounters,
+)
+from generator_helpers.reference_data import master_list
+
+
+class TestMasterList:
+    """Test the master list cache and its lookups."""
+
+    def test_cached_until_modified(self, tmp_path):
+        """Should read the file once, and again once it is modified."""
+        path = tmp_path / "locations.csv"
+        path.write_text("Organization ID,Location Name\n2,Park\n5,Dock\n")
+        locations = master_list(path)
+        assert master_list(path) is locations
+        assert len(locations) == 2
+        with pytest.raises(ValueError):
+            locations.columns["Location Name"][0] = b"Pier"
+
+        path.write_text("Organization ID,Location Name\n2,Pier\n")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert master_list(path) is not locations
+        assert master_list(path).columns["Location Name"].tolist() == [b"Pier", b""]
+
+    def test_rows_by_key(self, tmp_path):
+        """Should give the row of listed keys and the empty row otherwise."""
+        path = tmp_path / "locations.csv"
+        path.write_text("Organization ID,Location Name,Zip\n2,Park,01054\n5,Dock,\n")
+        locations = master_list(path)
+        rows = locations.rows("Organization ID", np.array([5, 2, 3, 0, 99]))
+        assert rows.tolist() == [1, 0, 2, 2, 2]
+        assert locations.columns["Zip"][rows].tolist() == [b"", b"01054"] + [b""] * 3
+        assert locations.numbers("Zip", np.array([0, 0])).tolist() == [1054, 1054]
+        assert np.isnan(locations.numbers("Zip", rows)[0])
+
+    def test_encounters_join(self):
+        """Should join encounters with the databus master lists."""
+        entries = Encounters(200).generate_entries()
+        insurance = pd.read_csv(INSURANCE_MASTER_LIST)
+        locations = pd.read_csv(LOCATION_MASTER_LIST)
+        insured = entries[~entries["no_insurance"]]
+        assert len(insured) == 20 and (insured["memberID"] != "").all()
+        assert set(insured["insurance_name"]) <= set(insurance["insurance_name"])
+        assert entries.loc[entries["no_insurance"], "insurance_name"].isna().all()
+        joined = entries.merge(locations, on=["locationAddress", "locationCity"])
+        assert len(joined) == 200
+        assert (joined["locationZipCode_x"] == joined["locationZipCode_y"]).all()
@@ -0,0 +1,55 @@
+"""Tests for the memory-mapped RT reader and validator."""
+
+from generate_rt_claim_data import PoissonLines, RTClaimData
+from generate_rt_eligibility_data import RTEligibbility
+from generator_helpers.rt_reader import RTFileReader
+
+
+def _write(generator, directory):
+    generator.generate_all_schemas()
+    return generator.schemas_to_file(directory)
+
+
+class TestRTFileReader:
+    """Test validation and random record access."""
+
+    def test_valid_files(self, tmp_path):
+        """Should accept generated eligibility and claim files."""
+        for generator in [
+            RTEligibbility(300, "F", True, chunk_size=70, seed=1),
+            RTClaimData(
+                "F", True, 40, 3, chunk_size=50, seed=1, line_counts=PoissonLines(3)
+            ),
+        ]:
+            filename = _write(generator, tmp_path)
+            with RTFileReader(filename, type(generator), block_size=4096) as reader:
+                summary = reader.validate()
+            assert summary["valid"], summary["issues"]
+            assert summary["records"] == generator.record_count
+
+    def test_detects_broken_files(self, tmp_path):
+        """Should report extra fields, gaps in Record Numbers and bad totals."""
+        filename = _write(RTEligibbility(30, "F", False, seed=2), tmp_path)
+        lines = open(filename).read().splitlines()
+        lines[5] = lines[5] + "extra|"
+        del lines[10]
+        lines[-1] = "TRLR|30|"
+        open(filename, "w").write("\n".join(lines) + "\n")
+
+        with RTFileReader(filename, RTEligibbility, block_size=1024) as reader:
+            issues = list(reader.issues())
+        messages = {issue.line: issue.message for issue in issues}
+        assert messages[6] == "DTL record has 109 fields"
+        assert messages[11] == "Record Number 12 out of sequence"
+        assert "trailer count" in issues[-1].message
+
+    def test_record_offsets(self, tmp_path):
+        """Should fetch any record through the offset index."""
+        filename = _write(RTEligibbility(200, "F", True, chunk_size=64), tmp_path)
+        lines = open(filename).read().splitlines()
+        with RTFileReader(filename, block_size=2048) as reader:
+            offsets = reader.record_offsets()
+            assert len(offsets) == 200
+            for number in (2, 77, 201):
+                record = reader.record(number, offsets)
+                assert b"|".join(record) + b"|" == lines[number - 1].encode()
@@ -0,0 +1,287 @@
+"""Tests for the declarative RT record specs."""
+
+import json
+
+import numpy as np
+
+from generate_rt_claim_data import PoissonLines, RTClaimData, claim_status_weights
+from generate_rt_eligibility_data import RTEligibbility
+from generate_rt_plan_benefit_data import RTPlanBenefitData
+from generator_helpers import rt_schema
+from generator_helpers.rt_schema import (
+    OPTIONAL,
+    Branch,
+    Choice,
+    Constant,
+    Copy,
+    Field,
+    Mapped,
+    Matches,
+    RecordNumber,
+    RecordSpec,
+    SchemaContext,
+    validation_code,
+)
+
+
+def _context(optional_fields=True, header=None):
+    return SchemaContext(
+        rng=np.random.default_rng(3),
+        fakers={},
+        optional_fields=optional_fields,
+        load_type="F",
+        payer_id="PAYER",
+        header=header,
+    )
+
+
+class TestRecordSpec:
+    """Test rule resolution and column generation."""
+
+    def test_optional_fields_rule(self):
+        """Should blank optional fields when they are disabled."""
+        spec = RecordSpec(Field("Name", Constant("x"), when=OPTIONAL, otherwise="N"))
+        ctx = _context(optional_fields=False)
+        columns = spec.compile(ctx).generate(ctx.batch(3))
+        assert list(columns["Name"]) == [b"N", b"N", b"N"]
+
+    def test_validation_code_branch(self):
+        """Should fall through nested branches on the header validation code."""
+        spec = RecordSpec(
+            Field(
+                "Code",
+                Constant("CO"),
+                when=OPTIONAL,
+                otherwise=Branch(Constant("FT"), when=validation_code(1, 2)),
+            )
+        )
+        for code, expected in [("2", b"FT"), ("3", b"")]:
+            ctx = _context(optional_fields=False, header={"File Validation Code": code})
+            columns = spec.compile(ctx).generate(ctx.batch(2))
+            assert list(columns["Code"]) == [expected, expected]
+
+    def test_row_level_rule_and_dependencies(self):
+        """Should resolve row rules and dependent columns row by row."""
+        spec = RecordSpec(
+            Field("Qualifier", Choice(["GR", "NI"])),
+            Field("Code", Mapped("Qualifier", {"GR": "G", "NI": "N"})),
+            Field("Only GR", Copy("Code"), when=Matches("Qualifier", "GR")),
+            Field("Record Number", RecordNumber()),
+        )
+        ctx = _context()
+        columns = spec.compile(ctx).generate(ctx.batch(100, start=10))
+        assert all(
+            code == qualifier[:1]
+            for qualifier, code in zip(columns["Qualifier"], columns["Code"])
+        )
+        assert all(
+            only == (code if code == b"G" else b"")
+            for code, only in zip(columns["Code"], columns["Only GR"])
+        )
+        assert list(columns["Record Number"][:2]) == [12, 13]
+
+    def test_serialized_row_format(self):
+        """Should keep the pipe delimited layout with a trailing separator."""
+        spec = RecordSpec(Field("A", Constant("1")), Field("B", Constant("")))
+        ctx = _context()
+        compiled = spec.compile(ctx)
+        assert compiled.to_bytes(compiled.generate(ctx.batch(2))) == b"1||\n1||\n"
+
+
+class TestRTFiles:
+    """Test generators declared with record specs."""
+
+    def test_eligibility_file(self, tmp_path):
+        """Should write header, detail records and trailer."""
+        generator = RTEligibbility(20, "F", True)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        assert len(lines) == 22
+        assert lines[0].startswith("HDR|")
+        assert lines[-1] == "TRLR|20|"
+        assert [line.split("|")[1] for line in lines[1:-1]] == [
+            str(number) for number in range(2, 22)
+        ]
+
+    def test_claim_file_record_order(self, tmp_path):
+        """Should interleave claims, claim lines and their status records."""
+        generator = RTClaimData("F", True, 3, 2)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        records = [line.split("|") for line in lines[1:-1]]
+        assert [record[0] for record in records[:6]] == [
+            "CLM", "STC", "DTL", "STC", "DTL", "STC"
+        ]
+        assert [int(record[1]) for record in records] == list(range(2, 20))
+        claim_id = list(generator.detail_schema).index(
+            "Payer Claim Identification Number"
+        )
+        assert records[2][3] == records[0][claim_id]
+        assert records[3][4] == records[2][4]
+        assert lines[-1] == "TRLR|18|CR|"
+
+    def test_streaming_matches_record_layout(self, tmp_path):
+        """Should keep Record Number and trailer counts across chunks."""
+        generator = RTEligibbility(23, "F", True, chunk_size=5)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        assert generator.detail_schema == {}
+        assert [int(line.split("|")[1]) for line in lines[1:-1]] == list(
+            range(2, 25)
+        )
+        assert lines[-1] == "TRLR|23|"
+        plan_name = [field.name for field in RTEligibbility.DETAIL.fields].index(
+            "Member Plan Name"
+        )
+        assert [line.split("|")[plan_name] for line in lines[1:-1]] == [
+            f"Plan {row}" for row in range(23)
+        ]
+
+    def test_streaming_claims(self, tmp_path):
+        """Should not split a claim from its lines across chunks."""
+        generator = RTClaimData("F", False, 7, 3, chunk_size=20)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        records = [line.split("|") for line in lines[1:-1]]
+        assert [int(record[1]) for record in records] == list(range(2, 58))
+        assert [record[0] for record in records[:10:8]] == ["CLM", "CLM"]
+        assert lines[-1] == "TRLR|56|CR|"
+
+    def test_ragged_claim_lines(self, tmp_path):
+        """Should number and link claims with different numbers of lines."""
+        generator = RTClaimData(
+            "F", False, 40, 3, chunk_size=25, line_counts=PoissonLines(3, minimum=0)
+        )
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        records = [line.split("|") for line in lines[1:-1]]
+        assert len(set(np.diff(generator.line_offsets))) > 1
+        assert [int(record[1]) for record in records] == list(
+            range(2, 2 + generator.record_count)
+        )
+        assert lines[-1] == f"TRLR|{generator.record_count}|CR|"
+        claim_id = [field.name for field in RTClaimData.CLAIM.fields].index(
+            "Payer Claim Identification Number"
+        )
+        claim_lines = {}
+        for record in records:
+            if record[0] == "CLM":
+                current = record[claim_id]
+                claim_lines[current] = 0
+            elif record[0] == "DTL":
+                assert record[3] == current
+                claim_lines[current] += 1
+        assert list(claim_lines.values()) == list(np.diff(generator.line_offsets))
+
+    def test_weighted_status_codes(self, tmp_path):
+        """Should draw status codes of the weight table in its proportions."""
+        weights = claim_status_weights()
+        generator = RTClaimData(
+            "F", False, 3000, 2, chunk_size=2000, seed=6, status_weights=weights
+        )
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        names = [field.name for field in RTClaimData.STATUS.fields]
+        statuses = [
+            dict(zip(names, line.split("|"))) for line in lines if line[:4] == "STC|"
+        ]
+        assert len(statuses) == 9000
+        codes, values = weights["Claim Status Category Code"]
+        drawn = [status["Claim Status Category Code"] for status in statuses]
+        assert set(drawn) <= set(codes)
+        paid = drawn.count("F1") / len(drawn)
+        assert abs(paid - values[codes.index("F1")] / sum(values)) < 0.03
+        assert all(status["Line Item Control Number"] for status in statuses[1:3])
+        assert not statuses[0]["Line Item Control Number"]
+
+    def test_sharded_generation_is_deterministic(self, tmp_path):
+        """Should write the same records whatever the number of processes."""
+        for generator_class, arguments in [
+            (RTEligibbility, (45, "F", True)),
+            (RTClaimData, ("F", True, 30, 2)),
+        ]:
+            details = []
+            for processes in [1, 3]:
+                generator = generator_class(
+                    *arguments, chunk_size=10, seed=7, processes=processes
+                )
+                generator.generate_all_schemas()
+                directory = tmp_path / f"{generator_class.__name__}{processes}"
+                lines = open(generator.schemas_to_file(directory)).read()
+                details.append(lines.splitlines()[1:])
+            assert details[0] == details[1]
+            assert [int(line.split("|")[1]) for line in details[0][:-1]] == list(
+                range(2, 2 + generator.record_count)
+            )
+
+    def test_single_shard_stays_serial(self, tmp_path, monkeypatch):
+        """Should not start workers for a load of a single chunk."""
+
+        def no_pool(*args, **kwargs):
+            raise AssertionError("worker pool started")
+
+        monkeypatch.setattr(rt_schema, "worker_pool", no_pool)
+        generator = RTEligibbility(10, "F", True, chunk_size=10, seed=7, processes=4)
+        generator.generate_all_schemas()
+        lines = open(generator.schemas_to_file(tmp_path)).read().splitlines()
+        assert len(lines) == 12
+
+    def test_file_group(self, tmp_path):
+        """Should split a load into numbered files with their own trailers."""
+        generator = RTEligibbility(95, "F", False, chunk_size=30, seed=5)
+        generator.generate_all_schemas()
+        manifest = json.load(open(generator.schemas_to_file_group(tmp_path, 40)))
+        assert manifest["file_group_count"] == 3
+        assert [entry["record_count"] for entry in manifest["files"]] == [40, 40, 15]
+        for entry in manifest["files"]:
+            lines = (tmp_path / entry["file_name"]).read_text().splitlines()
+            header = lines[0].split("|")
+            assert header[1] == manifest["file_group_id"]
+            assert header[2:4] == [str(entry["file_group_sequence_number"]), "3"]
+            assert [int(line.split("|")[1]) for line in lines[1:-1]] == list(
+                range(2, entry["record_count"] + 2)
+            )
+            assert lines[-1] == f"TRLR|{entry['record_count']}|"
+
+    def test_file_group_keeps_chunks(self, tmp_path):
+        """Should leave the chunks of the single file as they were."""
+        materialized = RTEligibbility(95, "F", False, seed=5)
+        materialized.generate_all_schemas()
+        single = open(materialized.schemas_to_file(tmp_path / "single")).read()
+        materialized.schemas_to_file_group(tmp_path / "group", 40)
+        assert materialized.chunk_size is None
+        assert open(materialized.schemas_to_file(tmp_path / "again")).read() == single
+
+        streamed = RTEligibbility(95, "F", False, chunk_size=30, seed=5)
+        streamed.generate_all_schemas()
+        bounds = list(streamed._chunk_bounds())
+        streamed.schemas_to_file_group(tmp_path / "streamed", 40)
+        assert streamed.chunk_size == 30
+        assert list(streamed._chunk_bounds()) == bounds
+
+    def test_plan_catalog(self, tmp_path):
+        """Should assign members to a fixed number of distinct plans."""
+        names = [field.name for field in RTPlanBenefitData.DETAIL.fields]
+        member_fields = [names.index(name) for name in RTPlanBenefitData.MEMBER_FIELDS]
+        for chunk_size in [None, 7]:
+            generator = RTPlanBenefitData(
+                60, "F", True, chunk_size=chunk_size, seed=4, plan_count=5
+            )
+            generator.generate_all_schemas()
+            directory = tmp_path / str(chunk_size)
+            lines = open(generator.schemas_to_file(directory)).read().splitlines()
+            records = [line.split("|")[:-1] for line in lines[1:-1]]
+            assert all(len(record) == len(names) for record in records)
+            assert [int(record[1]) for record in records] == list(range(2, 62))
+            plans = {
+                tuple(
+                    value
+                    for position, value in enumerate(record)
+                    if position not in member_fields
+                )
+                for record in records
+            }
+            assert len(plans) == 5
+            assert lines[-1] == "TRLR|60|CR|"
+        chunk = generator._generate_chunk(generator._streaming_context(), 0, 3)
+        assert list(generator.catalog.expand(chunk)) == names
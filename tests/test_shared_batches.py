@@ -0,0 +1,69 @@
+"""Tests for the shared memory transport of column batches."""
+
+import os
+from multiprocessing import Pool
+
+import pytest
+
+from generator_helpers.column_batch import batch_rows, pack_columns
+from generator_helpers.shared_batches import shared_batches
+
+
+def _batch(start, size):
+    if start < 0:
+        raise ValueError("negative start")
+    numbers = list(range(start, start + size))
+    return pack_columns({"number": numbers, "text": [f"n{n}" for n in numbers]})
+
+
+def _segments():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("cdg_")}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with Pool(2) as pool:
+        yield pool
+
+
+class TestSharedBatches:
+    """Test batch order and segment cleanup."""
+
+    def test_batches_in_task_order(self, pool):
+        """Should read every batch in order and unlink its segment."""
+        before = _segments()
+        tasks = [(start, 3) for start in range(0, 30, 3)]
+        rows = [
+            row
+            for batch in shared_batches(pool, _batch, tasks, batch_rows, 2)
+            for row in batch
+        ]
+        assert rows == [(n, f"n{n}") for n in range(30)]
+        assert _segments() == before
+
+    def test_cleanup_on_failure(self, pool):
+        """Should unlink the segments in flight when a task fails."""
+        before = _segments()
+        tasks = [(0, 5), (-1, 5), (5, 5), (10, 5)]
+        with pytest.raises(ValueError):
+            list(shared_batches(pool, _batch, tasks, batch_rows, 4))
+        assert _segments() == before
+
+    def test_cleanup_when_stopped_early(self, pool):
+        """Should unlink the buffered segments when the consumer stops."""
+        before = _segments()
+        batches = shared_batches(pool, _batch, [(0, 5)] * 10, batch_rows, 4)
+        assert next(batches) == [(n, f"n{n}") for n in range(5)]
+        batches.close()
+        assert _segments() == before
+
+    def test_cleanup_when_reader_fails(self, pool):
+        """Should unlink the segment of a batch whose reader failed."""
+        before = _segments()
+
+        def read(batch):
+            raise KeyError(batch.dtype.names[0])
+
+        with pytest.raises(KeyError):
+            list(shared_batches(pool, _batch, [(0, 5)] * 3, read, 3))
+        assert _segments() == before
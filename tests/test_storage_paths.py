@@ -0,0 +1,91 @@
+"""Tests for the files an RT request reuses from an earlier day."""
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+def _on_day(monkeypatch, day):
+    class Day(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2021, 5, day, 12)
+
+    monkeypatch.setattr(app, "datetime", Day)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "DATA_DIR", str(tmp_path))
+    return TestClient(app.app)
+
+
+class TestStoragePaths:
+    """Test the lookup of earlier files under the storage root."""
+
+    def test_delta_on_the_next_day(self, client, tmp_path, monkeypatch):
+        """Should find the previous load and index written on earlier days."""
+        _on_day(monkeypatch, 14)
+        full = client.post("/rt_eligibility/", json={"members_count": 20, "seed": 1})
+        assert full.status_code == 200
+        base_file = full.headers["X-Stored-File"]
+        assert base_file.startswith("2021/5/14/")
+
+        _on_day(monkeypatch, 15)
+        delta = client.post(
+            "/rt_eligibility_delta/",
+            json={"base_file": base_file, "churn_rate": 0.5, "seed": 2},
+        )
+        assert delta.status_code == 200
+        member_index = delta.headers["X-Member-Index"]
+        assert member_index.startswith("2021/5/15/")
+        assert (tmp_path / member_index).exists()
+
+        _on_day(monkeypatch, 16)
+        next_delta = client.post(
+            "/rt_eligibility_delta/", json={"base_file": member_index, "seed": 3}
+        )
+        assert next_delta.status_code == 200
+
+    def test_usage_on_the_next_day(self, client, monkeypatch):
+        """Should resolve usage files against a catalog of an earlier day."""
+        _on_day(monkeypatch, 14)
+        standard = client.post(
+            "/rt_standard_benefit_entity_data/",
+            json={
+                "members_count": 10,
+                "load_type": "F",
+                "optional_fields": False,
+                "seed": 1,
+            },
+        )
+        assert standard.status_code == 200
+        catalog = standard.headers["X-Entity-Catalog"]
+        assert catalog.startswith("2021/5/14/")
+
+        _on_day(monkeypatch, 15)
+        request = {"members_count": 5, "load_type": "F", "optional_fields": False}
+        usage = client.post(
+            "/rt_individual_usage_benefit_data/",
+            json={**request, "entity_catalog": catalog},
+        )
+        assert usage.status_code == 200
+        outside = client.post(
+            "/rt_individual_usage_benefit_data/",
+            json={**request, "entity_catalog": "../entities.npy"},
+        )
+        assert outside.status_code == 400
+
+    def test_paths_outside_the_root(self, client, tmp_path, monkeypatch):
+        """Should refuse files outside the storage root, 404 missing ones."""
+        (tmp_path.parent / "outside.csv").write_text("HDR|")
+        for path in ("../outside.csv", str(tmp_path.parent / "outside.csv")):
+            response = client.post("/rt_eligibility_delta/", json={"base_file": path})
+            assert response.status_code == 400
+        response = client.post(
+            "/rt_eligibility_delta/", json={"base_file": "2021/5/1/missing.csv"}
+        )
+        assert response.status_code == 404
@@ -0,0 +1,86 @@
+"""Tests for the vectorized onsite testing data generator."""
+
+import csv
+import types
+
+import numpy as np
+import pandas as pd
+
+import generate_testing_data
+from generate_testing_data import (
+    INSURANCE_MASTER_LIST,
+    LOCATION_MASTER_LIST,
+    SYMPTOM_COLUMNS,
+)
+
+
+def _onsite(entries, **patient):
+    fields = ("last_name", "first_name", "dob", "phone", "email")
+    return generate_testing_data.TestingData(
+        types.SimpleNamespace(
+            entries=entries,
+            banana_email=False,
+            **{f"patient_{name}": patient.get(name) for name in fields},
+        )
+    )
+
+
+class TestTestingData:
+    """Test the dependent columns and the master list joins."""
+
+    def test_dependent_columns(self):
+        """Should keep timestamps ordered and blank the unasked questions."""
+        columns = _onsite(2000).columns(np.random.default_rng(3))
+        assert all(len(column) == 2000 for column in columns.values())
+        screening, sample, result, appointment = (
+            columns[name]
+            for name in (
+                "Screening Date & Time",
+                "Sample Date & Time",
+                "Result Date & Time",
+                "Appointment Time",
+            )
+        )
+        assert (screening <= sample).all() and (sample <= result).all()
+        booked = columns["Appointment"]
+        assert 0 < booked.sum() < 2000
+        assert (appointment[booked] >= result[booked]).all()
+        assert (appointment[~booked] == b"").all()
+
+        oral = columns["Sample Test Alias"] == b"rt_pcr_oral"
+        for name in SYMPTOM_COLUMNS:
+            assert (columns[name][oral] == b"").all()
+            assert set(columns[name][~oral]) == {b"Y", b"N"}
+        no_subscriber = columns["subscriber_birth_date"] == b""
+        for name in ("subscriber_forename", "subscriber_gender"):
+            assert ((columns[name] == b"") == no_subscriber).all()
+
+    def test_master_list_joins(self):
+        """Should join insurance by member id and locations by organization."""
+        columns = _onsite(500).columns()
+        insurance = pd.read_csv(INSURANCE_MASTER_LIST, dtype=str)
+        locations = pd.read_csv(LOCATION_MASTER_LIST, dtype=str).set_index(
+            "Organization ID"
+        )
+        insured = np.arange(500) % 10 == 0
+        assert (columns["insurance_member_id_str"][insured] != b"").all()
+        assert (columns["insurance_member_id_str"][~insured] == b"").all()
+        assert (columns["insurance_plan_phone_number"][~insured] == b"0").all()
+        assert set(columns["insurance_company_name"][insured]) <= {
+            name.encode() for name in insurance["insurance_company_name"]
+        }
+        for organization, name in zip(
+            columns["Organization ID"], columns["Location Name"]
+        ):
+            location = locations.loc[organization.decode()]
+            assert name.decode() == location["Location Name"]
+
+    def test_csv(self, tmp_path):
+        """Should write every column, quoted where needed, and given values."""
+        onsite = _onsite(300, last_name="O'Hara, Jr", phone="5551234567")
+        rows = list(csv.DictReader(open(onsite.csv(tmp_path))))
+        assert len(rows) == 300
+        assert list(rows[0]) == list(onsite.generate_entries().columns)
+        assert {row["Patient Last Name"] for row in rows} == {"O'Hara, Jr"}
+        assert {row["Patient Phone"] for row in rows} == {"5551234567"}
+        assert {row["Appointment"] for row in rows} == {"True", "False"}
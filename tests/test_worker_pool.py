@@ -0,0 +1,152 @@
+"""Tests for the worker pool shared by the row generators."""
+
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+import generate_raw_data
+from app import app
+from generate_edi import generate_batch
+from generate_raw_data import MemberRoster, VaccinedPatient
+from generate_rt_eligibility_data import RTEligibbility
+from generator_helpers import worker_pool
+from generator_helpers.worker_pool import (
+    bounded_imap,
+    run_state,
+    shutdown_worker_pool,
+    start_worker_pool,
+    task_state,
+)
+
+
+def _inherited_providers(_):
+    return generate_raw_data._providers.get("pid")
+
+
+def _state_of_run(task):
+    key, _ = task
+    return os.getpid(), id(run_state(key))
+
+
+def _timed(_):
+    start = time.monotonic()
+    time.sleep(0.05)
+    return start, time.monotonic()
+
+
+class TestWorkerPool:
+    """Test reuse and shutdown of the shared pool."""
+
+    def test_generators_reuse_the_shared_pool(self):
+        """Should run every call on the same workers, then stop them."""
+        pool = start_worker_pool(2)
+        try:
+            workers = set(multiprocessing.active_children())
+            assert len(MemberRoster().generate(5)) == 5
+            assert len(list(MemberRoster().stream(5, batch_size=2))) == 5
+            assert len(VaccinedPatient(3).generate()) == 3
+            assert start_worker_pool(4) is pool
+            assert set(multiprocessing.active_children()) == workers
+        finally:
+            shutdown_worker_pool()
+        assert not multiprocessing.active_children()
+
+    def test_rt_and_edi_workers_use_the_shared_pool(self, tmp_path):
+        """Should run RT shards, file groups and EDI batches on the pool."""
+        members = MemberRoster(processes_number=1).generate(5)
+        serial = RTEligibbility(45, "F", True, chunk_size=10, seed=7)
+        serial.generate_all_schemas()
+        # the header holds the creation time, only the records are compared
+        expected = open(serial.schemas_to_file(tmp_path / "serial")).readlines()[1:]
+        pool = start_worker_pool(2)
+        try:
+            workers = set(multiprocessing.active_children())
+            generator = RTEligibbility(
+                45, "F", True, chunk_size=10, seed=7, processes=3
+            )
+            generator.generate_all_schemas()
+            written = generator.schemas_to_file(tmp_path / "rt")
+            assert open(written).readlines()[1:] == expected
+            generator.schemas_to_file_group(tmp_path / "group", 20)
+            generate_batch(
+                4,
+                2,
+                members,
+                tmp_path / "edi",
+                processes=2,
+                control_directory=tmp_path / "counters",
+            )
+            assert set(multiprocessing.active_children()) == workers
+            assert start_worker_pool() is pool
+        finally:
+            shutdown_worker_pool()
+
+    def test_run_state_read_once_per_worker(self):
+        """Should load the state of a run once in every worker."""
+        with task_state(list(range(10**5))) as key:
+            with worker_pool.worker_pool(2) as pool:
+                tasks = [(key, task) for task in range(20)]
+                loaded = pool.map(_state_of_run, tasks)
+        states = {}
+        for pid, state in loaded:
+            states.setdefault(pid, set()).add(state)
+        assert all(len(ids) == 1 for ids in states.values())
+
+    def test_tasks_in_flight(self):
+        """Should keep at most ``in_flight`` tasks running on a larger pool."""
+        pool = start_worker_pool(3)
+        try:
+            spans = list(bounded_imap(pool, _timed, range(4), 1))
+        finally:
+            shutdown_worker_pool()
+        assert all(end <= start for (_, end), (start, _) in zip(spans, spans[1:]))
+
+    def test_fallback_pool_is_stopped(self):
+        """Should not leave workers behind without a shared pool."""
+        assert len(MemberRoster(processes_number=2).generate(3)) == 3
+        assert not multiprocessing.active_children()
+
+    def test_app_lifespan(self):
+        """Should start the pool with the app and stop it on shutdown."""
+        with TestClient(app):
+            assert worker_pool._pool is not None
+        assert worker_pool._pool is None
+        assert not multiprocessing.active_children()
+
+    def test_unguarded_script(self, tmp_path, monkeypatch):
+        """Should fork the workers of a script without a __main__ guard."""
+        if not sys.platform.startswith("linux"):
+            pytest.skip("workers are only forked by default on Linux")
+        monkeypatch.delenv("WORKER_START_METHOD", raising=False)
+        script = tmp_path / "script.py"
+        script.write_text(
+            "from generate_raw_data import MemberRoster\n"
+            "print(len(MemberRoster(processes_number=2).generate(3)))\n"
+        )
+        root = Path(__file__).resolve().parents[1]
+        monkeypatch.setenv("PYTHONPATH", str(root))
+        output = subprocess.run(
+            [sys.executable, str(script)],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        assert output.stdout.strip() == "3", output.stderr
+
+    def test_workers_start_warm(self, monkeypatch):
+        """Should fork workers with the providers built by the template process."""
+        if "forkserver" not in multiprocessing.get_all_start_methods():
+            pytest.skip("no forkserver on this platform")
+        monkeypatch.setattr(worker_pool, "WORKER_START_METHOD", "forkserver")
+        monkeypatch.setattr(worker_pool, "_context", None)
+        with worker_pool.worker_pool(2) as pool:
+            template_pids = set(pool.map(_inherited_providers, range(2)))
+        assert None not in template_pids
+        assert not template_pids & {child.pid for child in pool._pool}